@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import asyncio
+from dotenv import load_dotenv
+
+# Add the current directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import Settings
+from models.resource import Resource
+from services.firebase_service import FirebaseService
+from services.async_firebase_service import AsyncFirebaseService
+
+def time_calls(func, iterations):
+    """Call func repeatedly and return the mean latency in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def uncached_copy(firebase):
+    """Make a service whose reads always go to Firestore, sharing firebase's app
+    
+    The default Firebase app can only be initialized once per process, so the
+    copy reuses the app and clients of an initialized service.
+    """
+    settings = Settings()
+    settings.settings["firebase"]["cache_max_age"] = 0
+    settings.settings["firebase"]["cache_path"] = "data/benchmark_cache.sqlite3"
+    
+    uncached = FirebaseService(settings)
+    uncached.app = firebase.app
+    uncached.db = firebase.db
+    uncached.bucket = firebase.bucket
+    uncached.initialized = True
+    return uncached
+
+def benchmark_cache(cached, iterations=20):
+    """Compare cached and uncached read latency against the live Firestore project"""
+    print("Benchmarking local cache...")
+    
+    # Uncached: every read is older than max age, so it goes to Firestore
+    uncached = uncached_copy(cached)
+    
+    cached.get_resources()  # Warm the cache
+    cached.get_campaigns()
+    cached.get_players()
+    
+    for name in ("get_resources", "get_campaigns", "get_players"):
+        uncached_ms = time_calls(getattr(uncached, name), iterations)
+        cached_ms = time_calls(getattr(cached, name), iterations)
+        print(f"{name:15} uncached {uncached_ms:9.3f} ms   cached {cached_ms:9.3f} ms   "
+              f"speedup {uncached_ms / cached_ms:8.1f}x")
+
+def benchmark_bulk_writes(firebase, count=200):
+    """Compare adding resources one at a time with batched add_resources"""
+    print(f"Benchmarking bulk writes of {count} resources...")
+    
+    def make_resources(prefix):
+        return [Resource(title=f"{prefix} {i}", resource_type="text", folder="benchmark") for i in range(count)]
+    
+    start = time.perf_counter()
+    single_ids = [firebase.add_resource(resource) for resource in make_resources("Single")]
+    single_s = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch_ids = firebase.add_resources(make_resources("Batched"))
+    batch_s = time.perf_counter() - start
+    
+    print(f"add_resource loop {single_s:8.2f} s   add_resources {batch_s:8.2f} s   "
+          f"speedup {single_s / batch_s:6.1f}x")
+    
+    # Clean up the benchmark documents
+    firebase.delete_resources([doc_id for doc_id in single_ids + batch_ids if doc_id])
+
+def benchmark_async_reads(firebase, count=100):
+    """Compare sequential get_resource calls with concurrent AsyncFirebaseService calls"""
+    print(f"Benchmarking {count} get_resource calls, sync versus async...")
+    
+    # Every read goes to Firestore instead of the local cache
+    firebase = uncached_copy(firebase)
+    async_firebase = AsyncFirebaseService(firebase)
+    
+    resource_ids = [resource.id for resource in firebase.get_resources(limit=count)]
+    resource_ids = (resource_ids * count)[:count]
+    if not resource_ids:
+        print("No resources to read")
+        return
+    
+    start = time.perf_counter()
+    for resource_id in resource_ids:
+        firebase.get_resource(resource_id)
+    sync_s = time.perf_counter() - start
+    
+    async def read_all():
+        await async_firebase.initialize()
+        start = time.perf_counter()
+        await asyncio.gather(*(async_firebase.get_resource(resource_id) for resource_id in resource_ids))
+        return time.perf_counter() - start
+    
+    async_s = asyncio.run(read_all())
+    
+    print(f"sync {sync_s:8.2f} s   async {async_s:8.2f} s   speedup {sync_s / async_s:6.1f}x")
+
+if __name__ == "__main__":
+    load_dotenv()
+    firebase = FirebaseService()
+    firebase.initialize()
+    
+    benchmark_cache(firebase)
+    benchmark_bulk_writes(firebase)
+    benchmark_async_reads(firebase)
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+from PIL import Image
+
+# Add the current directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import Settings
+from utils.image_preprocessing import IMAGE_EXTENSIONS, preprocess_images
+
+def make_sample_images(directory, count=16, size=(4032, 3024)):
+    """Write 12 MP PNGs that compress roughly like photos of handouts"""
+    paths = []
+    for i in range(count):
+        noise = Image.effect_noise(size, 24 + i).convert("L")
+        gradient = Image.linear_gradient("L").resize(size)
+        img = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+        path = os.path.join(directory, f"sample_{i:02}.png")
+        img.save(path)
+        paths.append(path)
+    return paths
+
+def run(file_paths, output_dir, workers, options):
+    """Preprocess every file with the given number of worker processes
+    
+    Returns:
+        tuple: (seconds taken, original bytes, processed bytes)
+    """
+    shutil.rmtree(output_dir, ignore_errors=True)
+    original_bytes = processed_bytes = 0
+    
+    start = time.perf_counter()
+    for _, result in preprocess_images(file_paths, output_dir, *options, max_workers=workers):
+        original_bytes += result["original_bytes"]
+        processed_bytes += result["bytes"]
+    return time.perf_counter() - start, original_bytes, processed_bytes
+
+def benchmark_preprocessing(folder=None):
+    """Compare one worker process with one per core, and report the size reduction"""
+    settings = Settings()
+    options = (
+        settings.get("resources", "preprocess_max_edge") or 2560,
+        settings.get("resources", "preprocess_format") or "WEBP",
+        settings.get("resources", "preprocess_quality") or 82,
+    )
+    
+    work_dir = tempfile.mkdtemp(prefix="dmhub-images-")
+    try:
+        if folder:
+            file_paths = sorted(entry.path for entry in os.scandir(folder)
+                                if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS)
+        else:
+            print("Generating sample images...")
+            file_paths = make_sample_images(work_dir)
+        if not file_paths:
+            print("No images to preprocess")
+            return
+        
+        cores = os.cpu_count() or 1
+        output_dir = os.path.join(work_dir, "out")
+        print(f"Preprocessing {len(file_paths)} images to {options[1]} at max edge {options[0]}, quality {options[2]}")
+        
+        for workers in sorted({1, cores}):
+            seconds, original_bytes, processed_bytes = run(file_paths, output_dir, workers, options)
+            images_per_second = len(file_paths) / seconds
+            print(f"{workers:3} worker(s) {seconds:8.2f} s   {images_per_second:7.2f} images/s   "
+                  f"{images_per_second / workers:7.2f} images/s per core")
+        
+        print(f"Size {original_bytes / 1024 ** 2:9.1f} MB -> {processed_bytes / 1024 ** 2:9.1f} MB   "
+              f"reduction {100 * (1 - processed_bytes / original_bytes):5.1f}%")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    # Optionally pass a folder of real images instead of generated samples
+    benchmark_preprocessing(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,8 +1,15 @@
 import os
 import json
+import shutil
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Relative paths in the settings are resolved against the app directory, not the working directory
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Files kept next to a SQLite database in WAL mode, moved along with it
+SQLITE_SIDECARS = ("-wal", "-shm")
+
 class Settings:
     """Class for managing application settings"""
     
@@ -24,17 +31,49 @@ class Settings:
             "firebase": {
                 "credentials_path": os.getenv("FIREBASE_CREDENTIALS_PATH", ""),
                 "storage_bucket": os.getenv("FIREBASE_STORAGE_BUCKET", ""),
-                "offline_mode": False
+                "offline_mode": False,
+                "cache_path": "data/firestore_cache.sqlite3",
+                "cache_max_age": 300,  # Seconds before cached reads go back to Firestore
+                "reconnect_interval": 30  # Seconds to stay offline after a connection error
             },
             "discord": {
                 "bot_token": os.getenv("DISCORD_BOT_TOKEN", ""),
                 "default_channel": "",
-                "auto_connect": False
+                "auto_connect": False,
+                "max_concurrent_sends": 5,  # Sends in flight at once when sharing to many recipients
+                "reuse_attachments": True,  # Upload a shared file once and link it to the other recipients
+                "attachment_channel": "",  # Channel ID to upload shared files to, instead of the first recipient
+                "user_cache_size": 256,  # Fetched Discord users kept in memory for direct messages
+                "outbox_path": "data/discord_outbox.sqlite3",
+                "outbox_max_attempts": 8,  # Attempts before a queued message is dead-lettered
+                "outbox_retry_delay": 2,  # Seconds before the first retry, doubled after each failure
+                "outbox_max_retry_delay": 300
             },
             "resources": {
                 "local_storage_path": os.getenv("LOCAL_STORAGE_PATH", "data/resources"),
                 "max_thumbnail_size": (200, 200),
-                "recent_resources_count": 10
+                "recent_resources_count": 10,
+                "page_size": 50,
+                "download_cache_max_bytes": 2 * 1024 ** 3,  # Downloaded files kept under local_storage_path/cache
+                "chunked_upload_threshold": 20 * 1024 ** 2,  # Larger files are uploaded in resumable chunks
+                "upload_chunk_size": 8 * 1024 ** 2,  # Multiple of 256 KiB and at least 5 MB for both backends
+                "upload_sessions_path": "data/upload_sessions.sqlite3",
+                "upload_session_max_age": 24 * 60 * 60,  # Seconds an interrupted upload can be resumed
+                "upload_index_path": "data/upload_index.sqlite3",
+                "listing_cache_path": "data/cloudinary_cache.sqlite3",
+                "listing_cache_max_age": 300,  # Seconds a Cloudinary folder listing is reused for
+                "admin_api_reserve": 50,  # Admin API calls per hour left for browsing when running bulk jobs
+                "url_cache_size": 4096,  # Cloudinary URLs kept in memory
+                "thumbnail_workers": 8,  # Concurrent thumbnail downloads
+                "thumbnail_cache_max_bytes": 256 * 1024 ** 2,  # Thumbnails kept under local_storage_path/thumbnails
+                "thumbnail_memory_budget": 64 * 1024 ** 2,  # Decoded thumbnails kept in memory
+                "thumbnail_revalidate_after": 7 * 24 * 60 * 60,  # Seconds before a stored thumbnail is checked with its ETag
+                "max_upload_workers": 4,  # Concurrent uploads in a batch, to stay inside Cloudinary rate limits
+                "preprocess_images": False,  # Downscale and re-encode images before uploading them
+                "preprocess_max_edge": 2560,
+                "preprocess_format": "WEBP",  # "WEBP" or "JPEG"
+                "preprocess_quality": 82,
+                "preprocessed_path": "data/preprocessed"
             },
             "user": {
                 "email": "",
@@ -44,7 +83,7 @@ class Settings:
         }
         
         # Try to load settings from file
-        self.settings_file = Path("config/settings.json")
+        self.settings_file = resolve_app_path("config/settings.json")
         self.load()
     
     def get(self, section, key=None):
@@ -65,6 +104,19 @@ class Settings:
         
         return self.settings[section].get(key)
     
+    def path(self, section, key, default=None):
+        """Get a path setting, resolving relative paths against the app directory
+        
+        Args:
+            section (str): Settings section
+            key (str): Setting key
+            default (str, optional): Path to use when the setting is empty. Defaults to None.
+            
+        Returns:
+            Path: Absolute path, see resolve_app_path
+        """
+        return resolve_app_path(self.get(section, key) or default)
+    
     def set(self, section, key, value):
         """Set a setting value
         
@@ -176,3 +228,39 @@ class Settings:
         self.settings = default_settings.settings.copy()
         
         return self.save()
+
+def resolve_app_path(path):
+    """Resolve a path against the app directory, moving files left in the working directory
+    
+    Earlier versions resolved relative paths against the working directory. A
+    file or folder found there and not in the app directory yet is moved over,
+    together with its SQLite WAL files, so settings and caches aren't lost.
+    
+    Args:
+        path (str): Absolute path, or path relative to the app directory
+        
+    Returns:
+        Path: Absolute path. The old location if it couldn't be moved.
+    """
+    path = Path(path).expanduser()
+    if path.is_absolute():
+        return path
+    
+    resolved = APP_DIR / path
+    legacy = Path.cwd() / path
+    if resolved.exists() or not legacy.exists() or legacy.resolve() == resolved.resolve():
+        return resolved
+    
+    try:
+        resolved.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(legacy), str(resolved))
+        for suffix in SQLITE_SIDECARS:
+            sidecar = legacy.with_name(legacy.name + suffix)
+            if sidecar.exists():
+                shutil.move(str(sidecar), str(resolved.with_name(resolved.name + suffix)))
+        print(f"Moved {legacy} to {resolved}")
+        return resolved
+    except OSError as e:
+        print(f"Error moving {legacy} to {resolved}, still using it there: {e}")
+    
+    return legacy
@@ -1,4 +1,6 @@
-class Campaign:
+from models.change_tracking import ChangeTracking
+
+class Campaign(ChangeTracking):
     """Class representing a campaign in the DM Resource Hub"""
     
     def __init__(self, id=None, name="", description="", created_by="", 
@@ -47,7 +49,7 @@ class Campaign:
         Returns:
             Campaign: A new Campaign object
         """
-        return cls(
+        campaign = cls(
             id=id,
             name=data.get("name", ""),
             description=data.get("description", ""),
@@ -57,3 +59,5 @@ class Campaign:
             cover_image=data.get("coverImage", ""),
             tags=data.get("tags", [])
         )
+        campaign.mark_clean()
+        return campaign
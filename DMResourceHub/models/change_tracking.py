@@ -0,0 +1,66 @@
+class ChangeTracking:
+    """Mixin that tracks which fields of a model changed since it was loaded
+    
+    Models using it must implement to_dict(). The state returned by to_dict()
+    is recorded by mark_clean() and compared against by get_changes().
+    """
+    
+    def mark_clean(self):
+        """Record the current state as the stored one"""
+        self._original = self._snapshot(self.to_dict())
+    
+    @property
+    def has_changes(self):
+        """bool: True if any field differs from the stored state"""
+        return bool(self.get_changes())
+    
+    def get_changes(self):
+        """Get the fields that changed since the model was loaded or last saved
+        
+        Nested dictionaries are compared key by key and reported as dotted field
+        paths, e.g. "textData.content", so only the changed values are written.
+        
+        Returns:
+            dict: Changed field paths and their new values. Every field if the model was never stored.
+        """
+        current = self.to_dict()
+        original = self.__dict__.get("_original")
+        if original is None:
+            return current
+        
+        return self._diff(original, current)
+    
+    @classmethod
+    def _diff(cls, old, new, prefix=""):
+        """Compare two dictionaries and return changed values by field path"""
+        changes = {}
+        for key, value in new.items():
+            path = f"{prefix}{key}"
+            if key not in old:
+                changes[path] = value
+            elif isinstance(value, dict) and isinstance(old[key], dict) and value and old[key].keys() <= value.keys():
+                changes.update(cls._diff(old[key], value, f"{path}."))
+            elif not cls._same(old[key], value):
+                # Replaced, or a nested key was removed, so write the whole value
+                changes[path] = value
+        return changes
+    
+    @classmethod
+    def _same(cls, old, new):
+        """Compare values, treating sentinels such as SERVER_TIMESTAMP by identity"""
+        if old is new:
+            return True
+        if isinstance(old, dict) and isinstance(new, dict):
+            return old.keys() == new.keys() and all(cls._same(old[key], new[key]) for key in old)
+        if isinstance(old, list) and isinstance(new, list):
+            return len(old) == len(new) and all(cls._same(a, b) for a, b in zip(old, new))
+        return type(old) is type(new) and old == new
+    
+    @classmethod
+    def _snapshot(cls, value):
+        """Copy dictionaries and lists so later in-place edits show up as changes"""
+        if isinstance(value, dict):
+            return {key: cls._snapshot(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls._snapshot(item) for item in value]
+        return value
@@ -1,4 +1,6 @@
-class Player:
+from models.change_tracking import ChangeTracking
+
+class Player(ChangeTracking):
     """Class representing a player in the DM Resource Hub"""
     
     def __init__(self, id=None, name="", discord_id="", discord_username="", 
@@ -47,7 +49,7 @@ class Player:
         Returns:
             Player: A new Player object
         """
-        return cls(
+        player = cls(
             id=id,
             name=data.get("name", ""),
             discord_id=data.get("discordId", ""),
@@ -57,3 +59,5 @@ class Player:
             added_at=data.get("addedAt"),
             notes=data.get("notes", "")
         )
+        player.mark_clean()
+        return player
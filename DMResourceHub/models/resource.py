@@ -1,8 +1,17 @@
-class Resource:
+from models.change_tracking import ChangeTracking
+
+class Resource(ChangeTracking):
     """Class representing a resource in the DM Resource Hub"""
     
     RESOURCE_TYPES = ["image", "pdf", "link", "text"]
     
+    # Fields fetched for browser list views (Firestore field paths)
+    SUMMARY_FIELDS = ["title", "type", "tags", "folder", "uploadedAt", "cloudinaryData"]
+    
+    # Attributes left out of summaries and loaded on first access
+    LAZY_ATTRIBUTES = ("description", "campaigns", "uploaded_by", "sharing_status",
+                       "file_data", "link_data", "text_data")
+    
     def __init__(self, id=None, title="", description="", resource_type="", tags=None, 
                  folder="", campaigns=None, uploaded_by="", uploaded_at=None):
         """Initialize a resource object
@@ -107,7 +116,76 @@ class Resource:
         if "textData" in data:
             resource.text_data = data["textData"]
         
+        resource.mark_clean()
+        return resource
+    
+    @classmethod
+    def from_summary(cls, id, data, loader):
+        """Create a resource from a summary document holding only SUMMARY_FIELDS
+        
+        The remaining attributes are fetched with loader the first time one of
+        them is read.
+        
+        Args:
+            id (str): Resource ID
+            data (dict): Summary data from Firebase
+            loader (callable): Called with the resource ID, returns the full document data
+            
+        Returns:
+            Resource: A new Resource object
+        """
+        resource = cls.from_dict(id, data)
+        for name in cls.LAZY_ATTRIBUTES:
+            del resource.__dict__[name]
+        resource._loader = loader
         return resource
+    
+    @property
+    def is_summary(self):
+        """bool: True if the heavy attributes have not been loaded yet"""
+        return "_loader" in self.__dict__
+    
+    def hydrate(self, loader=None):
+        """Load the attributes left out of a summary resource
+        
+        If the document can't be loaded the resource stays a summary, so the
+        next access tries again instead of seeing (and later saving) empty values.
+        
+        Args:
+            loader (callable, optional): Used instead of the resource's own loader,
+                e.g. to hand over documents read in a batch. Defaults to None.
+            
+        Returns:
+            bool: True if the resource is fully loaded, False otherwise
+        """
+        if "_loader" not in self.__dict__:
+            return True
+        
+        data = (loader or self._loader)(self.id)
+        if not data:
+            return False
+        
+        full = Resource.from_dict(self.id, data)
+        for name in self.LAZY_ATTRIBUTES:
+            self.__dict__.setdefault(name, getattr(full, name))
+        del self.__dict__["_loader"]
+        
+        # Compare future changes against the full stored document
+        self._original = full._original
+        return True
+    
+    def __getattr__(self, name):
+        """Load lazy attributes of a summary resource on first access
+        
+        Raises:
+            LookupError: If the full document can't be loaded
+        """
+        # Only called for attributes that are not set on the instance
+        if name in Resource.LAZY_ATTRIBUTES and "_loader" in self.__dict__:
+            if not self.hydrate():
+                raise LookupError(f"Could not load resource {self.id}")
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
 
 
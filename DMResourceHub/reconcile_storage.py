@@ -0,0 +1,50 @@
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+# Add the current directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.reconciliation_service import ReconciliationService
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and delete storage that Firestore and Cloudinary disagree about")
+    parser.add_argument("--delete", action="store_true", help="delete orphaned assets (default is a dry run)")
+    parser.add_argument("--delete-documents", action="store_true",
+                        help="also delete resources whose Cloudinary asset is missing")
+    parser.add_argument("--folder", help="only consider assets under this Cloudinary folder")
+    parser.add_argument("--min-age", type=float, default=3600,
+                        help="ignore assets younger than this many seconds (default 3600)")
+    parser.add_argument("--max-wait", type=float,
+                        help="longest time in seconds to wait for Admin API quota")
+    args = parser.parse_args()
+    
+    load_dotenv()
+    reconciliation = ReconciliationService()
+    report = reconciliation.collect_garbage(
+        dry_run=not args.delete,
+        folder=args.folder,
+        min_age=args.min_age,
+        delete_documents=args.delete_documents,
+        max_wait=args.max_wait
+    )
+    
+    for resource_type, public_ids in report["orphaned_assets"].items():
+        print(f"{len(public_ids)} orphaned {resource_type} assets")
+        for public_id in public_ids:
+            status = report["deleted_assets"].get(public_id, "not deleted")
+            print(f"  {public_id}  {status}")
+    
+    print(f"{len(report['missing_assets'])} resources refer to missing assets")
+    for resource_id, public_id in report["missing_assets"]:
+        status = "deleted" if resource_id in report["deleted_documents"] else "kept"
+        print(f"  {resource_id} -> {public_id}  {status}")
+    
+    if report["pending_writes"]:
+        print(f"{report['pending_writes']} offline writes could not be replayed, so nothing can be deleted yet.")
+    elif not args.delete:
+        print("Dry run, nothing was deleted. Run with --delete to remove the orphaned assets.")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 # Import services for easy access
 from services.firebase_service import FirebaseService
+from services.async_firebase_service import AsyncFirebaseService
 from services.discord_service import DiscordService
 from services.cloudinary_service import CloudinaryService
+from services.reconciliation_service import ReconciliationService
+from services.thumbnail_service import ThumbnailService
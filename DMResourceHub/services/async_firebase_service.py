@@ -0,0 +1,588 @@
+import asyncio
+from firebase_admin import firestore_async
+
+from models.resource import Resource
+from services.firebase_service import FirebaseService, MODEL_CLASSES, MAX_BATCH_WRITES, MAX_GET_ALL, CONNECTION_ERRORS
+
+class AsyncFirebaseService:
+    """Asyncio variant of FirebaseService built on the Firestore AsyncClient
+    
+    Methods mirror FirebaseService but are coroutines, so many reads and writes
+    can run concurrently on one event loop, such as the loop DiscordService runs
+    in its client thread. Only the Firestore calls are made here; the query
+    building, local cache, offline queue and listeners are the wrapped
+    FirebaseService's, and its SQLite work runs in worker threads so it never
+    blocks the loop.
+    
+    The AsyncClient is bound to the event loop it is first used on, so use each
+    instance from a single loop.
+    """
+    
+    def __init__(self, firebase_service=None, settings=None):
+        """Initialize the async Firebase service
+        
+        Args:
+            firebase_service (FirebaseService, optional): Service to share the Firebase app and local
+                cache with. Defaults to a new FirebaseService.
+            settings (Settings, optional): Settings for a new FirebaseService. Defaults to None.
+        """
+        self.service = firebase_service or FirebaseService(settings)
+        self.db = None
+        self.initialized = False
+        self._init_lock = None
+    
+    async def initialize(self):
+        """Initialize the Firebase app if needed and create the AsyncClient"""
+        if self.initialized:
+            return
+        
+        # Created lazily so it belongs to the running loop
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        
+        async with self._init_lock:
+            if self.initialized:
+                return
+            
+            try:
+                await asyncio.to_thread(self.service.initialize)
+                
+                self.db = firestore_async.client(self.service.app)
+                self.initialized = True
+                print("Async Firestore client initialized successfully")
+            
+            except Exception as e:
+                print(f"Error initializing async Firestore client: {e}")
+                raise
+    
+    # Resource methods
+    
+    async def get_resources(self, limit=50):
+        """Get a list of resources
+        
+        Args:
+            limit (int, optional): Maximum number of resources to return. Defaults to 50.
+        
+        Returns:
+            list: List of Resource objects
+        """
+        resources = []
+        try:
+            docs = await self._cached_query(**self.service._resources_list_query(limit))
+            for doc_id, data in docs:
+                resources.append(Resource.from_dict(doc_id, data))
+        except Exception as e:
+            print(f"Error getting resources: {e}")
+        
+        return resources
+    
+    async def get_resources_page(self, page_size=50, start_after=None, summary=False):
+        """Get one page of resources in document ID order
+        
+        Args:
+            page_size (int, optional): Number of resources per page. Defaults to 50.
+            start_after (str, optional): Cursor returned with the previous page. Defaults to None (first page).
+            summary (bool, optional): Fetch only Resource.SUMMARY_FIELDS. Summary resources load the
+                rest of their attributes with a blocking read when first used, so await
+                hydrate_resources before using them on the loop. Defaults to False.
+        
+        Returns:
+            tuple: (list of Resource objects, cursor for the next page or None if this was the last page).
+                The list is None if the page could not be read, see FirebaseService.get_resources_page.
+        """
+        try:
+            docs = await self._cached_query(**self.service._resources_page_query(page_size, start_after, summary))
+        except Exception as e:
+            print(f"Error getting resources page after {start_after}: {e}")
+            return None, start_after
+        
+        return self.service._resources_page(docs, page_size, summary)
+    
+    async def iter_resources(self, page_size=None, start_after=None, summary=False):
+        """Stream all resources, fetching one page at a time
+        
+        Args:
+            page_size (int, optional): Number of resources per page. Defaults to the resources.page_size setting.
+            start_after (str, optional): Resume after this resource ID. Defaults to None (from the start).
+            summary (bool, optional): Yield summary resources, see get_resources_page. Defaults to False.
+        
+        Yields:
+            Resource: Resource objects in document ID order
+        
+        Raises:
+            Exception: The error that prevented a page from being read
+        """
+        page_size = page_size or self.service.settings.get("resources", "page_size") or 50
+        cursor = start_after
+        
+        while True:
+            docs = await self._cached_query(**self.service._resources_page_query(page_size, cursor, summary))
+            resources, cursor = self.service._resources_page(docs, page_size, summary)
+            for resource in resources:
+                yield resource
+            
+            if cursor is None:
+                return
+    
+    async def query_resources(self, campaign=None, tag=None, resource_type=None, folder=None,
+                              limit=50, start_after=None):
+        """Get a page of resources matching the given filters, newest first
+        
+        See FirebaseService.query_resources.
+        
+        Returns:
+            tuple: (list of Resource objects, cursor for the next page or None if this was the last page).
+                If the page could not be read the list is None and the cursor is start_after.
+        """
+        service = self.service
+        resources = []
+        try:
+            cursor = await asyncio.to_thread(service._query_cursor, start_after)
+            while True:
+                docs = await self._cached_query(
+                    **service._resources_filter_query(campaign, tag, resource_type, folder, limit, cursor)
+                )
+                last, full = service._collect_matches(docs, campaign, tag, limit, resources)
+                if full:
+                    return resources, last
+                if len(docs) < limit:
+                    return resources, None
+                cursor = last
+        except Exception as e:
+            print(f"Error querying resources: {e}")
+        
+        return None, start_after
+    
+    async def get_resources_by_ids(self, resource_ids):
+        """Get many resources by ID with batched reads
+        
+        Args:
+            resource_ids (list): Resource IDs. Duplicates are fetched and returned once.
+        
+        Returns:
+            list: Resource objects in the order of their first ID in resource_ids, skipping IDs that don't exist
+        """
+        return await self._get_models_by_ids('resources', resource_ids)
+    
+    async def get_resource(self, resource_id):
+        """Get a specific resource by ID
+        
+        Args:
+            resource_id (str): Resource ID
+        
+        Returns:
+            Resource: Resource object or None if not found
+        """
+        return await self._get_model('resources', resource_id)
+    
+    async def hydrate_resources(self, resources):
+        """Load the full documents of summary resources with one batched read
+        
+        Hydrated resources no longer read Firestore when their heavy attributes
+        are first used, which would block the event loop.
+        
+        Args:
+            resources (list): Resource objects. Those that are not summaries are left alone.
+        
+        Returns:
+            bool: True if every resource was loaded. Those that couldn't be stay summaries.
+        """
+        summaries = [resource for resource in resources if resource.is_summary]
+        try:
+            docs = await self._cached_get_many('resources', list(dict.fromkeys(resource.id for resource in summaries)))
+        except Exception as e:
+            print(f"Error hydrating resources: {e}")
+            return False
+        
+        # Resources whose documents are missing keep their own loader
+        return all([resource.hydrate(docs.get) for resource in summaries])
+    
+    async def add_resource(self, resource):
+        """Add a new resource to Firestore
+        
+        Args:
+            resource (Resource): Resource object
+        
+        Returns:
+            str: ID of the created resource, or None if failed
+        """
+        return await self._add_model('resources', resource)
+    
+    async def update_resource(self, resource):
+        """Update an existing resource in Firestore, sending only changed fields
+        
+        Args:
+            resource (Resource): Resource object with updated values
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return await self._update_model('resources', resource)
+    
+    async def record_share(self, resource_id, recipients):
+        """Record that a resource was shared, see FirebaseService.record_share
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            await self._write('resources', resource_id, 'update', self.service._share_fields(recipients))
+            return True
+        except Exception as e:
+            print(f"Error recording share of resource {resource_id}: {e}")
+        
+        return False
+    
+    async def delete_resource(self, resource_id):
+        """Delete a resource from Firestore
+        
+        Args:
+            resource_id (str): Resource ID
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            await self._write('resources', resource_id, 'delete')
+            return True
+        except Exception as e:
+            print(f"Error deleting resource {resource_id}: {e}")
+        
+        return False
+    
+    async def add_resources(self, resources):
+        """Add many resources using batched writes
+        
+        Args:
+            resources (list): Resource objects
+        
+        Returns:
+            list: ID of each created resource, or None where it failed, in input order
+        """
+        writes = [self.service._prepare_add('resources', resource) for resource in resources]
+        results = await self._write_many('resources', writes)
+        
+        ids = []
+        for resource, (doc_id, _, _), ok in zip(resources, writes, results):
+            if ok:
+                self.service._model_added(resource, doc_id)
+            ids.append(doc_id if ok else None)
+        return ids
+    
+    async def update_resources(self, resources):
+        """Update many resources using batched writes
+        
+        Args:
+            resources (list): Resource objects with updated values
+        
+        Returns:
+            list: True for each resource that was updated, False otherwise, in input order
+        """
+        writes, positions, results = self.service._collect_updates(resources)
+        for position, ok in zip(positions, await self._write_many('resources', writes)):
+            results[position] = ok
+            if ok:
+                resources[position].mark_clean()
+        return results
+    
+    async def delete_resources(self, resource_ids):
+        """Delete many resources using batched writes
+        
+        Args:
+            resource_ids (list): Resource IDs
+        
+        Returns:
+            list: True for each resource that was deleted, False otherwise, in input order
+        """
+        return await self._write_many('resources', [(resource_id, 'delete', None) for resource_id in resource_ids])
+    
+    # Campaign methods
+    
+    async def get_campaigns(self):
+        """Get a list of campaigns
+        
+        Returns:
+            list: List of Campaign objects
+        """
+        return await self._get_all_models('campaigns')
+    
+    async def get_campaigns_by_ids(self, campaign_ids):
+        """Get many campaigns by ID with batched reads
+        
+        Args:
+            campaign_ids (list): Campaign IDs. Duplicates are fetched and returned once.
+        
+        Returns:
+            list: Campaign objects in the order of their first ID in campaign_ids, skipping IDs that don't exist
+        """
+        return await self._get_models_by_ids('campaigns', campaign_ids)
+    
+    async def get_campaign(self, campaign_id):
+        """Get a specific campaign by ID
+        
+        Args:
+            campaign_id (str): Campaign ID
+        
+        Returns:
+            Campaign: Campaign object or None if not found
+        """
+        return await self._get_model('campaigns', campaign_id)
+    
+    async def add_campaign(self, campaign):
+        """Add a new campaign to Firestore
+        
+        Args:
+            campaign (Campaign): Campaign object
+        
+        Returns:
+            str: ID of the created campaign, or None if failed
+        """
+        return await self._add_model('campaigns', campaign)
+    
+    async def update_campaign(self, campaign):
+        """Update an existing campaign in Firestore, sending only changed fields
+        
+        Args:
+            campaign (Campaign): Campaign object with updated values
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return await self._update_model('campaigns', campaign)
+    
+    # Player methods
+    
+    async def get_players(self):
+        """Get a list of players
+        
+        Returns:
+            list: List of Player objects
+        """
+        return await self._get_all_models('players')
+    
+    async def get_players_by_ids(self, player_ids):
+        """Get many players by ID with batched reads
+        
+        Args:
+            player_ids (list): Player IDs. Duplicates are fetched and returned once.
+        
+        Returns:
+            list: Player objects in the order of their first ID in player_ids, skipping IDs that don't exist
+        """
+        return await self._get_models_by_ids('players', player_ids)
+    
+    async def add_player(self, player):
+        """Add a new player to Firestore
+        
+        Args:
+            player (Player): Player object
+        
+        Returns:
+            str: ID of the created player, or None if failed
+        """
+        return await self._add_model('players', player)
+    
+    async def update_player(self, player):
+        """Update an existing player in Firestore, sending only changed fields
+        
+        Args:
+            player (Player): Player object with updated values
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return await self._update_model('players', player)
+    
+    # Storage methods
+    
+    async def upload_file(self, file_path, destination_path, progress_callback=None):
+        """Upload a file to Firebase Storage without blocking the event loop
+        
+        progress_callback is called from a worker thread.
+        
+        Returns:
+            str: Public URL of the uploaded file, or None if failed
+        """
+        return await asyncio.to_thread(self.service.upload_file, file_path, destination_path, progress_callback)
+    
+    async def download_file(self, storage_path, destination_path, generation=None):
+        """Download a file from Firebase Storage without blocking the event loop
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return await asyncio.to_thread(self.service.download_file, storage_path, destination_path, generation)
+    
+    # Model helpers
+    
+    async def _get_all_models(self, collection):
+        """Get every document of a collection as model objects"""
+        model_class = MODEL_CLASSES[collection]
+        
+        models = []
+        try:
+            docs = await self._cached_query(collection, collection, lambda db: db.collection(collection))
+            for doc_id, data in docs:
+                models.append(model_class.from_dict(doc_id, data))
+        except Exception as e:
+            print(f"Error getting {collection}: {e}")
+        
+        return models
+    
+    async def _get_model(self, collection, doc_id):
+        """Get one document as a model object, or None if not found"""
+        try:
+            data = await self._cached_get(collection, doc_id)
+            if data is not None:
+                return MODEL_CLASSES[collection].from_dict(doc_id, data)
+        except Exception as e:
+            print(f"Error getting {collection[:-1]} {doc_id}: {e}")
+        
+        return None
+    
+    async def _get_models_by_ids(self, collection, doc_ids):
+        """Get model objects for many document IDs, keeping the input order"""
+        doc_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id))
+        model_class = MODEL_CLASSES[collection]
+        
+        try:
+            docs = await self._cached_get_many(collection, doc_ids)
+        except Exception as e:
+            print(f"Error getting {collection} by IDs: {e}")
+            return []
+        
+        return [model_class.from_dict(doc_id, docs[doc_id]) for doc_id in doc_ids if doc_id in docs]
+    
+    async def _add_model(self, collection, model):
+        """Add a model as a new document, returning its ID or None if failed"""
+        try:
+            doc_id, op, data = self.service._prepare_add(collection, model)
+            await self._write(collection, doc_id, op, data)
+            self.service._model_added(model, doc_id)
+            return doc_id
+        except Exception as e:
+            print(f"Error adding {collection[:-1]}: {e}")
+        
+        return None
+    
+    async def _update_model(self, collection, model):
+        """Send the changed fields of a model, returning True if successful"""
+        if not model.id:
+            print(f"Error updating {collection[:-1]}: No {collection[:-1]} ID provided")
+            return False
+        
+        try:
+            write = self.service._prepare_update(collection, model)
+            if write:
+                await self._write(collection, *write)
+                self.service._model_updated(collection, model)
+            return True
+        except Exception as e:
+            print(f"Error updating {collection[:-1]} {model.id}: {e}")
+        
+        return False
+    
+    # Cache helpers
+    
+    async def _cached_query(self, collection, key, build_query, fallback=None, cache_as=None):
+        """Async counterpart of FirebaseService._cached_query"""
+        service = self.service
+        docs = await asyncio.to_thread(service._local_query, collection, key, fallback)
+        if docs is not None:
+            return docs
+        
+        await self.initialize()
+        try:
+            docs = [(doc.id, doc.to_dict()) for doc in await build_query(self.db).get()]
+        except CONNECTION_ERRORS as e:
+            service._connection_lost(f"reading {collection} from local cache", e)
+            return await asyncio.to_thread(service._query_fallback, collection, fallback)
+        
+        return await asyncio.to_thread(service._store_query, collection, key, docs, cache_as)
+    
+    async def _cached_get(self, collection, doc_id):
+        """Async counterpart of FirebaseService._cached_get"""
+        service = self.service
+        found, data = await asyncio.to_thread(service._local_get, collection, doc_id)
+        if found:
+            return data
+        
+        await self.initialize()
+        try:
+            doc = await self.db.collection(collection).document(doc_id).get()
+        except CONNECTION_ERRORS as e:
+            service._connection_lost(f"reading {collection}/{doc_id} from local cache", e)
+            return await asyncio.to_thread(service.cache.get_document, collection, doc_id)
+        
+        return await asyncio.to_thread(service._store_get, collection, doc_id, doc)
+    
+    async def _cached_get_many(self, collection, doc_ids):
+        """Async counterpart of FirebaseService._cached_get_many"""
+        service = self.service
+        docs, missing = await asyncio.to_thread(service._local_get_many, collection, doc_ids)
+        if missing:
+            await self.initialize()
+        
+        for start in range(0, len(missing), MAX_GET_ALL):
+            refs = [self.db.collection(collection).document(doc_id) for doc_id in missing[start:start + MAX_GET_ALL]]
+            
+            try:
+                snapshots = [doc async for doc in self.db.get_all(refs)]
+            except CONNECTION_ERRORS as e:
+                service._connection_lost(f"reading {collection} from local cache", e)
+                docs.update(await asyncio.to_thread(service.cache.get_documents, collection, missing[start:]))
+                break
+            
+            docs.update(await asyncio.to_thread(service._store_get_many, collection, snapshots))
+        
+        return docs
+    
+    async def _write(self, collection, doc_id, op, data=None):
+        """Async counterpart of FirebaseService._write"""
+        service = self.service
+        if await asyncio.to_thread(service._can_write_online):
+            await self.initialize()
+            try:
+                await service._apply_write(collection, doc_id, op, data, db=self.db)
+                await asyncio.to_thread(service._writes_applied, collection, [(doc_id, op, data)])
+                return
+            except CONNECTION_ERRORS as e:
+                service._connection_lost(f"queueing {op} for {collection}/{doc_id}", e)
+        
+        await asyncio.to_thread(service._queue_writes, collection, [(doc_id, op, data)])
+    
+    async def _write_many(self, collection, writes):
+        """Async counterpart of FirebaseService._write_many"""
+        service = self.service
+        results = [False] * len(writes)
+        
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            chunk = writes[start:start + MAX_BATCH_WRITES]
+            
+            if await asyncio.to_thread(service._can_write_online):
+                await self.initialize()
+                try:
+                    batch = self.db.batch()
+                    for doc_id, op, data in chunk:
+                        service._apply_write(collection, doc_id, op, data, batch=batch, db=self.db)
+                    await batch.commit()
+                    
+                    await asyncio.to_thread(service._writes_applied, collection, chunk)
+                    results[start:start + len(chunk)] = [True] * len(chunk)
+                    continue
+                except CONNECTION_ERRORS as e:
+                    service._connection_lost(f"queueing {len(chunk)} {collection} writes", e)
+                except Exception as e:
+                    print(f"Batch of {len(chunk)} {collection} writes rejected, retrying individually: {e}")
+                    for offset, (doc_id, op, data) in enumerate(chunk):
+                        try:
+                            await self._write(collection, doc_id, op, data)
+                            results[start + offset] = True
+                        except Exception as write_error:
+                            print(f"Error writing {collection}/{doc_id}: {write_error}")
+                    continue
+            
+            await asyncio.to_thread(service._queue_writes, collection, chunk)
+            results[start:start + len(chunk)] = [True] * len(chunk)
+        
+        return results
@@ -1,16 +1,69 @@
 import os
+import time
+import calendar
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.utils
+import cloudinary.exceptions
 from dotenv import load_dotenv
 from pathlib import Path
 
+from config.settings import Settings
+from utils.local_cache import LocalCache
+from utils.upload_sessions import UploadSessions
+from utils.upload_index import UploadIndex
+from utils.image_preprocessing import preprocess_image
+from utils.url_builder import CloudinaryUrlBuilder
+
+# Most public IDs the Admin API deletes in one call
+MAX_BULK_DELETE = 100
+
 class CloudinaryService:
     """Service for interacting with Cloudinary cloud storage"""
     
-    def __init__(self):
-        """Initialize the Cloudinary service"""
+    def __init__(self, settings=None):
+        """Initialize the Cloudinary service
+        
+        Args:
+            settings (Settings, optional): Application settings. Defaults to a new Settings instance.
+        """
         self.initialized = False
+        self.url_builder = None
+        
+        # Large files are uploaded in chunks that can be resumed after an interruption
+        self.settings = settings or Settings()
+        self.chunked_upload_threshold = self.settings.get("resources", "chunked_upload_threshold") or 20 * 1024 ** 2
+        self.upload_chunk_size = self.settings.get("resources", "upload_chunk_size") or 8 * 1024 ** 2
+        self.upload_session_max_age = self.settings.get("resources", "upload_session_max_age")
+        self.upload_sessions = UploadSessions(
+            self.settings.path("resources", "upload_sessions_path", "data/upload_sessions.sqlite3")
+        )
+        
+        # Content hashes of uploaded files, so the same file is never uploaded twice
+        self.upload_index = UploadIndex(
+            self.settings.path("resources", "upload_index_path", "data/upload_index.sqlite3")
+        )
+        
+        # Most files uploaded at once by upload_files, kept low for the account's rate limits
+        self.max_upload_workers = self.settings.get("resources", "max_upload_workers") or 4
+        
+        # Complete folder listings, so browsing a folder again doesn't use Admin API quota
+        self.listing_cache = LocalCache(
+            self.settings.path("resources", "listing_cache_path", "data/cloudinary_cache.sqlite3")
+        )
+        self.listing_cache_max_age = self.settings.get("resources", "listing_cache_max_age")
+        
+        # Admin API quota, as reported by the last Admin API response
+        self.rate_limit_remaining = None
+        self.rate_limit_reset_at = None
+        self.rate_limit_reserve = self.settings.get("resources", "admin_api_reserve") or 0
+        
+        # Optional downscaling and re-encoding of images before upload
+        self.preprocess_images = bool(self.settings.get("resources", "preprocess_images"))
     
     def initialize(self):
         """Initialize Cloudinary connection"""
@@ -29,6 +82,13 @@ class CloudinaryService:
                 secure=True
             )
             
+            # URLs are built from the cloud name alone, so the builder never touches the SDK config again
+            self.url_builder = CloudinaryUrlBuilder(
+                cloudinary.config().cloud_name,
+                secure=True,
+                max_entries=self.settings.get("resources", "url_cache_size") or 4096
+            )
+            
             self.initialized = True
             print("Cloudinary service initialized successfully")
             
@@ -41,34 +101,85 @@ class CloudinaryService:
         if not self.initialized:
             self.initialize()
     
-    def upload_file(self, file_path, resource_type="auto", folder="general"):
+    def upload_file(self, file_path, resource_type="auto", folder="general", progress_callback=None,
+                    cancel_event=None, find_existing=None, preprocess=None):
         """Upload a file to Cloudinary
         
+        The file's SHA-256 is checked against earlier uploads first, and when the
+        same content was already uploaded its asset is reused instead. The hash is
+        returned in the result under "sha256" so it can be stored with the resource.
+        Images are only preprocessed when their content is new, and the upload is
+        indexed by the hash of the original file.
+        
+        Files larger than the chunked upload threshold are uploaded in chunks, and
+        an interrupted upload continues where it stopped the next time the same
+        file is uploaded to the same folder.
+        
         Args:
             file_path (str): Local file path
             resource_type (str): Type of resource (auto, image, raw, video)
             folder (str): Folder to upload to
+            progress_callback (callable, optional): Called with (bytes_sent, total_bytes) as the upload progresses
+            cancel_event (threading.Event, optional): Stops a chunked upload before its next chunk when set
+            find_existing (callable, optional): Called with the SHA-256 when the local index has no match.
+                Returns the Cloudinary data of a stored resource with the same content, or None.
+            preprocess (bool, optional): Downscale and re-encode images first. Defaults to the preprocess_images setting.
             
         Returns:
-            dict: Upload result with URLs and metadata, or None if failed
+            dict: Upload result with URLs and metadata, or None if failed or cancelled.
+                "existing" is True when an earlier upload was reused.
         """
         self._ensure_initialized()
         
+        prepare = self.prepare_image if self._should_preprocess(resource_type, preprocess) else None
+        return self._upload_file(file_path, resource_type, folder, progress_callback, cancel_event, find_existing,
+                                 prepare)
+    
+    def _upload_file(self, file_path, resource_type, folder, progress_callback=None, cancel_event=None,
+                     find_existing=None, prepare=None):
+        """Upload a file, see upload_file
+        
+        Args:
+            prepare (callable, optional): Called with the file path after the duplicate check,
+                returns the path of the file to upload instead. Defaults to uploading the file as is.
+        """
         try:
             # Verify file exists
             if not Path(file_path).exists():
                 print(f"File not found: {file_path}")
                 return None
-                
-            # Upload file to Cloudinary
-            result = cloudinary.uploader.upload(
-                file_path,
-                resource_type=resource_type,
-                folder=folder,
-                use_filename=True,
-                unique_filename=True,
-                overwrite=True
-            )
+            
+            sha256 = self.upload_index.hash_file(file_path)
+            existing = self._find_upload(sha256, resource_type, find_existing)
+            if existing:
+                if progress_callback:
+                    size = os.path.getsize(file_path)
+                    progress_callback(size, size)
+                return dict(existing, sha256=sha256, existing=True)
+            
+            upload_path = prepare(file_path) if prepare else file_path
+            size = os.path.getsize(upload_path)
+            
+            options = {
+                'resource_type': resource_type,
+                'folder': folder,
+                'use_filename': True,
+                'unique_filename': True,
+                'overwrite': True
+            }
+            
+            if size > self.chunked_upload_threshold:
+                result = self._upload_chunked(upload_path, size, options, progress_callback, cancel_event)
+            else:
+                # Upload file to Cloudinary
+                result = cloudinary.uploader.upload(upload_path, **options)
+                if progress_callback:
+                    progress_callback(size, size)
+            
+            if result:
+                result["sha256"] = sha256
+                self.upload_index.add(sha256, result)
+                self.listing_cache.invalidate_queries("cloudinary")
             
             return result
         except Exception as e:
@@ -76,52 +187,256 @@ class CloudinaryService:
         
         return None
     
-    def get_resource_url(self, public_id, resource_type="image", transformation=None):
+    def _find_upload(self, sha256, resource_type, find_existing=None):
+        """Find an earlier upload with the same content hash
+        
+        Returns:
+            dict: Upload result or stored Cloudinary data to reuse, or None
+        """
+        existing = self.upload_index.find(sha256, resource_type)
+        if existing or not find_existing:
+            return existing
+        
+        existing = find_existing(sha256)
+        if not existing or not existing.get("public_id"):
+            return None
+        if resource_type != "auto" and existing.get("resource_type") not in (None, resource_type):
+            return None
+        
+        # Remember it, so the next import of this file doesn't have to ask
+        self.upload_index.add(sha256, existing)
+        return existing
+    
+    def _upload_chunked(self, file_path, size, options, progress_callback=None, cancel_event=None):
+        """Upload a file in chunks with cloudinary.uploader.upload_large_part, as upload_large does
+        
+        All chunks share an X-Unique-Upload-Id. Unlike upload_large, the id and
+        the number of bytes sent are saved after every chunk so the upload can
+        be resumed, and progress and cancellation are checked between chunks.
+        """
+        destination = f"{options['resource_type']}/{options['folder']}"
+        session = self.upload_sessions.get("cloudinary", file_path, destination, self.upload_session_max_age)
+        
+        resuming = session is not None
+        if resuming:
+            offset, state = session
+        else:
+            offset, state = 0, {"upload_id": cloudinary.utils.random_public_id()}
+        
+        if progress_callback:
+            progress_callback(offset, size)
+        
+        result = None
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            while offset < size:
+                if cancel_event and cancel_event.is_set():
+                    # The session is saved, so uploading the file again resumes here
+                    print(f"Upload of {file_path} cancelled at {offset} of {size} bytes")
+                    return None
+                
+                chunk = f.read(self.upload_chunk_size)
+                headers = {
+                    "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}",
+                    "X-Unique-Upload-Id": state["upload_id"]
+                }
+                part_options = dict(options, public_id=state["public_id"]) if state.get("public_id") else options
+                
+                try:
+                    result = cloudinary.uploader.upload_large_part(
+                        (Path(file_path).name, chunk), http_headers=headers, **part_options
+                    )
+                except cloudinary.exceptions.Error:
+                    if not resuming:
+                        raise
+                    # The saved upload may no longer be known to Cloudinary, start over
+                    print(f"Could not resume upload of {file_path}, restarting")
+                    self.upload_sessions.remove("cloudinary", file_path, destination)
+                    return self._upload_chunked(file_path, size, options, progress_callback, cancel_event)
+                
+                offset += len(chunk)
+                resuming = False
+                if result.get("public_id"):
+                    state["public_id"] = result["public_id"]
+                if offset < size:
+                    self.upload_sessions.save("cloudinary", file_path, destination, offset, state)
+                
+                if progress_callback:
+                    progress_callback(offset, size)
+        
+        self.upload_sessions.remove("cloudinary", file_path, destination)
+        return result
+    
+    def upload_files(self, file_paths, resource_type="auto", folder="general", max_workers=None,
+                     progress_callback=None, cancel_event=None, find_existing=None, preprocess=None):
+        """Upload many files to Cloudinary concurrently
+        
+        Files are uploaded by a bounded pool of worker threads and results are
+        yielded as each upload finishes, not in the order the files were given.
+        Images being preprocessed are re-encoded in a process pool using every
+        core, once their content is known to be new.
+        
+        Args:
+            file_paths (list): Local file paths
+            resource_type (str): Type of resource (auto, image, raw, video)
+            folder (str): Folder to upload to
+            max_workers (int, optional): Number of concurrent uploads, capped at the max_upload_workers setting
+            progress_callback (callable, optional): Called from worker threads with (file_path, bytes_sent, total_bytes)
+            cancel_event (threading.Event, optional): When set, files not started yet are skipped
+                and chunked uploads stop before their next chunk
+            find_existing (callable, optional): Looks up stored resources by SHA-256, see upload_file
+            preprocess (bool, optional): Downscale and re-encode images first. Defaults to the preprocess_images setting.
+            
+        Yields:
+            tuple: (file_path, upload result dict or None if failed or cancelled)
+        """
+        self._ensure_initialized()
+        
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        
+        cancel_event = cancel_event or threading.Event()
+        workers = min(max_workers or self.max_upload_workers, self.max_upload_workers, len(file_paths))
+        
+        # Image encoding is CPU bound, so it gets its own process pool
+        process_pool = None
+        prepare = None
+        if self._should_preprocess(resource_type, preprocess):
+            process_pool = ProcessPoolExecutor()
+            prepare = lambda file_path: self.prepare_image(file_path, process_pool)
+        
+        def upload(file_path):
+            if cancel_event.is_set():
+                return None
+            
+            file_progress = None
+            if progress_callback:
+                def file_progress(bytes_sent, total_bytes):
+                    progress_callback(file_path, bytes_sent, total_bytes)
+            
+            return self._upload_file(file_path, resource_type, folder, file_progress, cancel_event, find_existing,
+                                     prepare)
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cloudinary-upload")
+        futures = {executor.submit(upload, file_path): file_path for file_path in file_paths}
+        
+        try:
+            for future in as_completed(futures):
+                if future.cancelled():
+                    yield futures[future], None
+                else:
+                    yield futures[future], future.result()
+        finally:
+            # The caller stopped iterating early: don't start or continue the remaining files
+            if not all(future.done() for future in futures):
+                cancel_event.set()
+                for future in futures:
+                    future.cancel()
+            executor.shutdown(wait=False)
+            if process_pool:
+                process_pool.shutdown(wait=False)
+    
+    def prepare_image(self, file_path, executor=None):
+        """Downscale, strip metadata from and re-encode an image using the preprocessing settings
+        
+        Args:
+            file_path (str): Local image path
+            executor (Executor, optional): Pool to encode the image in. Defaults to the calling thread.
+            
+        Returns:
+            str: Path of the file to upload, the original if preprocessing didn't make it smaller
+        """
+        try:
+            if executor:
+                return executor.submit(preprocess_image, file_path, *self._preprocess_options()).result()["path"]
+            return preprocess_image(file_path, *self._preprocess_options())["path"]
+        except Exception as e:
+            print(f"Error preprocessing image {file_path}, uploading the original: {e}")
+        
+        return file_path
+    
+    def _preprocess_options(self):
+        """Get the preprocess_image arguments after the file path from the settings"""
+        return (
+            str(self.settings.path("resources", "preprocessed_path", "data/preprocessed")),
+            self.settings.get("resources", "preprocess_max_edge") or 2560,
+            self.settings.get("resources", "preprocess_format") or "WEBP",
+            self.settings.get("resources", "preprocess_quality") or 82,
+        )
+    
+    def _should_preprocess(self, resource_type, preprocess=None):
+        """Check whether files uploaded as resource_type should be preprocessed"""
+        if preprocess is None:
+            preprocess = self.preprocess_images
+        return preprocess and resource_type in ("image", "auto")
+    
+    def get_resource_url(self, public_id, resource_type="image", transformation=None, version=None):
         """Get URL for a Cloudinary resource
         
+        URLs are memoized, so asking for the same URL again costs a dictionary lookup.
+        
         Args:
             public_id (str): Public ID of the resource
             resource_type (str): Type of resource
             transformation (dict, optional): Transformation parameters
+            version (str, optional): Resource version from the upload result
             
         Returns:
             str: URL of the resource
         """
-        self._ensure_initialized()
+        if self.url_builder is None:
+            self._ensure_initialized()
         
         try:
-            # Build URL for resource
-            if resource_type == "image":
-                # For images, we can apply transformations
-                url = cloudinary.CloudinaryImage(public_id).build_url(transformation=transformation)
-            else:
-                # For other resources, just get the URL
-                url = cloudinary.utils.cloudinary_url(public_id)[0]
-            
-            return url
+            return self.url_builder.build(public_id, version, transformation, resource_type)
         except Exception as e:
             print(f"Error getting URL for resource {public_id}: {e}")
         
         return None
     
-    def get_thumbnail_url(self, public_id, width=200, height=200):
+    def get_thumbnail_url(self, public_id, width=200, height=200, version=None):
         """Get a thumbnail URL for an image resource
         
         Args:
             public_id (str): Public ID of the resource
             width (int): Thumbnail width
             height (int): Thumbnail height
+            version (str, optional): Resource version from the upload result
             
         Returns:
             str: URL of the thumbnail
         """
-        transformation = {
+        return self.get_resource_url(public_id, transformation=self._thumbnail_transformation(width, height),
+                                     version=version)
+    
+    def get_thumbnail_urls(self, resources, width=200, height=200):
+        """Build the thumbnail URLs of many resources at once
+        
+        Meant to be called when a page of the resource browser is loaded, so
+        drawing the grid only looks URLs up.
+        
+        Args:
+            resources (list): Resource objects
+            width (int): Thumbnail width
+            height (int): Thumbnail height
+            
+        Returns:
+            dict: Resource ID to thumbnail URL, for resources stored in Cloudinary
+        """
+        if self.url_builder is None:
+            self._ensure_initialized()
+        
+        return self.url_builder.build_for_resources(resources, self._thumbnail_transformation(width, height))
+    
+    @staticmethod
+    def _thumbnail_transformation(width, height):
+        """Get the transformation parameters of a thumbnail"""
+        return {
             'width': width,
             'height': height,
             'crop': 'fill'
         }
-        
-        return self.get_resource_url(public_id, transformation=transformation)
     
     def delete_resource(self, public_id, resource_type="image"):
         """Delete a resource from Cloudinary
@@ -138,12 +453,118 @@ class CloudinaryService:
         try:
             # Delete resource from Cloudinary
             result = cloudinary.uploader.destroy(public_id, resource_type=resource_type)
-            return result.get('result') == 'ok'
+            if result.get('result') == 'ok':
+                self.upload_index.remove_public_id(public_id)
+                self.listing_cache.invalidate_queries("cloudinary")
+                return True
+            return False
         except Exception as e:
             print(f"Error deleting resource {public_id}: {e}")
         
         return False
     
+    def delete_resources(self, public_ids, resource_type="image", max_wait=None):
+        """Delete many resources from Cloudinary, up to 100 per Admin API call
+        
+        Calls are spaced out so the hourly Admin API quota never drops below the
+        admin_api_reserve setting. When the quota is used up, the calls wait for
+        it to reset.
+        
+        Args:
+            public_ids (list): Public IDs of the resources
+            resource_type (str): Type of the resources
+            max_wait (float, optional): Longest time in seconds to wait for the quota.
+                IDs left when it runs out are reported as "deferred". Defaults to None (no limit).
+            
+        Returns:
+            dict: Public ID to "deleted", "not_found", "deferred" or "error"
+        """
+        self._ensure_initialized()
+        
+        public_ids = list(public_ids)
+        statuses = {}
+        deadline = None if max_wait is None else time.time() + max_wait
+        
+        for start in range(0, len(public_ids), MAX_BULK_DELETE):
+            batch = public_ids[start:start + MAX_BULK_DELETE]
+            try:
+                result = self._call_admin_api(
+                    cloudinary.api.delete_resources, batch, resource_type=resource_type, deadline=deadline
+                )
+            except TimeoutError:
+                statuses.update((public_id, "deferred") for public_id in public_ids[start:])
+                break
+            except Exception as e:
+                print(f"Error deleting {len(batch)} resources: {e}")
+                statuses.update((public_id, "error") for public_id in batch)
+                continue
+            
+            deleted = result.get('deleted', {})
+            statuses.update((public_id, deleted.get(public_id, "error")) for public_id in batch)
+        
+        removed = [public_id for public_id, status in statuses.items() if status in ("deleted", "not_found")]
+        for public_id in removed:
+            self.upload_index.remove_public_id(public_id)
+        if removed:
+            self.listing_cache.invalidate_queries("cloudinary")
+        
+        return statuses
+    
+    def _call_admin_api(self, method, *args, deadline=None, wait=True, **kwargs):
+        """Call an Admin API method and record the remaining hourly quota
+        
+        Args:
+            method (callable): cloudinary.api function
+            deadline (float, optional): time.time() after which to stop waiting and raise TimeoutError
+            wait (bool, optional): Wait for the quota to reset when it is down to the reserve.
+                False for interactive calls, which only record the quota. Defaults to True.
+            
+        Returns:
+            The Admin API response
+        """
+        for attempt in range(3):
+            if wait:
+                self._wait_for_quota(deadline)
+            try:
+                result = method(*args, **kwargs)
+            except cloudinary.exceptions.RateLimited:
+                if not wait:
+                    raise
+                # Someone else used the quota; wait for the reset and try again
+                print("Cloudinary Admin API rate limit reached, waiting for it to reset")
+                self.rate_limit_remaining = 0
+                if self.rate_limit_reset_at is None or self.rate_limit_reset_at <= time.time():
+                    self.rate_limit_reset_at = time.time() + 60 * 2 ** attempt
+                continue
+            
+            if getattr(result, 'rate_limit_remaining', None) is not None:
+                self.rate_limit_remaining = result.rate_limit_remaining
+            if getattr(result, 'rate_limit_reset_at', None):
+                # Parsed from an HTTP date, as a time tuple in UTC
+                self.rate_limit_reset_at = calendar.timegm(result.rate_limit_reset_at)
+            return result
+        
+        raise cloudinary.exceptions.RateLimited("Admin API rate limit still exceeded after waiting")
+    
+    def _wait_for_quota(self, deadline=None):
+        """Sleep until the Admin API quota resets if it is down to the reserve"""
+        if self.rate_limit_remaining is None or self.rate_limit_remaining > self.rate_limit_reserve:
+            return
+        if self.rate_limit_reset_at is None:
+            return
+        
+        if self.rate_limit_reset_at <= time.time():
+            self.rate_limit_remaining = None
+            return
+        
+        if deadline is not None and self.rate_limit_reset_at > deadline:
+            raise TimeoutError("Cloudinary Admin API quota resets after the deadline")
+        
+        delay = self.rate_limit_reset_at - time.time()
+        print(f"Cloudinary Admin API quota is low, waiting {delay:.0f} s for it to reset")
+        time.sleep(delay)
+        self.rate_limit_remaining = None
+    
     def create_folder(self, folder_path):
         """Create a folder in Cloudinary
         
@@ -178,23 +599,97 @@ class CloudinaryService:
         Returns:
             list: List of resources
         """
+        try:
+            return list(self.iter_resources(folder, resource_type, max_results, raise_errors=True))
+        except Exception as e:
+            print(f"Error listing resources: {e}")
+        
+        return []
+    
+    def iter_resources(self, folder=None, resource_type="image", max_results=None, start_at=None,
+                       page_size=500, max_age=None, raise_errors=False):
+        """List resources in Cloudinary, following next_cursor across pages
+        
+        This is a generator, so pages are only requested as the caller iterates.
+        Complete listings are cached locally and served from the cache until they
+        are older than max_age, or until a file is uploaded or deleted.
+        
+        start_at filters on created_at, the only time the Admin API can list by.
+        Assets changed after they were created, e.g. retagged, are not returned
+        again; list without start_at to pick those changes up.
+        
+        Args:
+            folder (str, optional): Folder to list resources from
+            resource_type (str): Type of resources to list
+            max_results (int, optional): Stop after this many resources. Defaults to None (all of them).
+            start_at (datetime or str, optional): Only resources created at or after this time,
+                listed oldest first. Defaults to None.
+            page_size (int): Resources requested per Admin API call, at most 500
+            max_age (float, optional): Seconds a cached listing is used for. Defaults to the
+                listing_cache_max_age setting; 0 always asks Cloudinary.
+            raise_errors (bool, optional): Raise Admin API errors instead of printing them and
+                ending the listing early. Defaults to False.
+            
+        Yields:
+            dict: Resource details as returned by the Admin API
+        """
+        if isinstance(start_at, datetime.datetime):
+            if start_at.tzinfo:
+                start_at = start_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            start_at = start_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        
+        collection = f"cloudinary:{resource_type}"
+        key = f"cloudinary?type={resource_type}&prefix={folder or ''}&start_at={start_at or ''}"
+        if max_age is None:
+            max_age = self.listing_cache_max_age
+        
+        if max_age != 0:
+            cached = self.listing_cache.get_query(key, max_age)
+            if cached is not None:
+                for _, resource in cached[:max_results]:
+                    yield resource
+                return
+        
         self._ensure_initialized()
         
+        # Set up parameters
+        params = {
+            'resource_type': resource_type,
+            'max_results': min(page_size, 500),
+            'type': 'upload'
+        }
+        
+        if folder:
+            params['prefix'] = folder
+        if start_at:
+            params['start_at'] = start_at
+            params['direction'] = 'asc'
+        
+        listed = []
         try:
-            # Set up parameters
-            params = {
-                'resource_type': resource_type,
-                'max_results': max_results,
-                'type': 'upload'
-            }
-            
-            if folder:
-                params['prefix'] = folder
-            
-            # Get resources from Cloudinary
-            result = cloudinary.api.resources(**params)
-            return result.get('resources', [])
+            while True:
+                # Get the next page of resources from Cloudinary
+                result = self._call_admin_api(cloudinary.api.resources, wait=False, **params)
+                
+                for resource in result.get('resources', []):
+                    # Cloudinary may ignore start_at together with a prefix, so filter here too
+                    if start_at and resource.get('created_at', '') < start_at:
+                        continue
+                    
+                    listed.append((resource['public_id'], resource))
+                    yield resource
+                    if max_results is not None and len(listed) >= max_results:
+                        # Incomplete listing, not cached
+                        return
+                
+                if not result.get('next_cursor'):
+                    break
+                params['next_cursor'] = result['next_cursor']
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error listing resources: {e}")
+            return
         
-        return []
+        self.listing_cache.put_query(collection, key, listed)
+    
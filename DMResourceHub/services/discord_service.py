@@ -1,20 +1,47 @@
 import os
+import time
+import random
+import uuid
 import asyncio
 import threading
+import concurrent.futures
+from collections import OrderedDict
 import discord
 from discord import File
 from dotenv import load_dotenv
 from pathlib import Path
 
+from config.settings import Settings
+from utils.send_queue import SendQueue
+
+# Seconds delivered outbox messages are kept, so their keys still catch repeated shares
+OUTBOX_RETENTION = 7 * 24 * 3600
+
+# Longest time the outbox drain loop sleeps when nothing is due
+OUTBOX_IDLE_WAIT = 60
+
+# Returned by the send methods when a message wasn't delivered yet but is kept in the outbox
+QUEUED = "queued"
+
 class DiscordService:
     """Service for interacting with Discord API"""
     
-    def __init__(self):
-        """Initialize the Discord service"""
+    def __init__(self, settings=None):
+        """Initialize the Discord service
+        
+        Args:
+            settings (Settings, optional): Application settings. Defaults to a new Settings instance.
+        """
+        self.settings = settings or Settings()
         self.client = None
         self.token = None
         self.initialized = False
-        self.connected = False
+        
+        # Set while the gateway session is ready, by on_ready and on_resumed
+        self._ready = threading.Event()
+        
+        # Called with "connected", "reconnecting" or "disconnected" when the connection changes
+        self._status_callbacks = []
         
         # Lock for thread safety
         self._lock = threading.Lock()
@@ -22,6 +49,38 @@ class DiscordService:
         # Store the event loop for async operations
         self.loop = None
         self.thread = None
+        
+        # Most sends in flight at once when sharing to many recipients
+        self.max_concurrent_sends = self.settings.get("discord", "max_concurrent_sends") or 5
+        
+        # Upload a shared file once and send the other recipients its link
+        reuse_attachments = self.settings.get("discord", "reuse_attachments")
+        self.reuse_attachments = True if reuse_attachments is None else reuse_attachments
+        self.attachment_channel = self.settings.get("discord", "attachment_channel") or None
+        
+        # Text channels by guild ID, kept up to date by gateway events
+        self._channels = {}
+        
+        # Users fetched over REST, for users the client doesn't cache. Only used on the Discord thread.
+        self._users = OrderedDict()
+        self.user_cache_size = self.settings.get("discord", "user_cache_size") or 256
+        
+        # Durable outbox, drained on the Discord thread while connected
+        self.outbox = SendQueue(self.settings.path("discord", "outbox_path", "data/discord_outbox.sqlite3"))
+        self.outbox_max_attempts = self.settings.get("discord", "outbox_max_attempts") or 8
+        self.outbox_retry_delay = self.settings.get("discord", "outbox_retry_delay") or 2
+        self.outbox_max_retry_delay = self.settings.get("discord", "outbox_max_retry_delay") or 300
+        self._outbox_wakeup = None
+        self._outbox_task = None
+        self._online = None
+        
+        # Futures resolved when an outbox message is sent or given up on, by key, for the send methods
+        self._outbox_waiters = {}
+    
+    @property
+    def connected(self):
+        """Whether the bot is connected and ready to send"""
+        return self._ready.is_set()
     
     def initialize(self):
         """Initialize Discord connection"""
@@ -41,13 +100,64 @@ class DiscordService:
             intents = discord.Intents.default()
             intents.message_content = True
             self.client = discord.Client(intents=intents)
+            self._users.clear()
             
             # Set up client event handlers
             @self.client.event
             async def on_ready():
                 print(f"Discord bot connected as {self.client.user}")
                 with self._lock:
-                    self.connected = True
+                    self._channels.clear()
+                for guild in self.client.guilds:
+                    self._index_guild(guild)
+                
+                # on_ready also fires after a reconnect, so only start the drain loop once
+                if self._outbox_task is None or self._outbox_task.done():
+                    self._outbox_wakeup = asyncio.Event()
+                    self._online = asyncio.Event()
+                    self._outbox_task = asyncio.create_task(self._drain_outbox())
+                self._set_online(True)
+            
+            # discord.py reconnects by itself; these track the session in between
+            @self.client.event
+            async def on_disconnect():
+                if self.connected:
+                    print("Discord connection lost, reconnecting")
+                self._set_online(False)
+            
+            @self.client.event
+            async def on_resumed():
+                print("Discord connection resumed")
+                self._set_online(True)
+            
+            @self.client.event
+            async def on_guild_join(guild):
+                self._index_guild(guild)
+            
+            @self.client.event
+            async def on_guild_available(guild):
+                self._index_guild(guild)
+            
+            @self.client.event
+            async def on_guild_update(before, after):
+                self._index_guild(after)
+            
+            @self.client.event
+            async def on_guild_remove(guild):
+                with self._lock:
+                    self._channels.pop(guild.id, None)
+            
+            @self.client.event
+            async def on_guild_channel_create(channel):
+                self._index_guild(channel.guild)
+            
+            @self.client.event
+            async def on_guild_channel_delete(channel):
+                self._index_guild(channel.guild)
+            
+            @self.client.event
+            async def on_guild_channel_update(before, after):
+                self._index_guild(after.guild)
             
             # Set initialized flag
             self.initialized = True
@@ -57,38 +167,102 @@ class DiscordService:
             print(f"Error initializing Discord service: {e}")
             raise
     
-    def connect(self):
-        """Connect to Discord in a separate thread
+    def _set_online(self, online):
+        """Record whether the gateway session is ready, on the Discord thread"""
+        if online:
+            self._ready.set()
+        else:
+            self._ready.clear()
+        if self._online is not None:
+            if online:
+                self._online.set()
+            else:
+                self._online.clear()
+        self._notify_status("connected" if online else "reconnecting")
+    
+    def add_status_callback(self, callback):
+        """Register a function to call when the connection changes
         
-        Returns:
-            bool: True if connection started, False otherwise
+        Args:
+            callback (callable): Called with "connected", "reconnecting" (discord.py is
+                reconnecting by itself) or "disconnected" (the client stopped, e.g. after
+                disconnect or a failed login). It runs on the Discord thread; wrap it with
+                tk_callback to run it on the Tk thread.
         """
-        if not self.initialized:
-            self.initialize()
+        with self._lock:
+            self._status_callbacks.append(callback)
+    
+    def _notify_status(self, status):
+        """Call the status callbacks"""
+        with self._lock:
+            callbacks = list(self._status_callbacks)
+        for callback in callbacks:
+            try:
+                callback(status)
+            except Exception as e:
+                print(f"Error in Discord status callback: {e}")
+    
+    def connect(self, wait=True, timeout=10.0):
+        """Connect to Discord in a separate thread
         
-        if self.connected:
-            return True
+        Waiting ends as soon as on_ready fires. If the timeout passes first, the
+        client keeps connecting in the background and connected becomes True
+        when it is ready.
         
+        Args:
+            wait (bool, optional): Wait for the connection to be ready. UI code should pass False
+                so it never blocks. Defaults to True.
+            timeout (float, optional): Longest time in seconds to wait. Defaults to 10.0.
+        
+        Returns:
+            bool: True if connected, or if the connection started when not waiting; False otherwise
+        """
         try:
-            # Start the client in a separate thread
-            self.thread = threading.Thread(target=self._run_discord_client)
-            self.thread.daemon = True
-            self.thread.start()
+            # A closed client can't be started again, so make a new one
+            if self.initialized and self.client.is_closed():
+                self.initialized = False
+            if not self.initialized:
+                self.initialize()
             
-            # Give it a moment to connect
-            for _ in range(10):
-                with self._lock:
-                    if self.connected:
-                        return True
-                # Wait a bit and check again
-                threading.Event().wait(0.5)
-            
-            print("Discord connection timeout")
-            return False
+            with self._lock:
+                if self.thread is None or not self.thread.is_alive():
+                    # Start the client in a separate thread
+                    self.thread = threading.Thread(target=self._run_discord_client)
+                    self.thread.daemon = True
+                    self.thread.start()
             
         except Exception as e:
             print(f"Error connecting to Discord: {e}")
             return False
+        
+        if not wait:
+            return True
+        if self._ready.wait(timeout):
+            return True
+        
+        print("Discord connection timeout, still connecting in the background")
+        return False
+    
+    def connect_in_background(self):
+        """Start connecting at app startup if discord.auto_connect is set, without blocking
+        
+        Returns:
+            bool: True if the connection started
+        """
+        if not self.settings.get("discord", "auto_connect"):
+            return False
+        return self.connect(wait=False)
+    
+    def wait_until_ready(self, timeout=None):
+        """Wait for the connection to be ready, e.g. from a worker thread
+        
+        Args:
+            timeout (float, optional): Longest time in seconds to wait. Defaults to no limit.
+        
+        Returns:
+            bool: True if connected
+        """
+        return self._ready.wait(timeout)
     
     def _run_discord_client(self):
         """Run the Discord client in a new event loop"""
@@ -98,13 +272,34 @@ class DiscordService:
             asyncio.set_event_loop(self.loop)
             
             # Run the client
-            self.loop.run_until_complete(self.client.start(self.token))
+            self.loop.run_until_complete(self._start_client())
         except Exception as e:
             print(f"Error in Discord client thread: {e}")
         finally:
+            self._ready.clear()
             # Clean up
             if self.loop:
                 self.loop.close()
+            self._notify_status("disconnected")
+    
+    async def _start_client(self):
+        """Start the client, retrying while Discord can't be reached
+        
+        Once logged in, discord.py reconnects and resumes the session by itself;
+        this only covers failing to reach Discord at all, e.g. starting offline.
+        """
+        delay = 1
+        while not self.client.is_closed():
+            try:
+                await self.client.start(self.token)
+                return
+            except discord.LoginFailure:
+                # A bad token won't get better by retrying
+                raise
+            except Exception as e:
+                print(f"Could not connect to Discord, retrying in {delay} s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
     
     def disconnect(self):
         """Disconnect from Discord
@@ -112,20 +307,21 @@ class DiscordService:
         Returns:
             bool: True if disconnected, False otherwise
         """
-        if not self.connected:
+        if self.thread is None or not self.thread.is_alive():
             return True
         
         try:
             # Schedule the client to close
             if self.loop:
+                if self._outbox_task:
+                    self.loop.call_soon_threadsafe(self._outbox_task.cancel)
                 asyncio.run_coroutine_threadsafe(self.client.close(), self.loop)
             
             # Wait for the thread to finish
             if self.thread:
                 self.thread.join(timeout=5.0)
             
-            with self._lock:
-                self.connected = False
+            self._ready.clear()
             
             return True
             
@@ -136,6 +332,9 @@ class DiscordService:
     def get_channels(self):
         """Get a list of available text channels
         
+        The list comes from the channel directory, so it is returned right away
+        without waiting on the Discord thread.
+        
         Returns:
             list: List of (channel_id, channel_name) tuples
         """
@@ -143,26 +342,36 @@ class DiscordService:
             print("Not connected to Discord")
             return []
         
-        channels = []
+        with self._lock:
+            return [channel for channels in self._channels.values() for channel in channels]
+    
+    def _index_guild(self, guild):
+        """Update the channel directory entries of a guild from the client's cache"""
+        channels = [(str(channel.id), f"#{channel.name} ({guild.name})") for channel in guild.text_channels]
+        with self._lock:
+            self._channels[guild.id] = channels
+    
+    async def _get_user(self, user_id):
+        """Get a user, asking the Discord API only for users that aren't cached
         
-        try:
-            # Create a future to hold the result
-            future = asyncio.run_coroutine_threadsafe(self._get_channels_async(), self.loop)
-            # Wait for the result with a timeout
-            channels = future.result(timeout=5.0)
+        Fetched users are kept in a bounded LRU. Reusing the same User object
+        also reuses its DM channel, so repeat DMs don't have to open it again.
+        
+        Args:
+            user_id (int): Discord user ID
             
-        except Exception as e:
-            print(f"Error getting Discord channels: {e}")
+        Returns:
+            discord.User: The user
+        """
+        user = self.client.get_user(user_id) or self._users.get(user_id)
+        if user is None:
+            user = await self.client.fetch_user(user_id)
         
-        return channels
-    
-    async def _get_channels_async(self):
-        """Async method to get channels"""
-        channels = []
-        for guild in self.client.guilds:
-            for channel in guild.text_channels:
-                channels.append((str(channel.id), f"#{channel.name} ({guild.name})"))
-        return channels
+        self._users[user_id] = user
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.user_cache_size:
+            self._users.popitem(last=False)
+        return user
     
     def send_message(self, channel_id, content, file_path=None):
         """Send a message to a Discord channel
@@ -173,24 +382,24 @@ class DiscordService:
             file_path (str, optional): Path to file to attach. Defaults to None.
             
         Returns:
-            bool: True if successful, False otherwise
+            bool or str: True if sent, QUEUED if it will be retried from the outbox, False if it can't be sent
         """
-        if not self.connected:
-            print("Not connected to Discord")
-            return False
+        return self._send_queued("channel", channel_id, content, file_path=file_path)
+    
+    def submit_message(self, channel_id, content, file_path=None, callback=None):
+        """Send a message to a Discord channel without waiting for it
         
-        try:
-            # Create a future to hold the result
-            future = asyncio.run_coroutine_threadsafe(
-                self._send_message_async(channel_id, content, file_path), 
-                self.loop
-            )
-            # Wait for the result with a timeout
-            return future.result(timeout=10.0)
+        Args:
+            channel_id (str): Discord channel ID
+            content (str): Message content
+            file_path (str, optional): Path to file to attach. Defaults to None.
+            callback (callable, optional): Called with True or False when the send finishes,
+                on the Discord thread; wrap it with tk_callback to run it on the Tk thread.
             
-        except Exception as e:
-            print(f"Error sending Discord message: {e}")
-            return False
+        Returns:
+            concurrent.futures.Future: Resolves to True if successful, False otherwise
+        """
+        return self._submit(self._send_message_async, channel_id, content, file_path, callback=callback)
     
     async def _send_message_async(self, channel_id, content, file_path=None):
         """Async method to send a message"""
@@ -223,24 +432,24 @@ class DiscordService:
             file_path (str, optional): Path to file to attach. Defaults to None.
             
         Returns:
-            bool: True if successful, False otherwise
+            bool or str: True if sent, QUEUED if it will be retried from the outbox, False if it can't be sent
         """
-        if not self.connected:
-            print("Not connected to Discord")
-            return False
+        return self._send_queued("channel", channel_id, content, resource, file_path)
+    
+    def submit_resource(self, channel_id, content, resource=None, file_path=None, callback=None):
+        """Send a resource to a Discord channel without waiting for it
         
-        try:
-            # Create a future to hold the result
-            future = asyncio.run_coroutine_threadsafe(
-                self._send_resource_async(channel_id, content, resource, file_path), 
-                self.loop
-            )
-            # Wait for the result with a timeout
-            return future.result(timeout=10.0)
+        Args:
+            channel_id (str): Discord channel ID
+            content (str): Message content
+            resource (Resource, optional): Resource object with Cloudinary data. Defaults to None.
+            file_path (str, optional): Path to file to attach. Defaults to None.
+            callback (callable, optional): Called with True or False when the send finishes, see submit_message.
             
-        except Exception as e:
-            print(f"Error sending Discord resource: {e}")
-            return False
+        Returns:
+            concurrent.futures.Future: Resolves to True if successful, False otherwise
+        """
+        return self._submit(self._send_resource_async, channel_id, content, resource, file_path, callback=callback)
     
     async def _send_resource_async(self, channel_id, content, resource=None, file_path=None):
         """Async method to send a resource message with optional resource or file"""
@@ -251,14 +460,10 @@ class DiscordService:
                 print(f"Channel {channel_id} not found")
                 return False
     
-            message_content = content
-    
             # If we have a resource with Cloudinary URL, add it to the message
-            if resource and resource.cloudinary_data.get("secure_url"):
-                message_content += f"\n{resource.cloudinary_data['secure_url']}"
-        
+            if self._has_url(resource):
                 # Send message with URL
-                await channel.send(content=message_content)
+                await channel.send(content=self._resource_message(content, resource))
                 return True
     
             # If we have a file path instead, send as attachment
@@ -274,39 +479,202 @@ class DiscordService:
             print(f"Error in _send_resource_async: {e}")
             return False
     
-    def send_direct_message(self, user_id, content, file_path=None):
-        """Send a direct message to a Discord user
+    @staticmethod
+    def _has_url(resource):
+        """Check whether a resource can be shared as a Cloudinary link"""
+        return bool(resource and resource.cloudinary_data.get("secure_url"))
+    
+    @staticmethod
+    def _resource_message(content, resource):
+        """Add a resource's Cloudinary link to a message"""
+        return f"{content}\n{resource.cloudinary_data['secure_url']}"
+    
+    def share(self, content, resource=None, file_path=None, channel_ids=(), user_ids=(), callback=None):
+        """Share a resource with many channels and players at once
+        
+        All sends are scheduled together on the Discord event loop, with at most
+        max_concurrent_sends in flight. discord.py waits out per-route and global
+        rate limits, and the cap keeps a large share from bursting into them.
+        
+        Resources with a Cloudinary URL are shared as that link without uploading
+        anything. Otherwise a file is uploaded only once, to attachment_channel or
+        the first recipient, and the other recipients get a link to the attachment,
+        so sharing a map with six players doesn't upload it six times. Attachment
+        URLs are signed and expire, so only the message is remembered and the URL
+        is fetched from it right before the links are sent.
         
         Args:
-            user_id (str): Discord user ID
             content (str): Message content
-            file_path (str, optional): Path to file to attach. Defaults to None.
+            resource (Resource, optional): Resource object with Cloudinary data. Defaults to None.
+            file_path (str, optional): Path to file to attach when the resource has no URL. Defaults to None.
+            channel_ids (list, optional): Discord channel IDs. Defaults to none.
+            user_ids (list, optional): Discord user IDs to send direct messages to. Defaults to none.
+            callback (callable, optional): Called with the results when every send finished, see submit_message.
             
         Returns:
-            bool: True if successful, False otherwise
+            concurrent.futures.Future: Resolves to a dict of ("channel" or "user", ID) to True or False
         """
-        if not self.connected:
-            print("Not connected to Discord")
-            return False
+        recipients = [("channel", str(channel_id)) for channel_id in channel_ids]
+        recipients += [("user", str(user_id)) for user_id in user_ids]
         
-        try:
-            # Create a future to hold the result
+        failed = {recipient: False for recipient in recipients}
+        
+        if not self.connected or not self.loop:
+            print("Not connected to Discord")
+            future = concurrent.futures.Future()
+            future.set_result(failed)
+        else:
             future = asyncio.run_coroutine_threadsafe(
-                self._send_dm_async(user_id, content, file_path), 
+                self._share_async(content, resource, file_path, recipients),
                 self.loop
             )
-            # Wait for the result with a timeout
-            return future.result(timeout=10.0)
+        
+        if callback:
+            future.add_done_callback(lambda done: callback(self._result_or_false(done) or failed))
+        return future
+    
+    async def _share_async(self, content, resource, file_path, recipients):
+        """Async method to send a resource to many recipients concurrently"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        results = {}
+        
+        # Upload a local file only once; the other recipients get a link to it
+        url = resource.cloudinary_data["secure_url"] if self._has_url(resource) else None
+        upload_to = self._attachment_target(recipients)
+        if (url is None and self.reuse_attachments and upload_to and file_path and Path(file_path).exists()
+                and (len(recipients) > 1 or self.attachment_channel)):
+            uploaded = await self._upload_attachment_once(content, file_path, upload_to, results)
+            if uploaded:
+                url = await self._attachment_url(*uploaded)
+        
+        async def send(kind, target_id):
+            async with semaphore:
+                if url:
+                    message = f"{content}\n{url}"
+                    if kind == "channel":
+                        return await self._send_message_async(target_id, message)
+                    return await self._send_dm_async(target_id, message)
+                if kind == "channel":
+                    return await self._send_resource_async(target_id, content, resource, file_path)
+                return await self._send_dm_async(target_id, content, file_path)
+        
+        remaining = [recipient for recipient in recipients if recipient not in results]
+        sent = await asyncio.gather(*(send(kind, target_id) for kind, target_id in remaining),
+                                    return_exceptions=True)
+        results.update((recipient, result is True) for recipient, result in zip(remaining, sent))
+        return {recipient: results[recipient] for recipient in recipients}
+    
+    def _attachment_target(self, recipients):
+        """Get where a shared file is uploaded once
+        
+        Returns:
+            tuple: ("channel" or "user", ID), which is a recipient unless it is attachment_channel,
+                or None if there are no recipients
+        """
+        if self.attachment_channel:
+            return ("channel", str(self.attachment_channel))
+        return recipients[0] if recipients else None
+    
+    async def _upload_attachment_once(self, content, file_path, upload_to, results):
+        """Upload a shared file once
+        
+        When upload_to is one of the recipients the message carries the content
+        too, and its result is added to results.
+        
+        Args:
+            content (str): Message content
+            file_path (str): Path to the file to upload
+            upload_to (tuple): ("channel" or "user", ID) from _attachment_target
+            results (dict): Results of the sends made here
+            
+        Returns:
+            tuple: (channel ID, message ID) of the message holding the file, or None if the upload failed
+        """
+        try:
+            channel = await self._get_target(*upload_to)
+            if upload_to == ("channel", str(self.attachment_channel)):
+                message = await channel.send(file=File(file_path))
+            else:
+                message = await channel.send(content=content, file=File(file_path))
+                results[upload_to] = True
+            
+            return message.channel.id, message.id
             
         except Exception as e:
-            print(f"Error sending Discord DM: {e}")
-            return False
+            # Every recipient still gets the file as its own attachment
+            print(f"Error uploading shared attachment: {e}")
+            return None
+    
+    async def _attachment_url(self, channel_id, message_id):
+        """Get a current CDN URL of an uploaded attachment
+        
+        The URL is signed and expires, so it is fetched from the message each
+        time it's needed instead of being kept. Works for messages in direct
+        message channels too.
+        
+        Args:
+            channel_id (int): ID of the channel holding the message
+            message_id (int): ID of the message
+            
+        Returns:
+            str: Attachment URL, or None if the message can't be fetched
+        """
+        try:
+            message = await self.client.get_partial_messageable(channel_id).fetch_message(message_id)
+            if message.attachments:
+                return message.attachments[0].url
+        except Exception as e:
+            # Every remaining recipient gets the file as its own attachment
+            print(f"Error fetching shared attachment: {e}")
+        
+        return None
+    
+    async def _get_target(self, kind, target_id):
+        """Get the channel or user to send to
+        
+        Raises:
+            ValueError: If the channel or user doesn't exist
+        """
+        if kind == "channel":
+            target = self.client.get_channel(int(target_id))
+        else:
+            target = await self._get_user(int(target_id))
+        if not target:
+            raise ValueError(f"{kind.capitalize()} {target_id} not found")
+        return target
+    
+    def send_direct_message(self, user_id, content, file_path=None):
+        """Send a direct message to a Discord user
+        
+        Args:
+            user_id (str): Discord user ID
+            content (str): Message content
+            file_path (str, optional): Path to file to attach. Defaults to None.
+            
+        Returns:
+            bool or str: True if sent, QUEUED if it will be retried from the outbox, False if it can't be sent
+        """
+        return self._send_queued("user", user_id, content, file_path=file_path)
+    
+    def submit_direct_message(self, user_id, content, file_path=None, callback=None):
+        """Send a direct message to a Discord user without waiting for it
+        
+        Args:
+            user_id (str): Discord user ID
+            content (str): Message content
+            file_path (str, optional): Path to file to attach. Defaults to None.
+            callback (callable, optional): Called with True or False when the send finishes, see submit_message.
+            
+        Returns:
+            concurrent.futures.Future: Resolves to True if successful, False otherwise
+        """
+        return self._submit(self._send_dm_async, user_id, content, file_path, callback=callback)
     
     async def _send_dm_async(self, user_id, content, file_path=None):
         """Async method to send a direct message"""
         try:
             # Get the user
-            user = await self.client.fetch_user(int(user_id))
+            user = await self._get_user(int(user_id))
             if not user:
                 print(f"User {user_id} not found")
                 return False
@@ -321,4 +689,242 @@ class DiscordService:
             
         except Exception as e:
             print(f"Error in _send_dm_async: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _send_queued(self, kind, target_id, content, resource=None, file_path=None, timeout=10.0):
+        """Send a message through the outbox and wait a while for it to be delivered
+        
+        A message that isn't delivered within the timeout, e.g. while
+        disconnected or after a failed attempt, stays in the outbox and is
+        retried, so it isn't lost.
+        
+        Returns:
+            bool or str: True if sent, QUEUED if it is still in the outbox, False if it can't be delivered
+        """
+        if file_path and not Path(file_path).exists():
+            # Sent as text only, as before the outbox
+            file_path = None
+        
+        key = uuid.uuid4().hex
+        waiter = concurrent.futures.Future()
+        with self._lock:
+            self._outbox_waiters[key] = waiter
+        
+        try:
+            self.queue_message(kind, target_id, content, resource, file_path, key=key)
+            if self.connected:
+                return waiter.result(timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        except Exception as e:
+            print(f"Error sending Discord message: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._outbox_waiters.pop(key, None)
+        
+        print(f"Discord message to {kind} {target_id} not sent yet, it stays in the outbox")
+        return QUEUED
+    
+    def _finish_waiter(self, key, sent):
+        """Tell a send method waiting for an outbox message how it ended"""
+        with self._lock:
+            waiter = self._outbox_waiters.pop(key, None)
+        if waiter:
+            waiter.set_result(sent)
+    
+    def queue_message(self, kind, target_id, content, resource=None, file_path=None, key=None):
+        """Queue a message for delivery that survives failures and restarts
+        
+        The message is stored in the outbox and sent on the Discord thread, so
+        this returns right away even while disconnected. If the client isn't
+        running, queueing starts connecting in the background; without a bot
+        token the message waits in the outbox until a later connect. Failed sends
+        are retried with exponential backoff; messages that can't be delivered
+        end up in outbox.dead_letters().
+        
+        Args:
+            kind (str): "channel" or "user"
+            target_id (str): Discord channel or user ID
+            content (str): Message content
+            resource (Resource, optional): Resource object with Cloudinary data. Defaults to None.
+            file_path (str, optional): Path to file to attach when the resource has no URL. Defaults to None.
+            key (str, optional): Idempotency key; queueing the same key again does nothing. Defaults to a new key.
+            
+        Returns:
+            str: The message's idempotency key
+        """
+        if self._has_url(resource):
+            content = self._resource_message(content, resource)
+            file_path = None
+        elif file_path:
+            file_path = os.path.abspath(file_path)
+        
+        key, added = self.outbox.add(kind, str(target_id), content, file_path, key)
+        if added:
+            self._wake_outbox()
+        return key
+    
+    def queue_share(self, content, resource=None, file_path=None, channel_ids=(), user_ids=(), key=None):
+        """Queue a resource for many channels and players, see queue_message
+        
+        Args:
+            content (str): Message content
+            resource (Resource, optional): Resource object with Cloudinary data. Defaults to None.
+            file_path (str, optional): Path to file to attach when the resource has no URL. Defaults to None.
+            channel_ids (list, optional): Discord channel IDs. Defaults to none.
+            user_ids (list, optional): Discord user IDs to send direct messages to. Defaults to none.
+            key (str, optional): Idempotency key of the share. Defaults to a new key.
+            
+        Returns:
+            list: Idempotency keys of the queued messages
+        """
+        key = key or uuid.uuid4().hex
+        recipients = [("channel", str(channel_id)) for channel_id in channel_ids]
+        recipients += [("user", str(user_id)) for user_id in user_ids]
+        return [
+            self.queue_message(kind, target_id, content, resource, file_path, key=f"{key}:{kind}:{target_id}")
+            for kind, target_id in recipients
+        ]
+    
+    def _wake_outbox(self):
+        """Tell the drain loop that messages were queued, connecting first if the client isn't running"""
+        if self.thread is None or not self.thread.is_alive():
+            # The drain loop starts from on_ready with whatever is queued
+            self.connect(wait=False)
+            return
+        
+        loop, wakeup = self.loop, self._outbox_wakeup
+        if loop is None or wakeup is None:
+            # Still connecting; the drain loop starts with whatever is queued
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # The loop closed in the meantime
+            pass
+    
+    async def _drain_outbox(self):
+        """Deliver queued messages until the client closes
+        
+        Only the oldest pending message of each recipient is sent at a time, so
+        messages arrive in the order they were queued.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        # SQLite calls run in worker threads so they don't block the event loop
+        await asyncio.to_thread(self.outbox.purge, OUTBOX_RETENTION)
+        
+        while not self.client.is_closed():
+            try:
+                await self._online.wait()
+                
+                # Clear before reading, so messages queued meanwhile wake the next wait
+                self._outbox_wakeup.clear()
+                messages = await asyncio.to_thread(self.outbox.due)
+                if messages:
+                    await asyncio.gather(*(self._deliver_queued(semaphore, message) for message in messages))
+                    continue
+                
+                next_attempt = await asyncio.to_thread(self.outbox.next_attempt_at)
+                timeout = OUTBOX_IDLE_WAIT if next_attempt is None else next_attempt - time.time()
+                await asyncio.wait_for(self._outbox_wakeup.wait(), max(0, min(timeout, OUTBOX_IDLE_WAIT)))
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error draining Discord outbox: {e}")
+                await asyncio.sleep(self.outbox_retry_delay)
+    
+    async def _deliver_queued(self, semaphore, message):
+        """Send one outbox message and record the outcome"""
+        message_id, key, kind, target_id, content, file_path, attempts = message
+        
+        async with semaphore:
+            try:
+                if file_path and not Path(file_path).exists():
+                    raise FileNotFoundError(f"Attachment {file_path} no longer exists")
+                
+                target = await self._get_target(kind, target_id)
+                if file_path:
+                    await target.send(content=content, file=File(file_path))
+                else:
+                    await target.send(content=content)
+                
+                await asyncio.to_thread(self.outbox.mark_sent, message_id)
+                self._finish_waiter(key, True)
+                return
+            
+            except (ValueError, FileNotFoundError, discord.Forbidden, discord.NotFound) as e:
+                # Retrying won't help
+                error, permanent = e, True
+            except discord.HTTPException as e:
+                error, permanent = e, e.status < 500 and e.status != 429
+            except Exception as e:
+                error, permanent = e, False
+        
+        if permanent or attempts + 1 >= self.outbox_max_attempts:
+            print(f"Giving up on queued Discord message {key}: {error}")
+            await asyncio.to_thread(self.outbox.mark_dead, message_id, error)
+            self._finish_waiter(key, False)
+        else:
+            await asyncio.to_thread(self.outbox.mark_failed, message_id, error, self._retry_delay(attempts))
+    
+    def _retry_delay(self, attempts):
+        """Get the exponential backoff, with jitter, before the next attempt"""
+        delay = min(self.outbox_max_retry_delay, self.outbox_retry_delay * 2 ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _submit(self, coroutine_function, *args, callback=None):
+        """Schedule a coroutine on the Discord event loop
+        
+        Args:
+            coroutine_function (callable): Async method to run
+            *args: Arguments for coroutine_function
+            callback (callable, optional): Called with the result, or False if the coroutine raised
+            
+        Returns:
+            concurrent.futures.Future: Future for the coroutine's result
+        """
+        if not self.connected or not self.loop:
+            print("Not connected to Discord")
+            future = concurrent.futures.Future()
+            future.set_result(False)
+        else:
+            future = asyncio.run_coroutine_threadsafe(coroutine_function(*args), self.loop)
+        
+        if callback:
+            future.add_done_callback(lambda done: callback(self._result_or_false(done)))
+        return future
+    
+    @staticmethod
+    def _result_or_false(future):
+        """Get the result of a finished send, treating errors and cancellation as failure"""
+        if future.cancelled():
+            return False
+        if future.exception():
+            print(f"Error in Discord send: {future.exception()}")
+            return False
+        return future.result()
+    
+    @staticmethod
+    def tk_callback(root, callback):
+        """Wrap a callback so it runs on the Tk thread
+        
+        Tk widgets may only be used from the thread running the main loop, so
+        the wrapped callback is handed to it with root.after.
+        
+        Args:
+            root (tk.Tk): Application root window
+            callback (callable): Function to call on the Tk thread
+            
+        Returns:
+            callable: Callback that can be passed to the submit methods
+        """
+        def schedule(*args):
+            try:
+                root.after(0, lambda: callback(*args))
+            except RuntimeError:
+                # The Tk main loop has stopped, e.g. while the app is closing
+                pass
+        return schedule
@@ -1,69 +1,151 @@
 import os
 import json
+import time
+import random
+import string
 import datetime
+import threading
+import copy
+import shutil
+import mimetypes
 from pathlib import Path
+import requests
 import firebase_admin
 from firebase_admin import credentials, firestore, storage
+from google.api_core import exceptions as google_exceptions
 from dotenv import load_dotenv
 
+from config.settings import Settings
 from models.resource import Resource
 from models.campaign import Campaign
 from models.player import Player
+from utils.local_cache import LocalCache
+from utils.download_cache import DownloadCache
+from utils.upload_sessions import UploadSessions
+
+# Model class for the documents of each collection
+MODEL_CLASSES = {
+    'resources': Resource,
+    'campaigns': Campaign,
+    'players': Player,
+}
+
+# Model attributes set to the server time when a document of each collection is created
+CREATION_TIMESTAMPS = {
+    'resources': ('uploaded_at',),
+    'campaigns': ('created_at', 'updated_at'),
+    'players': ('added_at',),
+}
+
+# Number of documents requested per get_all round trip
+MAX_GET_ALL = 100
+
+# Maximum number of operations Firestore accepts in one batched write
+MAX_BATCH_WRITES = 500
+
+# Errors that mean Firestore could not be reached, as opposed to a rejected request
+CONNECTION_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.RetryError,
+)
 
 class FirebaseService:
     """Service for interacting with Firebase (Firestore and Storage)"""
     
-    def __init__(self):
-        """Initialize the Firebase service"""
+    def __init__(self, settings=None):
+        """Initialize the Firebase service
+        
+        Args:
+            settings (Settings, optional): Application settings. Defaults to a new Settings instance.
+        """
         self.app = None
         self.db = None
         self.bucket = None
         self.initialized = False
+        
+        # Local write-through cache and offline state
+        self.settings = settings or Settings()
+        self.offline_mode = bool(self.settings.get("firebase", "offline_mode"))
+        self.cache_max_age = self.settings.get("firebase", "cache_max_age")
+        self.reconnect_interval = self.settings.get("firebase", "reconnect_interval") or 30
+        self.cache = LocalCache(self.settings.path("firebase", "cache_path", "data/firestore_cache.sqlite3"))
+        self._connection_lost_at = None
+        self._init_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        
+        # Downloaded files, keyed by storage path and generation
+        storage_path = self.settings.path("resources", "local_storage_path", "data/resources")
+        self.download_cache = DownloadCache(
+            storage_path / "cache",
+            self.settings.get("resources", "download_cache_max_bytes") or 2 * 1024 ** 3
+        )
+        
+        # Large files are uploaded in chunks through resumable sessions
+        self.chunked_upload_threshold = self.settings.get("resources", "chunked_upload_threshold") or 20 * 1024 ** 2
+        self.upload_chunk_size = self.settings.get("resources", "upload_chunk_size") or 8 * 1024 ** 2
+        self.upload_session_max_age = self.settings.get("resources", "upload_session_max_age")
+        self.upload_sessions = UploadSessions(
+            self.settings.path("resources", "upload_sessions_path", "data/upload_sessions.sqlite3")
+        )
+        self._upload_http = requests.Session()
+        
+        # Real-time listeners and the in-memory store they keep up to date
+        self._watches = {}
+        self._live_docs = {}
+        self._live_ready = {}
+        self._live_lock = threading.Lock()
+        self._change_callbacks = []
     
     def initialize(self):
         """Initialize Firebase connection"""
         if self.initialized:
             return
-    
-        try:
-            # Load environment variables from .env file
-            load_dotenv()
-        
-            # Check for credentials file
-            cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
-            if not cred_path:
-                # Check if credentials exist in the config directory
-                default_path = Path("config/firebase-credentials.json")
-                if default_path.exists():
-                    cred_path = str(default_path)
-                else:
-                    raise ValueError("Firebase credentials not found. Please set FIREBASE_CREDENTIALS_PATH in .env file.")
-        
-            # Initialize Firebase app
-            cred = credentials.Certificate(cred_path)
-        
-            # Check if storage bucket is specified
-            storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET")
-            if storage_bucket:
-                self.app = firebase_admin.initialize_app(cred, {
-                    'storageBucket': storage_bucket
-                })
-                # Initialize Storage only if bucket is specified
-                self.bucket = storage.bucket()
-            else:
-                # Initialize without storage bucket
-                self.app = firebase_admin.initialize_app(cred)
-                self.bucket = None
-        
-            # Initialize Firestore
-            self.db = firestore.client()
         
-            self.initialized = True
-            print("Firebase initialized successfully")
-        
-        except Exception as e:
-            print(f"Error initializing Firebase: {e}")
-            raise
+        # Reads running in worker threads may all try to initialize at once
+        with self._init_lock:
+            if self.initialized:
+                return
+            
+            try:
+                # Load environment variables from .env file
+                load_dotenv()
+            
+                # Check for credentials file
+                cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+                if not cred_path:
+                    # Check if credentials exist in the config directory
+                    default_path = Path("config/firebase-credentials.json")
+                    if default_path.exists():
+                        cred_path = str(default_path)
+                    else:
+                        raise ValueError("Firebase credentials not found. Please set FIREBASE_CREDENTIALS_PATH in .env file.")
+            
+                # Initialize Firebase app
+                cred = credentials.Certificate(cred_path)
+            
+                # Check if storage bucket is specified
+                storage_bucket = os.getenv("FIREBASE_STORAGE_BUCKET")
+                if storage_bucket:
+                    self.app = firebase_admin.initialize_app(cred, {
+                        'storageBucket': storage_bucket
+                    })
+                    # Initialize Storage only if bucket is specified
+                    self.bucket = storage.bucket()
+                else:
+                    # Initialize without storage bucket
+                    self.app = firebase_admin.initialize_app(cred)
+                    self.bucket = None
+            
+                # Initialize Firestore
+                self.db = firestore.client()
+            
+                self.initialized = True
+                print("Firebase initialized successfully")
+            
+            except Exception as e:
+                print(f"Error initializing Firebase: {e}")
+                raise
     
     # Resource methods
     
@@ -76,19 +158,282 @@ class FirebaseService:
         Returns:
             list: List of Resource objects
         """
-        self._ensure_initialized()
-        
         resources = []
         try:
-            resource_refs = self.db.collection('resources').limit(limit).get()
-            for doc in resource_refs:
-                resource = Resource.from_dict(doc.id, doc.to_dict())
+            docs = self._cached_query(**self._resources_list_query(limit))
+            for doc_id, data in docs:
+                resource = Resource.from_dict(doc_id, data)
                 resources.append(resource)
         except Exception as e:
             print(f"Error getting resources: {e}")
         
         return resources
     
+    def _resources_list_query(self, limit):
+        """Build the _cached_query arguments for get_resources"""
+        return {
+            "collection": 'resources',
+            "key": f"resources?limit={limit}",
+            "build_query": lambda db: db.collection('resources').limit(limit),
+            "fallback": lambda: self._local_documents('resources', limit),
+        }
+    
+    def get_resources_page(self, page_size=50, start_after=None, summary=False):
+        """Get one page of resources in document ID order
+        
+        Args:
+            page_size (int, optional): Number of resources per page. Defaults to 50.
+            start_after (str, optional): Cursor returned with the previous page. Defaults to None (first page).
+            summary (bool, optional): Fetch only Resource.SUMMARY_FIELDS and load the rest of each
+                resource when it is first used. Defaults to False.
+            
+        Returns:
+            tuple: (list of Resource objects, cursor for the next page or None if this was the last page).
+                If the page could not be read the list is None and the cursor is start_after, so a
+                failure is not mistaken for the end of the listing.
+        """
+        try:
+            docs = self._cached_query(**self._resources_page_query(page_size, start_after, summary))
+        except Exception as e:
+            print(f"Error getting resources page after {start_after}: {e}")
+            return None, start_after
+        
+        return self._resources_page(docs, page_size, summary)
+    
+    def _resources_page(self, docs, page_size, summary):
+        """Turn the documents of a page into resources and the cursor of the next page"""
+        if summary:
+            resources = [Resource.from_summary(doc_id, data, self._load_resource_data) for doc_id, data in docs]
+        else:
+            resources = [Resource.from_dict(doc_id, data) for doc_id, data in docs]
+        next_cursor = resources[-1].id if len(resources) == page_size else None
+        return resources, next_cursor
+    
+    def _resources_page_query(self, page_size, start_after, summary):
+        """Build the _cached_query arguments for get_resources_page"""
+        def build_query(db):
+            query = db.collection('resources')
+            if summary:
+                query = query.select(Resource.SUMMARY_FIELDS)
+            query = query.order_by(firestore.FieldPath.document_id()).limit(page_size)
+            if start_after:
+                query = query.start_after({firestore.FieldPath.document_id(): start_after})
+            return query
+        
+        def fallback():
+            docs = self.cache.list_documents('resources', page_size, start_after)
+            if summary:
+                docs = [(doc_id, self._project(data, Resource.SUMMARY_FIELDS)) for doc_id, data in docs]
+            return docs
+        
+        return {
+            "collection": 'resources',
+            "key": f"resources?page_size={page_size}&start_after={start_after or ''}&summary={summary}",
+            "build_query": build_query,
+            "fallback": fallback,
+            # Partial documents must not be mistaken for full ones in the cache
+            "cache_as": 'resources:summary' if summary else None,
+        }
+    
+    def iter_resources(self, page_size=None, start_after=None, summary=False):
+        """Stream all resources, fetching one page at a time
+        
+        Each page is requested only when the previous one has been consumed, so
+        the caller can display the first resources while later pages load. A page
+        that can't be read raises instead of ending the iteration early; to
+        resume, pass the ID of the last resource received as start_after.
+        
+        Args:
+            page_size (int, optional): Number of resources per page. Defaults to the resources.page_size setting.
+            start_after (str, optional): Resume after this resource ID. Defaults to None (from the start).
+            summary (bool, optional): Yield summary resources, see get_resources_page. Defaults to False.
+            
+        Yields:
+            Resource: Resource objects in document ID order
+        
+        Raises:
+            Exception: The error that prevented a page from being read
+        """
+        page_size = page_size or self.settings.get("resources", "page_size") or 50
+        cursor = start_after
+        
+        while True:
+            docs = self._cached_query(**self._resources_page_query(page_size, cursor, summary))
+            resources, cursor = self._resources_page(docs, page_size, summary)
+            yield from resources
+            
+            if cursor is None:
+                return
+    
+    def stream_resource_fields(self, fields):
+        """Stream selected fields of every resource straight from Firestore
+        
+        Unlike iter_resources this bypasses the local cache and raises on errors,
+        so a failed read is never mistaken for a short listing.
+        
+        Args:
+            fields (list): Field paths to read, e.g. ["cloudinaryData.public_id"]
+            
+        Yields:
+            tuple: (resource ID, dict of the selected fields)
+        """
+        if self.is_offline:
+            raise ConnectionError("Firestore is offline")
+        
+        self._ensure_initialized()
+        for doc in self.db.collection('resources').select(fields).stream():
+            yield doc.id, doc.to_dict()
+    
+    def query_resources(self, campaign=None, tag=None, resource_type=None, folder=None,
+                        limit=50, start_after=None):
+        """Get a page of resources matching the given filters, newest first
+        
+        Filtering and ordering happen in Firestore, so only matching documents
+        are read. The composite indexes these queries need are defined in
+        firestore.indexes.json. Firestore allows a single array-contains filter
+        per query, so when both campaign and tag are given the campaign filter is
+        sent to Firestore and the tag filter is applied locally, reading further
+        batches until limit resources match or the campaign has no more.
+        
+        Args:
+            campaign (str, optional): Only resources in this campaign ID. Defaults to None.
+            tag (str, optional): Only resources with this tag. Defaults to None.
+            resource_type (str, optional): Only resources of this type. Defaults to None.
+            folder (str, optional): Only resources in this folder. Defaults to None.
+            limit (int, optional): Maximum number of resources to return. Defaults to 50.
+            start_after (tuple, optional): Cursor returned with the previous page. A Resource from
+                the previous page is also accepted. Defaults to None (first page).
+            
+        Returns:
+            tuple: (list of Resource objects, cursor for the next page or None if this was the last page).
+                If the page could not be read the list is None and the cursor is start_after.
+        """
+        resources = []
+        try:
+            cursor = self._query_cursor(start_after)
+            while True:
+                docs = self._cached_query(**self._resources_filter_query(campaign, tag, resource_type, folder, limit, cursor))
+                last, full = self._collect_matches(docs, campaign, tag, limit, resources)
+                if full:
+                    return resources, last
+                if len(docs) < limit:
+                    return resources, None
+                cursor = last
+        except Exception as e:
+            print(f"Error querying resources: {e}")
+        
+        return None, start_after
+    
+    def _query_cursor(self, start_after):
+        """Get the (uploadedAt, document ID) cursor query_resources continues after
+        
+        Args:
+            start_after (tuple or Resource): A cursor returned by query_resources, or a resource
+        
+        Returns:
+            tuple: The cursor, or None for the first page
+        """
+        if start_after is None:
+            return None
+        if isinstance(start_after, (tuple, list)):
+            return tuple(start_after)
+        
+        uploaded_at = start_after.uploaded_at
+        if not isinstance(uploaded_at, datetime.datetime):
+            # Still the SERVER_TIMESTAMP sentinel of a new resource; use the stored time
+            data = self._cached_get('resources', start_after.id) or {}
+            uploaded_at = data.get("uploadedAt")
+            if not isinstance(uploaded_at, datetime.datetime):
+                raise ValueError(f"Resource {start_after.id} has no upload time to continue after")
+        return uploaded_at, start_after.id
+    
+    @staticmethod
+    def _collect_matches(docs, campaign, tag, limit, resources):
+        """Add the resources of a query batch that pass the local tag filter
+        
+        Args:
+            docs (list): (doc_id, data) tuples returned by the query
+            campaign (str): Campaign filter sent to Firestore
+            tag (str): Tag filter, applied here when campaign is also given
+            limit (int): Number of resources wanted
+            resources (list): Matching resources so far, extended in place
+        
+        Returns:
+            tuple: (cursor after the last document used or None, True if limit resources were found)
+        """
+        cursor = None
+        for doc_id, data in docs:
+            cursor = (data.get("uploadedAt"), doc_id)
+            if campaign and tag and tag not in (data.get("tags") or []):
+                continue
+            resources.append(Resource.from_dict(doc_id, data))
+            if len(resources) == limit:
+                return cursor, True
+        return cursor, False
+    
+    def _resources_filter_query(self, campaign, tag, resource_type, folder, limit, cursor):
+        """Build the _cached_query arguments for one query_resources batch"""
+        equal = {}
+        if resource_type:
+            equal["type"] = resource_type
+        if folder is not None:
+            equal["folder"] = folder
+        
+        contains = {}
+        if campaign:
+            contains["campaigns"] = campaign
+        elif tag:
+            contains["tags"] = tag
+        
+        def build_query(db):
+            query = db.collection('resources')
+            for field, value in equal.items():
+                query = query.where(field, "==", value)
+            for field, value in contains.items():
+                query = query.where(field, "array_contains", value)
+            query = query.order_by("uploadedAt", direction=firestore.Query.DESCENDING)
+            query = query.order_by(firestore.FieldPath.document_id(), direction=firestore.Query.DESCENDING)
+            if cursor:
+                query = query.start_after({"uploadedAt": cursor[0], firestore.FieldPath.document_id(): cursor[1]})
+            return query.limit(limit)
+        
+        key = "resources?" + "&".join(
+            f"{name}={value}" for name, value in (
+                ("campaign", campaign), ("tag", tag), ("type", resource_type), ("folder", folder),
+                ("limit", limit), ("start_after", cursor and cursor[1])
+            ) if value is not None
+        )
+        
+        return {
+            "collection": 'resources',
+            "key": key,
+            "build_query": build_query,
+            "fallback": lambda: self.cache.find_documents(
+                'resources', equal, contains, order_by="uploadedAt",
+                descending=True, limit=limit, start_after=cursor
+            ),
+        }
+    
+    def _load_resource_data(self, resource_id):
+        """Load the full document of a summary resource"""
+        try:
+            return self._cached_get('resources', resource_id)
+        except Exception as e:
+            print(f"Error loading resource {resource_id}: {e}")
+        
+        return None
+    
+    def get_resources_by_ids(self, resource_ids):
+        """Get many resources by ID with batched reads
+        
+        Args:
+            resource_ids (list): Resource IDs. Duplicates are fetched and returned once.
+            
+        Returns:
+            list: Resource objects in the order of their first ID in resource_ids, skipping IDs that don't exist
+        """
+        return self._get_models_by_ids('resources', resource_ids)
+    
     def get_resource(self, resource_id):
         """Get a specific resource by ID
         
@@ -98,14 +443,28 @@ class FirebaseService:
         Returns:
             Resource: Resource object or None if not found
         """
-        self._ensure_initialized()
+        return self._get_model('resources', resource_id)
+    
+    def find_resource_by_hash(self, sha256):
+        """Find a resource whose uploaded file has the given content hash
         
+        Args:
+            sha256 (str): SHA-256 hex digest stored in the resource's file data
+            
+        Returns:
+            Resource: A matching resource, or None if there is none
+        """
         try:
-            doc = self.db.collection('resources').document(resource_id).get()
-            if doc.exists:
-                return Resource.from_dict(doc.id, doc.to_dict())
+            docs = self._cached_query(
+                'resources',
+                f"resources?sha256={sha256}",
+                lambda db: db.collection('resources').where("fileData.sha256", "==", sha256).limit(1),
+                fallback=lambda: self.cache.find_documents('resources', {"fileData.sha256": sha256}, limit=1)
+            )
+            for doc_id, data in docs:
+                return Resource.from_dict(doc_id, data)
         except Exception as e:
-            print(f"Error getting resource {resource_id}: {e}")
+            print(f"Error finding resource by hash {sha256}: {e}")
         
         return None
     
@@ -118,48 +477,52 @@ class FirebaseService:
         Returns:
             str: ID of the created resource, or None if failed
         """
-        self._ensure_initialized()
-        
-        try:
-            # Set timestamps if not set
-            if not resource.uploaded_at:
-                resource.uploaded_at = firestore.SERVER_TIMESTAMP
-            
-            # Add resource to Firestore
-            doc_ref = self.db.collection('resources').document()
-            doc_ref.set(resource.to_dict())
-            
-            # Update resource ID and return it
-            resource.id = doc_ref.id
-            return doc_ref.id
-        except Exception as e:
-            print(f"Error adding resource: {e}")
-        
-        return None
+        return self._add_model('resources', resource)
     
     def update_resource(self, resource):
         """Update an existing resource in Firestore
         
+        Only the fields changed since the resource was loaded are sent, and
+        nothing is sent if none changed.
+        
         Args:
             resource (Resource): Resource object with updated values
             
         Returns:
             bool: True if successful, False otherwise
         """
-        self._ensure_initialized()
+        return self._update_model('resources', resource)
+    
+    def record_share(self, resource_id, recipients):
+        """Record that a resource was shared, without rewriting the whole document
         
-        if not resource.id:
-            print("Error updating resource: No resource ID provided")
-            return False
+        The counter and recipient list are updated with Firestore transforms, so
+        concurrent shares from several devices never overwrite each other.
         
+        Args:
+            resource_id (str): Resource ID
+            recipients (list): IDs of the players or channels it was shared with
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
         try:
-            self.db.collection('resources').document(resource.id).update(resource.to_dict())
+            self._write('resources', resource_id, 'update', self._share_fields(recipients))
             return True
         except Exception as e:
-            print(f"Error updating resource {resource.id}: {e}")
+            print(f"Error recording share of resource {resource_id}: {e}")
         
         return False
     
+    def _share_fields(self, recipients):
+        """Build the field transforms that record one share"""
+        return {
+            "sharingStatus.has_been_shared": True,
+            "sharingStatus.last_shared": firestore.SERVER_TIMESTAMP,
+            "sharingStatus.shared_with": firestore.ArrayUnion(list(recipients)),
+            "sharingStatus.times_shared": firestore.Increment(1)
+        }
+    
     def delete_resource(self, resource_id):
         """Delete a resource from Firestore
         
@@ -169,16 +532,90 @@ class FirebaseService:
         Returns:
             bool: True if successful, False otherwise
         """
-        self._ensure_initialized()
-        
         try:
-            self.db.collection('resources').document(resource_id).delete()
+            self._write('resources', resource_id, 'delete')
             return True
         except Exception as e:
             print(f"Error deleting resource {resource_id}: {e}")
         
         return False
     
+    def add_resources(self, resources):
+        """Add many resources using batched writes
+        
+        Args:
+            resources (list): Resource objects
+            
+        Returns:
+            list: ID of each created resource, or None where it failed, in input order
+        """
+        writes = [self._prepare_add('resources', resource) for resource in resources]
+        results = self._write_many('resources', writes)
+        
+        ids = []
+        for resource, (doc_id, _, _), ok in zip(resources, writes, results):
+            if ok:
+                self._model_added(resource, doc_id)
+            ids.append(doc_id if ok else None)
+        return ids
+    
+    def update_resources(self, resources):
+        """Update many resources using batched writes
+        
+        Only changed fields are sent, and unchanged resources are skipped.
+        
+        Args:
+            resources (list): Resource objects with updated values
+            
+        Returns:
+            list: True for each resource that was updated, False otherwise, in input order
+        """
+        writes, positions, results = self._collect_updates(resources)
+        for position, ok in zip(positions, self._write_many('resources', writes)):
+            results[position] = ok
+            if ok:
+                resources[position].mark_clean()
+        return results
+    
+    def _collect_updates(self, resources):
+        """Build update writes for the resources that have changes
+        
+        Returns:
+            tuple: (list of writes, position of each write in resources, initial results)
+        """
+        writes = []
+        positions = []
+        results = [False] * len(resources)
+        for position, resource in enumerate(resources):
+            if not resource.id:
+                print("Error updating resource: No resource ID provided")
+                continue
+            
+            try:
+                changes = resource.get_changes()
+            except LookupError as e:
+                print(f"Error updating resource {resource.id}: {e}")
+                continue
+            if not changes:
+                results[position] = True
+                continue
+            
+            writes.append((resource.id, 'update', changes))
+            positions.append(position)
+        
+        return writes, positions, results
+    
+    def delete_resources(self, resource_ids):
+        """Delete many resources using batched writes
+        
+        Args:
+            resource_ids (list): Resource IDs
+            
+        Returns:
+            list: True for each resource that was deleted, False otherwise, in input order
+        """
+        return self._write_many('resources', [(resource_id, 'delete', None) for resource_id in resource_ids])
+    
     # Campaign methods
     
     def get_campaigns(self):
@@ -187,18 +624,18 @@ class FirebaseService:
         Returns:
             list: List of Campaign objects
         """
-        self._ensure_initialized()
-        
-        campaigns = []
-        try:
-            campaign_refs = self.db.collection('campaigns').get()
-            for doc in campaign_refs:
-                campaign = Campaign.from_dict(doc.id, doc.to_dict())
-                campaigns.append(campaign)
-        except Exception as e:
-            print(f"Error getting campaigns: {e}")
+        return self._get_all_models('campaigns')
+    
+    def get_campaigns_by_ids(self, campaign_ids):
+        """Get many campaigns by ID with batched reads
         
-        return campaigns
+        Args:
+            campaign_ids (list): Campaign IDs. Duplicates are fetched and returned once.
+            
+        Returns:
+            list: Campaign objects in the order of their first ID in campaign_ids, skipping IDs that don't exist
+        """
+        return self._get_models_by_ids('campaigns', campaign_ids)
     
     def get_campaign(self, campaign_id):
         """Get a specific campaign by ID
@@ -209,16 +646,7 @@ class FirebaseService:
         Returns:
             Campaign: Campaign object or None if not found
         """
-        self._ensure_initialized()
-        
-        try:
-            doc = self.db.collection('campaigns').document(campaign_id).get()
-            if doc.exists:
-                return Campaign.from_dict(doc.id, doc.to_dict())
-        except Exception as e:
-            print(f"Error getting campaign {campaign_id}: {e}")
-        
-        return None
+        return self._get_model('campaigns', campaign_id)
     
     def add_campaign(self, campaign):
         """Add a new campaign to Firestore
@@ -229,26 +657,18 @@ class FirebaseService:
         Returns:
             str: ID of the created campaign, or None if failed
         """
-        self._ensure_initialized()
-        
-        try:
-            # Set timestamps if not set
-            if not campaign.created_at:
-                campaign.created_at = firestore.SERVER_TIMESTAMP
-            if not campaign.updated_at:
-                campaign.updated_at = firestore.SERVER_TIMESTAMP
-            
-            # Add campaign to Firestore
-            doc_ref = self.db.collection('campaigns').document()
-            doc_ref.set(campaign.to_dict())
-            
-            # Update campaign ID and return it
-            campaign.id = doc_ref.id
-            return doc_ref.id
-        except Exception as e:
-            print(f"Error adding campaign: {e}")
+        return self._add_model('campaigns', campaign)
+    
+    def update_campaign(self, campaign):
+        """Update an existing campaign in Firestore, sending only changed fields
         
-        return None
+        Args:
+            campaign (Campaign): Campaign object with updated values
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self._update_model('campaigns', campaign)
     
     # Player methods
     
@@ -258,18 +678,122 @@ class FirebaseService:
         Returns:
             list: List of Player objects
         """
-        self._ensure_initialized()
+        return self._get_all_models('players')
+    
+    def get_players_by_ids(self, player_ids):
+        """Get many players by ID with batched reads
         
-        players = []
+        Args:
+            player_ids (list): Player IDs. Duplicates are fetched and returned once.
+            
+        Returns:
+            list: Player objects in the order of their first ID in player_ids, skipping IDs that don't exist
+        """
+        return self._get_models_by_ids('players', player_ids)
+    
+    def _get_models_by_ids(self, collection, doc_ids):
+        """Get model objects for many document IDs, keeping the input order"""
+        doc_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id))
+        model_class = MODEL_CLASSES[collection]
+        
+        try:
+            docs = self._cached_get_many(collection, doc_ids)
+        except Exception as e:
+            print(f"Error getting {collection} by IDs: {e}")
+            return []
+        
+        return [model_class.from_dict(doc_id, docs[doc_id]) for doc_id in doc_ids if doc_id in docs]
+    
+    def _get_all_models(self, collection):
+        """Get every document of a collection as model objects"""
+        model_class = MODEL_CLASSES[collection]
+        
+        models = []
+        try:
+            docs = self._cached_query(collection, collection, lambda db: db.collection(collection))
+            for doc_id, data in docs:
+                models.append(model_class.from_dict(doc_id, data))
+        except Exception as e:
+            print(f"Error getting {collection}: {e}")
+        
+        return models
+    
+    def _get_model(self, collection, doc_id):
+        """Get one document as a model object, or None if not found"""
         try:
-            player_refs = self.db.collection('players').get()
-            for doc in player_refs:
-                player = Player.from_dict(doc.id, doc.to_dict())
-                players.append(player)
+            data = self._cached_get(collection, doc_id)
+            if data is not None:
+                return MODEL_CLASSES[collection].from_dict(doc_id, data)
         except Exception as e:
-            print(f"Error getting players: {e}")
+            print(f"Error getting {collection[:-1]} {doc_id}: {e}")
         
-        return players
+        return None
+    
+    def _add_model(self, collection, model):
+        """Add a model as a new document, returning its ID or None if failed"""
+        try:
+            doc_id, op, data = self._prepare_add(collection, model)
+            self._write(collection, doc_id, op, data)
+            self._model_added(model, doc_id)
+            return doc_id
+        except Exception as e:
+            print(f"Error adding {collection[:-1]}: {e}")
+        
+        return None
+    
+    def _update_model(self, collection, model):
+        """Send the changed fields of a model, returning True if successful"""
+        if not model.id:
+            print(f"Error updating {collection[:-1]}: No {collection[:-1]} ID provided")
+            return False
+        
+        try:
+            write = self._prepare_update(collection, model)
+            if write:
+                self._write(collection, *write)
+                self._model_updated(collection, model)
+            return True
+        except Exception as e:
+            print(f"Error updating {collection[:-1]} {model.id}: {e}")
+        
+        return False
+    
+    # The steps of the model methods around their writes, shared with AsyncFirebaseService
+    
+    def _prepare_add(self, collection, model):
+        """Set the unset creation timestamps of a new model and build its write
+        
+        Returns:
+            tuple: (doc_id, "set", data)
+        """
+        for name in CREATION_TIMESTAMPS[collection]:
+            if not getattr(model, name):
+                setattr(model, name, firestore.SERVER_TIMESTAMP)
+        return self._new_document_id(collection), 'set', model.to_dict()
+    
+    def _model_added(self, model, doc_id):
+        """Give a model the ID of the document it was written to"""
+        model.id = doc_id
+        model.mark_clean()
+    
+    def _prepare_update(self, collection, model):
+        """Build the write that sends a model's changed fields
+        
+        Returns:
+            tuple: (doc_id, "update", changes), or None if nothing changed
+        """
+        changes = model.get_changes()
+        if not changes:
+            return None
+        if collection == 'campaigns':
+            changes["updatedAt"] = firestore.SERVER_TIMESTAMP
+        return model.id, 'update', changes
+    
+    def _model_updated(self, collection, model):
+        """Mark a model as saved after its update was written"""
+        if collection == 'campaigns':
+            model.updated_at = firestore.SERVER_TIMESTAMP
+        model.mark_clean()
     
     def add_player(self, player):
         """Add a new player to Firestore
@@ -280,33 +804,32 @@ class FirebaseService:
         Returns:
             str: ID of the created player, or None if failed
         """
-        self._ensure_initialized()
+        return self._add_model('players', player)
+    
+    def update_player(self, player):
+        """Update an existing player in Firestore, sending only changed fields
         
-        try:
-            # Set timestamps if not set
-            if not player.added_at:
-                player.added_at = firestore.SERVER_TIMESTAMP
-            
-            # Add player to Firestore
-            doc_ref = self.db.collection('players').document()
-            doc_ref.set(player.to_dict())
+        Args:
+            player (Player): Player object with updated values
             
-            # Update player ID and return it
-            player.id = doc_ref.id
-            return doc_ref.id
-        except Exception as e:
-            print(f"Error adding player: {e}")
-        
-        return None
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self._update_model('players', player)
     
     # Storage methods
     
-    def upload_file(self, file_path, destination_path):
+    def upload_file(self, file_path, destination_path, progress_callback=None):
         """Upload a file to Firebase Storage
+        
+        Files larger than the chunked upload threshold are sent in chunks through a
+        resumable session, so an interrupted upload continues where it stopped the
+        next time the same file is uploaded to the same path.
     
         Args:
             file_path (str): Local file path
             destination_path (str): Path in Firebase Storage
+            progress_callback (callable, optional): Called with (bytes_sent, total_bytes) as the upload progresses
         
         Returns:
             str: Public URL of the uploaded file, or None if failed
@@ -319,8 +842,15 @@ class FirebaseService:
             return None
     
         try:
+            size = os.path.getsize(file_path)
             blob = self.bucket.blob(destination_path)
-            blob.upload_from_filename(file_path)
+            
+            if size > self.chunked_upload_threshold:
+                self._upload_resumable(blob, file_path, size, progress_callback)
+            else:
+                blob.upload_from_filename(file_path)
+                if progress_callback:
+                    progress_callback(size, size)
         
             # Make the file publicly accessible
             blob.make_public()
@@ -332,31 +862,804 @@ class FirebaseService:
     
         return None
     
-    def download_file(self, storage_path, destination_path):
+    def _upload_resumable(self, blob, file_path, size, progress_callback=None):
+        """Upload a file in chunks through a Google resumable upload session
+        
+        The session URL is saved after every chunk, and on resume the server is
+        asked how many bytes it already has.
+        """
+        session = self.upload_sessions.get("firebase", file_path, blob.name, self.upload_session_max_age)
+        offset = self._resumable_offset(session[1]["url"], size) if session else None
+        
+        if offset is None:
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            url = blob.create_resumable_upload_session(content_type=content_type, size=size)
+            offset = 0
+        else:
+            url = session[1]["url"]
+        
+        if progress_callback:
+            progress_callback(offset, size)
+        
+        with open(file_path, "rb") as f:
+            while offset < size:
+                f.seek(offset)
+                chunk = f.read(self.upload_chunk_size)
+                response = self._upload_http.put(
+                    url,
+                    data=chunk,
+                    headers={"Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}"},
+                    timeout=120
+                )
+                
+                if response.status_code in (200, 201):
+                    offset = size
+                elif response.status_code == 308:
+                    # The server may keep less than was sent; continue from what it confirmed
+                    offset = self._confirmed_bytes(response)
+                    self.upload_sessions.save("firebase", file_path, blob.name, offset, {"url": url})
+                else:
+                    if response.status_code in (404, 410):
+                        # Session expired, start over next time
+                        self.upload_sessions.remove("firebase", file_path, blob.name)
+                    raise requests.HTTPError(
+                        f"Resumable upload failed with status {response.status_code}: {response.text}",
+                        response=response
+                    )
+                
+                if progress_callback:
+                    progress_callback(offset, size)
+        
+        self.upload_sessions.remove("firebase", file_path, blob.name)
+    
+    def _resumable_offset(self, url, size):
+        """Ask a resumable upload session how many bytes it has received
+        
+        Returns:
+            int: Number of bytes to resume from, or None if the session can't be resumed
+        """
+        try:
+            response = self._upload_http.put(url, headers={"Content-Range": f"bytes */{size}"}, timeout=30)
+        except requests.RequestException as e:
+            print(f"Error checking upload session: {e}")
+            return None
+        
+        if response.status_code == 308:
+            return self._confirmed_bytes(response)
+        if response.status_code in (200, 201):
+            return size
+        return None
+    
+    @staticmethod
+    def _confirmed_bytes(response):
+        """Get the number of bytes a resumable upload response says were stored"""
+        received = response.headers.get("Range")
+        if not received:
+            return 0
+        # Range: bytes=0-<last byte stored>
+        return int(received.rsplit("-", 1)[1]) + 1
+    
+    def download_file(self, storage_path, destination_path, generation=None):
         """Download a file from Firebase Storage
+        
+        Files go through the local download cache, so a file that has not
+        changed since it was last downloaded is copied from disk.
     
         Args:
             storage_path (str): Path in Firebase Storage
             destination_path (str): Local destination path
+            generation (int, optional): Generation of the file to download. Defaults to the latest.
         
         Returns:
             bool: True if successful, False otherwise
         """
+        cached_path = self.get_local_file(storage_path, generation)
+        if not cached_path:
+            return False
+    
+        try:
+            shutil.copyfile(cached_path, destination_path)
+            return True
+        except Exception as e:
+            print(f"Error downloading file from {storage_path} to {destination_path}: {e}")
+    
+        return False
+    
+    def get_local_file(self, storage_path, generation=None):
+        """Get a local copy of a file from Firebase Storage, downloading it if needed
+        
+        The generation of the latest file is looked up at most once per cache max age,
+        so repeatedly opening the same file does not touch the network.
+        
+        Args:
+            storage_path (str): Path in Firebase Storage
+            generation (int, optional): Generation of the file. Defaults to the latest.
+        
+        Returns:
+            Path: Path of the cached file (do not modify it), or None if failed
+        """
+        if generation is None:
+            max_age = None if self.is_offline else self.cache_max_age
+            cached = self.download_cache.get_latest(storage_path, max_age)
+            if cached:
+                return cached[0]
+    
         self._ensure_initialized()
     
         # Check if storage bucket is available
         if not self.bucket:
             print("Firebase Storage not configured. Using Cloudinary instead.")
-            return False
+            return None
     
         try:
-            blob = self.bucket.blob(storage_path)
-            blob.download_to_filename(destination_path)
-            return True
+            if generation is None:
+                blob = self.bucket.get_blob(storage_path)
+                if blob is None:
+                    print(f"File not found in Firebase Storage: {storage_path}")
+                    return None
+                generation = blob.generation
+                self.download_cache.mark_checked(storage_path, generation)
+            
+            def download(temp_path):
+                self.bucket.blob(storage_path, generation=generation).download_to_filename(temp_path)
+            
+            return self.download_cache.fetch(storage_path, generation, download)
+        except CONNECTION_ERRORS as e:
+            print(f"Error downloading file from {storage_path}: {e}")
+            self._connection_lost_at = time.time()
+            # Fall back to whatever version was downloaded last
+            cached = self.download_cache.get_latest(storage_path)
+            return cached[0] if cached else None
         except Exception as e:
-            print(f"Error downloading file from {storage_path} to {destination_path}: {e}")
+            print(f"Error downloading file from {storage_path}: {e}")
     
-        return False
+        return None
+    
+    # Real-time sync methods
+    
+    def start_listening(self, collections=("resources", "campaigns", "players")):
+        """Keep an in-memory copy of collections up to date with snapshot listeners
+        
+        After the initial snapshot, reads of these collections are answered
+        locally and only changed documents are transferred, so refreshing
+        costs no Firestore reads. Edits made elsewhere, for example by a co-DM,
+        arrive as soon as Firestore pushes them.
+        
+        Args:
+            collections (tuple, optional): Collections to listen to. Defaults to resources, campaigns and players.
+        """
+        self._ensure_initialized()
+        
+        for collection in collections:
+            if collection in self._watches:
+                continue
+            
+            with self._live_lock:
+                self._live_docs[collection] = {}
+                self._live_ready[collection] = threading.Event()
+            
+            self._watches[collection] = self.db.collection(collection).on_snapshot(
+                lambda snapshot, changes, read_time, collection=collection: self._on_snapshot(collection, changes)
+            )
+    
+    def stop_listening(self):
+        """Detach all snapshot listeners and drop the in-memory store"""
+        for watch in self._watches.values():
+            watch.unsubscribe()
+        self._watches.clear()
+        
+        with self._live_lock:
+            self._live_docs.clear()
+            self._live_ready.clear()
+    
+    def wait_until_synced(self, timeout=None):
+        """Wait for the initial snapshot of every listened collection
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to None (no limit).
+            
+        Returns:
+            bool: True if all collections are synced, False on timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for event in list(self._live_ready.values()):
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            if not event.wait(remaining):
+                return False
+        return True
+    
+    def add_change_callback(self, callback):
+        """Subscribe to changes delivered by the snapshot listeners
+        
+        Callbacks run on Firestore's listener thread. Tk code should hand the
+        work to the main loop, e.g. ``root.after(0, ...)``, rather than touch
+        widgets directly.
+        
+        Args:
+            callback (callable): Called as callback(collection, change_type, obj) where change_type
+                is "added", "modified" or "removed" and obj is a Resource, Campaign or Player
+        """
+        self._change_callbacks.append(callback)
+    
+    def remove_change_callback(self, callback):
+        """Unsubscribe a callback registered with add_change_callback"""
+        if callback in self._change_callbacks:
+            self._change_callbacks.remove(callback)
+    
+    def _is_live(self, collection):
+        """Check whether a collection is kept in memory by a synced listener"""
+        event = self._live_ready.get(collection)
+        return event is not None and event.is_set()
+    
+    def _on_snapshot(self, collection, changes):
+        """Apply document changes from a snapshot listener"""
+        updated = []
+        removed = []
+        
+        with self._live_lock:
+            docs = self._live_docs.get(collection)
+            if docs is None:
+                # Listener was stopped while this snapshot was in flight
+                return
+            
+            for change in changes:
+                doc_id = change.document.id
+                if change.type.name == 'REMOVED':
+                    docs.pop(doc_id, None)
+                    removed.append(doc_id)
+                else:
+                    data = change.document.to_dict()
+                    docs[doc_id] = data
+                    updated.append((doc_id, data))
+            
+            ready = self._live_ready[collection]
+            # The first snapshot holds the whole collection
+            snapshot = None if ready.is_set() else list(docs.items())
+        
+        # Keep the SQLite cache current too, so it stays useful offline and answers
+        # the queries of live collections
+        try:
+            if snapshot is not None:
+                # Also drops documents deleted while the app wasn't listening
+                self.cache.replace_documents(collection, snapshot)
+            else:
+                if updated:
+                    self.cache.put_documents(collection, updated)
+                for doc_id in removed:
+                    self.cache.delete_document(collection, doc_id)
+            self.cache.invalidate_queries(collection)
+        except Exception as e:
+            print(f"Error caching {collection} snapshot: {e}")
+        
+        ready.set()
+        
+        model_class = MODEL_CLASSES[collection]
+        for change in changes:
+            obj = model_class.from_dict(change.document.id, change.document.to_dict() or {})
+            for callback in list(self._change_callbacks):
+                try:
+                    callback(collection, change.type.name.lower(), obj)
+                except Exception as e:
+                    print(f"Error in {collection} change callback: {e}")
+    
+    def _live_documents(self, collection, limit=None):
+        """Copy the in-memory documents of a live collection in document ID order"""
+        with self._live_lock:
+            docs = sorted(self._live_docs[collection].items())[:limit]
+        return copy.deepcopy(docs)
+    
+    # Offline cache methods
+    
+    @property
+    def is_offline(self):
+        """bool: True if reads and writes are currently served from the local cache"""
+        if self.offline_mode:
+            return True
+        if self._connection_lost_at is None:
+            return False
+        return time.time() - self._connection_lost_at < self.reconnect_interval
+    
+    def set_offline_mode(self, enabled):
+        """Switch offline mode on or off
+        
+        Queued writes are replayed to Firestore when offline mode is switched off.
+        
+        Args:
+            enabled (bool): True to work from the local cache only
+            
+        Returns:
+            bool: True if the setting was saved, False otherwise
+        """
+        self.offline_mode = bool(enabled)
+        saved = self.settings.set("firebase", "offline_mode", self.offline_mode)
+        
+        if not self.offline_mode:
+            self._connection_lost_at = None
+            self.sync_pending_writes()
+        
+        return saved
+    
+    def sync_pending_writes(self):
+        """Replay writes that were queued while offline, in the order they were made
+        
+        Returns:
+            int: Number of writes replayed
+        """
+        if self.is_offline or not self.cache.pending_count():
+            return 0
+        
+        self._ensure_initialized()
+        
+        # Replaying the same queue twice at once would send writes twice
+        with self._sync_lock:
+            replayed = 0
+            for seq, collection, doc_id, op, data in self.cache.pending_writes():
+                try:
+                    self._apply_write(collection, doc_id, op, self._decode_write(data))
+                except CONNECTION_ERRORS as e:
+                    print(f"Still offline, {self.cache.pending_count()} writes remain queued: {e}")
+                    self._connection_lost_at = time.time()
+                    break
+                except Exception as e:
+                    # A write Firestore rejects would block the queue forever, so drop it
+                    print(f"Dropping queued {op} for {collection}/{doc_id}: {e}")
+                
+                self.cache.remove_pending_write(seq)
+                replayed += 1
+            
+            if replayed:
+                print(f"Replayed {replayed} queued writes to Firestore")
+            
+            return replayed
+    
+    def _go_online(self):
+        """Initialize Firebase and replay queued writes before a network call"""
+        self._ensure_initialized()
+        self.sync_pending_writes()
+    
+    def _connection_lost(self, action, error):
+        """Switch to the local cache for reconnect_interval after a network error"""
+        print(f"Lost connection to Firestore, {action}: {error}")
+        self._connection_lost_at = time.time()
+    
+    def _cached_query(self, collection, key, build_query, fallback=None, cache_as=None):
+        """Run a query through the local cache
+        
+        Args:
+            collection (str): Collection the query reads from
+            key (str): Cache key identifying the query
+            build_query (callable): Called with the Firestore client, returns the query to run on a cache miss
+            fallback (callable, optional): Answers the query from local documents while offline or
+                listening. Defaults to listing every local document in the collection.
+            cache_as (str, optional): Cache namespace for the results, for queries that return partial
+                documents. Defaults to the collection name.
+            
+        Returns:
+            list: List of (doc_id, data) tuples
+        """
+        docs = self._local_query(collection, key, fallback)
+        if docs is not None:
+            return docs
+        
+        try:
+            docs = [(doc.id, doc.to_dict()) for doc in build_query(self.db).get()]
+        except CONNECTION_ERRORS as e:
+            self._connection_lost(f"reading {collection} from local cache", e)
+            return self._query_fallback(collection, fallback)
+        
+        return self._store_query(collection, key, docs, cache_as)
+    
+    # The steps of the cache methods around their Firestore call. They never
+    # touch the network themselves except to replay queued writes, so
+    # AsyncFirebaseService runs the same steps in a worker thread.
+    
+    def _local_query(self, collection, key, fallback=None):
+        """Answer a query from the cache if possible, or get ready to send it
+        
+        Returns:
+            list: List of (doc_id, data) tuples, or None if the query has to be sent to Firestore
+        """
+        # A synced listener keeps the local copy current, so no read is needed
+        if self._is_live(collection):
+            return self._query_fallback(collection, fallback)
+        
+        if not self.is_offline:
+            cached = self.cache.get_query(key, self.cache_max_age)
+            if cached is not None:
+                return cached
+            
+            self._go_online()
+        
+        if self.is_offline:
+            return self._query_fallback(collection, fallback)
+        
+        return None
+    
+    def _query_fallback(self, collection, fallback=None):
+        """Answer a query from local documents"""
+        if fallback is None:
+            return self._local_documents(collection)
+        return fallback()
+    
+    def _store_query(self, collection, key, docs, cache_as=None):
+        """Cache the results of a query Firestore answered"""
+        self._connection_lost_at = None
+        self.cache.put_query(cache_as or collection, key, docs)
+        return docs
+    
+    def _local_documents(self, collection, limit=None):
+        """List local documents of a collection in document ID order"""
+        if self._is_live(collection):
+            return self._live_documents(collection, limit)
+        return self.cache.list_documents(collection, limit)
+    
+    def _cached_get(self, collection, doc_id):
+        """Get a single document through the local cache
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            
+        Returns:
+            dict: Document data, or None if not found
+        """
+        found, data = self._local_get(collection, doc_id)
+        if found:
+            return data
+        
+        try:
+            doc = self.db.collection(collection).document(doc_id).get()
+        except CONNECTION_ERRORS as e:
+            self._connection_lost(f"reading {collection}/{doc_id} from local cache", e)
+            return self.cache.get_document(collection, doc_id)
+        
+        return self._store_get(collection, doc_id, doc)
+    
+    def _local_get(self, collection, doc_id):
+        """Read a document from the cache if possible, or get ready to fetch it
+        
+        Returns:
+            tuple: (True, data or None) if answered locally, (False, None) if Firestore has to be read
+        """
+        if self._is_live(collection):
+            with self._live_lock:
+                data = self._live_docs[collection].get(doc_id)
+            return True, copy.deepcopy(data)
+        
+        max_age = None if self.is_offline else self.cache_max_age
+        data = self.cache.get_document(collection, doc_id, max_age=max_age)
+        if data is not None or self.is_offline:
+            return True, data
+        
+        self._go_online()
+        return False, None
+    
+    def _store_get(self, collection, doc_id, doc):
+        """Cache a document snapshot Firestore returned and get its data"""
+        self._connection_lost_at = None
+        if not doc.exists:
+            self.cache.delete_document(collection, doc_id)
+            return None
+        
+        data = doc.to_dict()
+        self.cache.put_document(collection, doc_id, data)
+        return data
+    
+    def _cached_get_many(self, collection, doc_ids):
+        """Get many documents through the local cache, fetching misses with get_all
+        
+        Args:
+            collection (str): Collection name
+            doc_ids (list): Document IDs, without duplicates
+            
+        Returns:
+            dict: Document data by ID, for the documents that exist
+        """
+        docs, missing = self._local_get_many(collection, doc_ids)
+        
+        for start in range(0, len(missing), MAX_GET_ALL):
+            refs = [self.db.collection(collection).document(doc_id) for doc_id in missing[start:start + MAX_GET_ALL]]
+            
+            try:
+                snapshots = list(self.db.get_all(refs))
+            except CONNECTION_ERRORS as e:
+                self._connection_lost(f"reading {collection} from local cache", e)
+                docs.update(self.cache.get_documents(collection, missing[start:]))
+                break
+            
+            docs.update(self._store_get_many(collection, snapshots))
+        
+        return docs
+    
+    def _local_get_many(self, collection, doc_ids):
+        """Read documents from the cache, getting ready to fetch the rest
+        
+        Returns:
+            tuple: (dict of document data by ID, list of IDs that have to be fetched from Firestore)
+        """
+        if self._is_live(collection):
+            with self._live_lock:
+                docs = {doc_id: self._live_docs[collection][doc_id]
+                        for doc_id in doc_ids if doc_id in self._live_docs[collection]}
+            return copy.deepcopy(docs), []
+        
+        max_age = None if self.is_offline else self.cache_max_age
+        docs = {}
+        for start in range(0, len(doc_ids), MAX_GET_ALL):
+            docs.update(self.cache.get_documents(collection, doc_ids[start:start + MAX_GET_ALL], max_age=max_age))
+        
+        missing = [doc_id for doc_id in doc_ids if doc_id not in docs]
+        if not missing or self.is_offline:
+            return docs, []
+        
+        self._go_online()
+        return docs, missing
+    
+    def _store_get_many(self, collection, snapshots):
+        """Cache document snapshots returned by get_all
+        
+        Returns:
+            list: (doc_id, data) tuples of the documents that exist
+        """
+        self._connection_lost_at = None
+        found = [(doc.id, doc.to_dict()) for doc in snapshots if doc.exists]
+        self.cache.put_documents(collection, found)
+        return found
+    
+    def _write(self, collection, doc_id, op, data=None):
+        """Write a document to Firestore and the local cache
+        
+        While offline, or if Firestore can't be reached, the write is applied to
+        the cache and queued for replay by sync_pending_writes.
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            op (str): "set", "update" or "delete"
+            data (dict, optional): Write payload. Defaults to None.
+        """
+        if self._can_write_online():
+            try:
+                self._apply_write(collection, doc_id, op, data)
+                self._writes_applied(collection, [(doc_id, op, data)])
+                return
+            except CONNECTION_ERRORS as e:
+                self._connection_lost(f"queueing {op} for {collection}/{doc_id}", e)
+        
+        self._queue_writes(collection, [(doc_id, op, data)])
+    
+    def _write_many(self, collection, writes):
+        """Write many documents to Firestore and the local cache in batches
+        
+        Writes are committed in chunks of at most MAX_BATCH_WRITES, one round
+        trip per chunk. Each chunk is atomic; if Firestore rejects one, its writes
+        are retried one by one so the result shows which of them failed. Offline
+        writes are queued like those made by _write.
+        
+        Args:
+            collection (str): Collection name
+            writes (list): (doc_id, op, data) tuples
+            
+        Returns:
+            list: True for each write that was applied or queued, False otherwise, in input order
+        """
+        results = [False] * len(writes)
+        
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            chunk = writes[start:start + MAX_BATCH_WRITES]
+            
+            if self._can_write_online():
+                try:
+                    batch = self.db.batch()
+                    for doc_id, op, data in chunk:
+                        self._apply_write(collection, doc_id, op, data, batch=batch)
+                    batch.commit()
+                    
+                    self._writes_applied(collection, chunk)
+                    results[start:start + len(chunk)] = [True] * len(chunk)
+                    continue
+                except CONNECTION_ERRORS as e:
+                    self._connection_lost(f"queueing {len(chunk)} {collection} writes", e)
+                except Exception as e:
+                    print(f"Batch of {len(chunk)} {collection} writes rejected, retrying individually: {e}")
+                    for offset, (doc_id, op, data) in enumerate(chunk):
+                        try:
+                            self._write(collection, doc_id, op, data)
+                            results[start + offset] = True
+                        except Exception as write_error:
+                            print(f"Error writing {collection}/{doc_id}: {write_error}")
+                    continue
+            
+            self._queue_writes(collection, chunk)
+            results[start:start + len(chunk)] = [True] * len(chunk)
+        
+        return results
+    
+    def _can_write_online(self):
+        """Get ready to send a write, or find that it has to be queued
+        
+        Returns:
+            bool: True if the write should be sent to Firestore now
+        """
+        if not self.is_offline:
+            self._go_online()
+        
+        # Later writes must not overtake ones that are still queued
+        return not self.is_offline and not self.cache.pending_count()
+    
+    def _writes_applied(self, collection, writes):
+        """Mirror writes Firestore accepted into the local cache"""
+        self._connection_lost_at = None
+        self._cache_writes(collection, writes)
+    
+    def _queue_writes(self, collection, writes):
+        """Queue writes for sync_pending_writes and apply them to the local cache"""
+        for doc_id, op, data in writes:
+            self.cache.queue_write(collection, doc_id, op, self._encode_write(data))
+        self._cache_writes(collection, writes)
+    
+    def _apply_write(self, collection, doc_id, op, data=None, batch=None, db=None):
+        """Send a single write to Firestore, or add it to a batch
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            op (str): "set", "update" or "delete"
+            data (dict, optional): Write payload. Defaults to None.
+            batch (WriteBatch, optional): Batch to add the write to instead. Defaults to None.
+            db (Client, optional): Firestore client to write with. Defaults to this service's client.
+        
+        Returns:
+            The result of the document call, which an AsyncClient's documents return as a coroutine
+        """
+        doc_ref = (db or self.db).collection(collection).document(doc_id)
+        
+        if op == 'set':
+            if batch:
+                return batch.set(doc_ref, data)
+            return doc_ref.set(data)
+        if op == 'update':
+            if batch:
+                return batch.update(doc_ref, data)
+            return doc_ref.update(data)
+        if op == 'delete':
+            if batch:
+                return batch.delete(doc_ref)
+            return doc_ref.delete()
+        raise ValueError(f"Unknown write operation: {op}")
+    
+    def _cache_writes(self, collection, writes):
+        """Mirror several writes into the local cache
+        
+        Args:
+            collection (str): Collection name
+            writes (list): (doc_id, op, data) tuples
+        """
+        sets = []
+        for doc_id, op, data in writes:
+            if op == 'set':
+                sets.append((doc_id, self._resolve_for_cache(data)))
+                continue
+            
+            # Keep ordering intact around updates and deletes
+            if sets:
+                self.cache.put_documents(collection, sets)
+                sets = []
+            if op == 'update':
+                self.cache.update_document(collection, doc_id, self._resolve_update_for_cache(collection, doc_id, data))
+            elif op == 'delete':
+                self.cache.delete_document(collection, doc_id)
+        
+        if sets:
+            self.cache.put_documents(collection, sets)
+        
+        # Cached query results no longer reflect the collection
+        self.cache.invalidate_queries(collection)
+    
+    def _new_document_id(self, collection):
+        """Generate a Firestore document ID without a round trip
+        
+        Args:
+            collection (str): Collection name
+            
+        Returns:
+            str: New document ID
+        """
+        if self.db is not None:
+            return self.db.collection(collection).document().id
+        
+        # Same format as Firestore's client-side auto IDs
+        alphabet = string.ascii_letters + string.digits
+        return "".join(random.SystemRandom().choice(alphabet) for _ in range(20))
+    
+    def _map_values(self, data, transform):
+        """Copy a document payload, passing every leaf value through transform"""
+        if isinstance(data, dict):
+            return {key: self._map_values(value, transform) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._map_values(value, transform) for value in data]
+        return transform(data)
+    
+    def _project(self, data, fields):
+        """Keep only the given field paths of a document, like a Firestore select()"""
+        projected = {}
+        for path in fields:
+            source = data
+            target = projected
+            parts = path.split(".")
+            for part in parts[:-1]:
+                source = source.get(part) if isinstance(source, dict) else None
+                target = target.setdefault(part, {})
+            if isinstance(source, dict) and parts[-1] in source:
+                target[parts[-1]] = source[parts[-1]]
+        return projected
+    
+    def _resolve_for_cache(self, data):
+        """Replace server-side sentinels with local values for the cached copy"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return self._map_values(data, lambda value: now if value is firestore.SERVER_TIMESTAMP else value)
+    
+    def _resolve_update_for_cache(self, collection, doc_id, fields):
+        """Apply field transforms of an update to the cached values they modify"""
+        current = None
+        resolved = {}
+        
+        for path, value in fields.items():
+            if isinstance(value, (firestore.Increment, firestore.ArrayUnion, firestore.ArrayRemove)):
+                if current is None:
+                    current = self.cache.get_document(collection, doc_id) or {}
+                
+                existing = current
+                for part in path.split("."):
+                    existing = existing.get(part) if isinstance(existing, dict) else None
+                
+                if isinstance(value, firestore.Increment):
+                    value = (existing if isinstance(existing, (int, float)) else 0) + value.value
+                elif isinstance(value, firestore.ArrayUnion):
+                    existing = existing if isinstance(existing, list) else []
+                    value = existing + [item for item in value.values if item not in existing]
+                else:
+                    existing = existing if isinstance(existing, list) else []
+                    value = [item for item in existing if item not in value.values]
+            
+            resolved[path] = value
+        
+        return self._resolve_for_cache(resolved)
+    
+    def _encode_write(self, data):
+        """Make a write payload storable in the offline queue"""
+        if data is None:
+            return None
+        return self._map_values(data, self._encode_sentinel)
+    
+    def _encode_sentinel(self, value):
+        """Encode a Firestore sentinel or transform as a JSON-safe marker"""
+        if value is firestore.SERVER_TIMESTAMP:
+            return {"__server_timestamp__": True}
+        if isinstance(value, firestore.Increment):
+            return {"__increment__": value.value}
+        if isinstance(value, firestore.ArrayUnion):
+            return {"__array_union__": list(value.values)}
+        if isinstance(value, firestore.ArrayRemove):
+            return {"__array_remove__": list(value.values)}
+        return value
+    
+    def _decode_write(self, data):
+        """Restore a write payload read from the offline queue"""
+        if isinstance(data, dict):
+            if data == {"__server_timestamp__": True}:
+                return firestore.SERVER_TIMESTAMP
+            if len(data) == 1:
+                if "__increment__" in data:
+                    return firestore.Increment(data["__increment__"])
+                if "__array_union__" in data:
+                    return firestore.ArrayUnion(data["__array_union__"])
+                if "__array_remove__" in data:
+                    return firestore.ArrayRemove(data["__array_remove__"])
+            return {key: self._decode_write(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._decode_write(value) for value in data]
+        return data
     
     def _ensure_initialized(self):
         """Ensure that Firebase is initialized"""
@@ -0,0 +1,127 @@
+import datetime
+
+from services.firebase_service import FirebaseService
+from services.cloudinary_service import CloudinaryService
+
+# Cloudinary resource types the app uploads
+RESOURCE_TYPES = ("image", "raw", "video")
+
+class ReconciliationService:
+    """Finds and removes storage that Firestore and Cloudinary disagree about
+    
+    Cloudinary assets that no resource refers to (left behind by deleted
+    resources or uploads whose metadata was never saved) cost storage, and
+    resources whose asset is gone show broken files.
+    """
+    
+    def __init__(self, firebase_service=None, cloudinary_service=None):
+        """Initialize the reconciliation service
+        
+        Args:
+            firebase_service (FirebaseService, optional): Defaults to a new FirebaseService.
+            cloudinary_service (CloudinaryService, optional): Defaults to a new CloudinaryService.
+        """
+        self.firebase = firebase_service or FirebaseService()
+        self.cloudinary = cloudinary_service or CloudinaryService(self.firebase.settings)
+    
+    def find_orphans(self, folder=None, min_age=3600):
+        """Compare the public IDs referenced in Firestore with the Cloudinary inventory
+        
+        Both sides are streamed directly from their APIs, and any read error aborts
+        the comparison rather than producing a partial, misleading result. Writes
+        queued while offline are replayed first, and assets referenced by writes
+        that are still queued are never reported as orphaned.
+        
+        Args:
+            folder (str, optional): Only consider assets under this folder. Defaults to None (the whole account).
+            min_age (float, optional): Ignore assets created less than this many seconds ago, which
+                may belong to an upload whose resource isn't saved yet. Defaults to 3600.
+        
+        Returns:
+            dict: "orphaned_assets", a dict of resource type to public IDs no resource refers to,
+                "missing_assets", a list of (resource ID, public ID) for resources whose asset is gone, and
+                "pending_writes", the number of offline writes that could not be replayed
+        """
+        self.firebase.sync_pending_writes()
+        pending_writes = self.firebase.cache.pending_count()
+        queued = self._queued_public_ids()
+        
+        referenced = {}
+        fields = ["cloudinaryData.public_id", "cloudinaryData.resource_type"]
+        for resource_id, data in self.firebase.stream_resource_fields(fields):
+            public_id = (data.get("cloudinaryData") or {}).get("public_id")
+            if public_id and (not folder or public_id.startswith(folder)):
+                referenced.setdefault(public_id, []).append(resource_id)
+        
+        cutoff = (datetime.datetime.utcnow() - datetime.timedelta(seconds=min_age)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        inventory = set()
+        orphaned = {}
+        for resource_type in RESOURCE_TYPES:
+            for asset in self.cloudinary.iter_resources(folder, resource_type, max_age=0, raise_errors=True):
+                public_id = asset["public_id"]
+                inventory.add(public_id)
+                if public_id not in referenced and public_id not in queued and asset.get("created_at", "") < cutoff:
+                    orphaned.setdefault(resource_type, []).append(public_id)
+        
+        missing = [
+            (resource_id, public_id)
+            for public_id, resource_ids in referenced.items() if public_id not in inventory
+            for resource_id in resource_ids
+        ]
+        
+        return {"orphaned_assets": orphaned, "missing_assets": missing, "pending_writes": pending_writes}
+    
+    def _queued_public_ids(self):
+        """Get the public IDs that resource writes still queued offline refer to"""
+        public_ids = set()
+        for _, collection, _, op, data in self.firebase.cache.pending_writes():
+            if collection != 'resources' or op == 'delete' or not data:
+                continue
+            
+            # Sets hold the nested map, updates may hold either it or the dotted field
+            public_id = data.get("cloudinaryData.public_id") or (data.get("cloudinaryData") or {}).get("public_id")
+            if public_id:
+                public_ids.add(public_id)
+        return public_ids
+    
+    def collect_garbage(self, dry_run=True, folder=None, min_age=3600, delete_documents=False, max_wait=None):
+        """Delete orphaned Cloudinary assets, and optionally resources whose asset is gone
+        
+        Args:
+            dry_run (bool, optional): Only report what would be deleted. Defaults to True.
+            folder (str, optional): Only consider assets under this folder. Defaults to None.
+            min_age (float, optional): Grace period for new assets in seconds, see find_orphans. Defaults to 3600.
+            delete_documents (bool, optional): Also delete resources whose asset is missing. Defaults to False.
+            max_wait (float, optional): Longest time in seconds to wait for Admin API quota. Defaults to None.
+        
+        Nothing is deleted while offline writes remain queued, since Firestore
+        doesn't show the resources they add or change yet.
+        
+        Returns:
+            dict: The find_orphans report, plus "deleted_assets" (public ID to delete status) and
+                "deleted_documents" (resource IDs) when not a dry run
+        """
+        report = self.find_orphans(folder, min_age)
+        report["deleted_assets"] = {}
+        report["deleted_documents"] = []
+        
+        if dry_run:
+            return report
+        
+        if report["pending_writes"]:
+            print(f"Not deleting anything: {report['pending_writes']} offline writes are still queued")
+            return report
+        
+        for resource_type, public_ids in report["orphaned_assets"].items():
+            report["deleted_assets"].update(
+                self.cloudinary.delete_resources(public_ids, resource_type, max_wait=max_wait)
+            )
+        
+        if delete_documents and report["missing_assets"]:
+            resource_ids = sorted({resource_id for resource_id, _ in report["missing_assets"]})
+            results = self.firebase.delete_resources(resource_ids)
+            report["deleted_documents"] = [
+                resource_id for resource_id, deleted in zip(resource_ids, results) if deleted
+            ]
+        
+        return report
@@ -0,0 +1,251 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+
+from config.settings import Settings
+from services.cloudinary_service import CloudinaryService
+from utils.download_cache import DownloadCache
+
+class ImageMemoryCache:
+    """LRU of decoded images bounded by their total size in memory"""
+    
+    def __init__(self, max_bytes):
+        """Initialize the cache
+        
+        Args:
+            max_bytes (int): Budget for the decoded pixel data
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def image_bytes(image):
+        """Estimate the memory a decoded image uses"""
+        return image.width * image.height * len(image.getbands())
+    
+    def get(self, key):
+        """Get a cached image, or None"""
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None:
+                return None
+            self._images.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, image):
+        """Add an image, evicting the least recently used ones to stay within budget"""
+        cost = self.image_bytes(image)
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old:
+                self.size -= old[1]
+            self._images[key] = (image, cost)
+            self.size += cost
+            
+            while self.size > self.max_bytes and len(self._images) > 1:
+                _, (_, evicted_cost) = self._images.popitem(last=False)
+                self.size -= evicted_cost
+    
+    def clear(self):
+        """Drop every cached image"""
+        with self._lock:
+            self._images.clear()
+            self.size = 0
+
+class ThumbnailService:
+    """Fetches, stores and decodes resource thumbnails for the resource browser
+    
+    Thumbnails are kept on disk by public ID, version and size, so they are
+    downloaded once. Stored thumbnails are trusted until they are older than
+    thumbnail_revalidate_after, then revalidated with If-None-Match. Decoded
+    images are kept in memory up to thumbnail_memory_budget bytes.
+    """
+    
+    def __init__(self, cloudinary_service=None, settings=None):
+        """Initialize the thumbnail service
+        
+        Args:
+            cloudinary_service (CloudinaryService, optional): Builds the thumbnail URLs. Defaults to a new one.
+            settings (Settings, optional): Application settings. Defaults to a new Settings instance.
+        """
+        self.settings = settings or Settings()
+        self.cloudinary = cloudinary_service or CloudinaryService(self.settings)
+        
+        width, height = self.settings.get("resources", "max_thumbnail_size") or (200, 200)
+        self.size = (width, height)
+        self.revalidate_after = self.settings.get("resources", "thumbnail_revalidate_after")
+        workers = self.settings.get("resources", "thumbnail_workers") or 8
+        
+        storage_path = self.settings.path("resources", "local_storage_path", "data/resources")
+        self.disk_cache = DownloadCache(
+            storage_path / "thumbnails",
+            self.settings.get("resources", "thumbnail_cache_max_bytes") or 256 * 1024 ** 2
+        )
+        self.memory_cache = ImageMemoryCache(
+            self.settings.get("resources", "thumbnail_memory_budget") or 64 * 1024 ** 2
+        )
+        
+        # One keep-alive connection per worker to the Cloudinary CDN
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+    
+    def _thumbnail_key(self, resource):
+        """Get the (storage path, version) a resource's thumbnail is stored under, or None"""
+        data = resource.cloudinary_data or {}
+        if not data.get("public_id") or (data.get("resource_type") or "image") != "image":
+            return None
+        return f"{data['public_id']}@{self.size[0]}x{self.size[1]}", str(data.get("version") or "")
+    
+    def get_thumbnail(self, resource):
+        """Get a thumbnail that is already decoded in memory, without blocking
+        
+        Args:
+            resource (Resource): Resource to get the thumbnail of
+        
+        Returns:
+            PIL.Image.Image: The thumbnail, or None if it still has to be loaded
+        """
+        key = self._thumbnail_key(resource)
+        return self.memory_cache.get(key) if key else None
+    
+    def load_thumbnail(self, resource, callback=None):
+        """Load a thumbnail in the background
+        
+        Concurrent requests for the same thumbnail share one load.
+        
+        Args:
+            resource (Resource): Resource to load the thumbnail of
+            callback (callable, optional): Called with (resource ID, image or None) when done. It runs
+                on a worker thread, so UI code should hand it to the Tk thread with root.after.
+        
+        Returns:
+            Future: Resolves to the PIL image, or None if the resource has no thumbnail
+        """
+        key = self._thumbnail_key(resource)
+        image = self.memory_cache.get(key) if key else None
+        
+        if key is None or image is not None:
+            future = Future()
+            future.set_result(image)
+        else:
+            with self._pending_lock:
+                future = self._pending.get(key)
+                started = future is None
+                if started:
+                    future = self.executor.submit(self._load, resource, key)
+                    self._pending[key] = future
+            
+            if started:
+                # Outside the lock, since the callback runs right away if the load already finished
+                future.add_done_callback(lambda _: self._forget_pending(key))
+        
+        if callback:
+            future.add_done_callback(lambda done: callback(resource.id, None if done.exception() else done.result()))
+        return future
+    
+    def load_thumbnails(self, resources, callback=None):
+        """Load the thumbnails of many resources, e.g. a page of the browser grid
+        
+        Args:
+            resources (list): Resource objects
+            callback (callable, optional): Called for each resource, see load_thumbnail
+        
+        Returns:
+            dict: Resource ID to Future
+        """
+        resources = list(resources)
+        
+        # Build all URLs up front so the workers only do I/O and decoding
+        self.cloudinary.get_thumbnail_urls(resources, *self.size)
+        return {resource.id: self.load_thumbnail(resource, callback) for resource in resources}
+    
+    def _forget_pending(self, key):
+        """Stop sharing a finished load"""
+        with self._pending_lock:
+            self._pending.pop(key, None)
+    
+    def _load(self, resource, key):
+        """Get a thumbnail from disk or the network and decode it"""
+        storage_path, version = key
+        entry = self.disk_cache.get_entry(storage_path, version)
+        
+        if entry and not self._is_fresh(entry[1]):
+            entry = self._revalidate(resource, key, entry)
+        
+        if entry:
+            path = entry[0]
+        else:
+            url = self._thumbnail_url(resource)
+            path = self.disk_cache.fetch(storage_path, version, lambda temp_path: self._download(url, temp_path))
+        
+        with Image.open(path) as img:
+            img.load()
+            image = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        
+        self.memory_cache.put(key, image)
+        return image
+    
+    def _is_fresh(self, checked_at):
+        """Check whether a stored thumbnail can be used without revalidating it"""
+        return self.revalidate_after is None or time.time() - checked_at < self.revalidate_after
+    
+    def _thumbnail_url(self, resource):
+        """Get the thumbnail URL of a resource"""
+        data = resource.cloudinary_data
+        return self.cloudinary.get_thumbnail_url(data["public_id"], *self.size, version=data.get("version"))
+    
+    def _download(self, url, destination_path, headers=None):
+        """Download a thumbnail to a file
+        
+        Returns:
+            str: The ETag of the response
+        """
+        with self.session.get(url, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            with open(destination_path, "wb") as f:
+                for chunk in response.iter_content(64 * 1024):
+                    f.write(chunk)
+            return response.headers.get("ETag")
+    
+    def _revalidate(self, resource, key, entry):
+        """Ask the CDN whether a stored thumbnail is still current
+        
+        Returns:
+            tuple: The disk cache entry to use, or None if the thumbnail has to be downloaded again
+        """
+        storage_path, version = key
+        path, _, etag = entry
+        if not etag:
+            self.disk_cache.remove(storage_path, version)
+            return None
+        
+        try:
+            response = self.session.head(self._thumbnail_url(resource), headers={"If-None-Match": etag}, timeout=30)
+        except requests.RequestException as e:
+            # Offline: the stored thumbnail is better than none
+            print(f"Could not revalidate thumbnail {storage_path}: {e}")
+            return entry
+        
+        if response.status_code == 304 or response.headers.get("ETag") == etag:
+            self.disk_cache.mark_checked(storage_path, version)
+            return entry
+        
+        self.disk_cache.remove(storage_path, version)
+        return None
+    
+    def close(self):
+        """Stop the workers and close the HTTP connections"""
+        self.executor.shutdown(wait=False)
+        self.session.close()
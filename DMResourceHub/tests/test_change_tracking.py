@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+# Add the project directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.change_tracking import ChangeTracking
+from models.resource import Resource
+
+# Stands in for sentinels such as firestore.SERVER_TIMESTAMP, which compare by identity
+SENTINEL = object()
+
+class ChangeTrackingTest(unittest.TestCase):
+    def test_diff_reports_nested_changes_as_field_paths(self):
+        old = {"title": "Map", "textData": {"content": "a", "format": "md"}}
+        new = {"title": "Map", "textData": {"content": "b", "format": "md"}}
+        
+        self.assertEqual(ChangeTracking._diff(old, new), {"textData.content": "b"})
+    
+    def test_diff_reports_added_fields(self):
+        old = {"title": "Map", "textData": {"content": "a"}}
+        new = {"title": "Map", "folder": "Maps", "textData": {"content": "a", "format": "md"}}
+        
+        self.assertEqual(ChangeTracking._diff(old, new), {"folder": "Maps", "textData.format": "md"})
+    
+    def test_diff_writes_whole_value_when_nested_key_removed(self):
+        old = {"textData": {"content": "a", "format": "md"}}
+        new = {"textData": {"content": "a"}}
+        
+        self.assertEqual(ChangeTracking._diff(old, new), {"textData": {"content": "a"}})
+    
+    def test_diff_writes_whole_value_when_emptied_or_replaced(self):
+        self.assertEqual(ChangeTracking._diff({"fileData": {"size": 1}}, {"fileData": {}}), {"fileData": {}})
+        self.assertEqual(ChangeTracking._diff({"fileData": {"size": 1}}, {"fileData": None}), {"fileData": None})
+        self.assertEqual(ChangeTracking._diff({"tags": ["a"]}, {"tags": ["a", "b"]}), {"tags": ["a", "b"]})
+    
+    def test_same_compares_sentinels_by_identity_and_values_by_type(self):
+        self.assertTrue(ChangeTracking._same(SENTINEL, SENTINEL))
+        self.assertFalse(ChangeTracking._same(SENTINEL, object()))
+        self.assertFalse(ChangeTracking._same(1, True))
+        self.assertFalse(ChangeTracking._same(1, 1.0))
+        self.assertTrue(ChangeTracking._same({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}))
+    
+    def test_new_model_reports_every_field(self):
+        resource = Resource(title="Map", resource_type="image")
+        
+        self.assertEqual(resource.get_changes(), resource.to_dict())
+        self.assertTrue(resource.has_changes)
+    
+    def test_in_place_edits_after_mark_clean_are_changes(self):
+        resource = Resource.from_dict("a", {"title": "Map", "type": "image", "tags": ["city"]})
+        self.assertFalse(resource.has_changes)
+        
+        resource.tags.append("night")
+        resource.sharing_status["times_shared"] = 3
+        self.assertEqual(resource.get_changes(), {
+            "tags": ["city", "night"],
+            "sharingStatus.times_shared": 3,
+        })
+        
+        resource.mark_clean()
+        self.assertEqual(resource.get_changes(), {})
+    
+    def test_hydrated_summary_compares_against_full_document(self):
+        full = {"title": "Map", "type": "text", "description": "Old", "textData": {"content": "a"}}
+        resource = Resource.from_summary("a", {"title": "Map", "type": "text"}, lambda doc_id: full)
+        
+        resource.description = "New"
+        self.assertEqual(resource.get_changes(), {"description": "New"})
+    
+    def test_failed_load_keeps_summary_lazy(self):
+        docs = {}
+        resource = Resource.from_summary("a", {"title": "Map", "type": "text"}, docs.get)
+        
+        with self.assertRaises(LookupError):
+            resource.description
+        self.assertTrue(resource.is_summary)
+        with self.assertRaises(LookupError):
+            resource.get_changes()
+        
+        docs["a"] = {"title": "Map", "type": "text", "description": "Stored"}
+        self.assertEqual(resource.description, "Stored")
+        self.assertFalse(resource.is_summary)
+        self.assertEqual(resource.get_changes(), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# Add the project directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.download_cache import DownloadCache
+
+class DownloadCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DownloadCache(self.directory, max_bytes=100)
+        self.downloads = []
+    
+    def tearDown(self):
+        self.cache._conn.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def downloader(self, content, etag=None):
+        """Build a download callable that writes content and records the call"""
+        def download(path):
+            self.downloads.append(path)
+            with open(path, "wb") as f:
+                f.write(content)
+            return etag
+        return download
+    
+    def test_fetch_downloads_once_per_version(self):
+        first = self.cache.fetch("maps/town.png", "1", self.downloader(b"v1"))
+        again = self.cache.fetch("maps/town.png", "1", self.downloader(b"other"))
+        second = self.cache.fetch("maps/town.png", "2", self.downloader(b"v2"))
+        
+        self.assertEqual(first, again)
+        self.assertEqual(first.read_bytes(), b"v1")
+        self.assertEqual(second.read_bytes(), b"v2")
+        self.assertEqual(len(self.downloads), 2)
+    
+    def test_failed_download_leaves_no_entry_or_partial_file(self):
+        def download(path):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise ConnectionError("dropped")
+        
+        with self.assertRaises(ConnectionError):
+            self.cache.fetch("maps/town.png", "1", download)
+        
+        self.assertIsNone(self.cache.get("maps/town.png", "1"))
+        leftovers = [name for _, _, names in os.walk(self.cache.objects_path) for name in names]
+        self.assertEqual(leftovers, [])
+    
+    def test_eviction_drops_least_recently_used_first(self):
+        self.cache.fetch("a", "1", self.downloader(b"x" * 40))
+        self.cache.fetch("b", "1", self.downloader(b"x" * 40))
+        self.cache._conn.execute("UPDATE entries SET last_used = last_used - 10")
+        self.cache.get("a", "1")
+        
+        self.cache.fetch("c", "1", self.downloader(b"x" * 40))
+        
+        self.assertIsNotNone(self.cache.get("a", "1"))
+        self.assertIsNone(self.cache.get("b", "1"))
+        self.assertIsNotNone(self.cache.get("c", "1"))
+    
+    def test_new_download_is_kept_even_if_larger_than_cache(self):
+        path = self.cache.fetch("big", "1", self.downloader(b"x" * 150))
+        
+        self.assertTrue(path.exists())
+    
+    def test_get_latest_respects_max_age(self):
+        self.cache.fetch("maps/town.png", "1", self.downloader(b"v1"))
+        self.cache._conn.execute("UPDATE entries SET checked_at = ?", (time.time() - 100,))
+        self.cache.fetch("maps/town.png", "2", self.downloader(b"v2"))
+        
+        path, version = self.cache.get_latest("maps/town.png")
+        self.assertEqual((path.read_bytes(), version), (b"v2", "2"))
+        
+        self.cache._conn.execute("UPDATE entries SET checked_at = ?", (time.time() - 100,))
+        self.assertIsNone(self.cache.get_latest("maps/town.png", max_age=10))
+        
+        self.cache.mark_checked("maps/town.png", "1")
+        self.assertEqual(self.cache.get_latest("maps/town.png", max_age=10)[1], "1")
+    
+    def test_entry_keeps_etag_and_forgets_deleted_files(self):
+        path = self.cache.fetch("maps/town.png", "1", self.downloader(b"v1", etag='"abc"'))
+        self.assertEqual(self.cache.get_entry("maps/town.png", "1")[2], '"abc"')
+        
+        path.unlink()
+        self.assertIsNone(self.cache.get_entry("maps/town.png", "1"))
+        self.assertIsNone(self.cache.get_latest("maps/town.png"))
+
+if __name__ == "__main__":
+    unittest.main()
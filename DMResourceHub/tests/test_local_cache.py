@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import shutil
+import datetime
+import tempfile
+import unittest
+
+# Add the project directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.local_cache import LocalCache
+
+class LocalCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = LocalCache(os.path.join(self.directory, "cache.sqlite3"))
+    
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_documents_round_trip_with_timestamps(self):
+        uploaded = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        self.cache.put_document("resources", "a", {"title": "Map", "uploadedAt": uploaded, "tags": ["dungeon"]})
+        
+        self.assertEqual(
+            self.cache.get_document("resources", "a"),
+            {"title": "Map", "uploadedAt": uploaded, "tags": ["dungeon"]}
+        )
+        self.assertIsNone(self.cache.get_document("resources", "missing"))
+        self.assertIsNone(self.cache.get_document("campaigns", "a"))
+    
+    def test_max_age_ignores_stale_documents(self):
+        self.cache.put_document("resources", "a", {"title": "Map"})
+        self.cache._conn.execute("UPDATE documents SET cached_at = ?", (time.time() - 100,))
+        
+        self.assertIsNone(self.cache.get_document("resources", "a", max_age=10))
+        self.assertEqual(self.cache.get_documents("resources", ["a"], max_age=10), {})
+        self.assertEqual(self.cache.get_document("resources", "a"), {"title": "Map"})
+    
+    def test_list_documents_pages_in_id_order(self):
+        self.cache.put_documents("resources", [(doc_id, {"n": doc_id}) for doc_id in "dbca"])
+        
+        self.assertEqual([doc_id for doc_id, _ in self.cache.list_documents("resources", 2)], ["a", "b"])
+        self.assertEqual([doc_id for doc_id, _ in self.cache.list_documents("resources", 2, "b")], ["c", "d"])
+    
+    def test_find_documents_filters_and_orders_like_firestore(self):
+        day = datetime.timedelta(days=1)
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.cache.put_documents("resources", [
+            ("a", {"type": "image", "tags": ["city"], "uploadedAt": start}),
+            ("b", {"type": "image", "tags": ["city", "night"], "uploadedAt": start + day}),
+            ("c", {"type": "pdf", "tags": ["city"], "uploadedAt": start + 2 * day}),
+            ("d", {"type": "image", "tags": ["forest"], "uploadedAt": start + 3 * day}),
+            ("e", {"type": "image", "tags": ["city"], "uploadedAt": start + day}),
+        ])
+        
+        docs = self.cache.find_documents("resources", {"type": "image"}, {"tags": "city"},
+                                         order_by="uploadedAt", descending=True)
+        self.assertEqual([doc_id for doc_id, _ in docs], ["e", "b", "a"])
+        
+        # Ties on the sort field continue by document ID after the cursor
+        docs = self.cache.find_documents("resources", {"type": "image"}, {"tags": "city"},
+                                         order_by="uploadedAt", descending=True, start_after=(start + day, "e"))
+        self.assertEqual([doc_id for doc_id, _ in docs], ["b", "a"])
+    
+    def test_update_document_applies_dotted_paths(self):
+        self.cache.put_document("resources", "a", {"title": "Map", "sharingStatus": {"times_shared": 1}})
+        self.cache.update_document("resources", "a", {"sharingStatus.times_shared": 2, "textData.content": "x"})
+        
+        self.assertEqual(self.cache.get_document("resources", "a"), {
+            "title": "Map",
+            "sharingStatus": {"times_shared": 2},
+            "textData": {"content": "x"},
+        })
+        
+        # Documents that aren't cached are left alone
+        self.cache.update_document("resources", "missing", {"title": "New"})
+        self.assertIsNone(self.cache.get_document("resources", "missing"))
+    
+    def test_replace_documents_drops_missing_but_keeps_pending(self):
+        self.cache.put_documents("resources", [("a", {"n": 1}), ("b", {"n": 2}), ("c", {"n": 3})])
+        self.cache.put_document("campaigns", "x", {"name": "Curse"})
+        
+        # b was edited offline and c was deleted elsewhere
+        self.cache.update_document("resources", "b", {"n": 20})
+        self.cache.queue_write("resources", "b", "update", {"n": 20})
+        self.cache.replace_documents("resources", [("a", {"n": 10}), ("b", {"n": 2}), ("d", {"n": 4})])
+        
+        self.assertEqual(self.cache.list_documents("resources"), [("a", {"n": 10}), ("b", {"n": 20}), ("d", {"n": 4})])
+        self.assertEqual(self.cache.get_document("campaigns", "x"), {"name": "Curse"})
+    
+    def test_query_results_are_invalidated_per_collection(self):
+        self.cache.put_query("resources", "resources?limit=2", [("a", {"n": 1}), ("b", {"n": 2})])
+        self.cache.put_query("resources:summary", "resources?summary", [("a", {"n": 1})])
+        self.cache.put_query("campaigns", "campaigns", [("x", {"name": "Curse"})])
+        
+        self.assertEqual(self.cache.get_query("resources?limit=2"), [("a", {"n": 1}), ("b", {"n": 2})])
+        
+        self.cache.invalidate_queries("resources")
+        self.assertIsNone(self.cache.get_query("resources?limit=2"))
+        self.assertIsNone(self.cache.get_query("resources?summary"))
+        self.assertEqual(self.cache.get_query("campaigns"), [("x", {"name": "Curse"})])
+    
+    def test_query_with_evicted_document_is_a_miss(self):
+        self.cache.put_query("resources", "resources?limit=2", [("a", {"n": 1}), ("b", {"n": 2})])
+        self.cache.delete_document("resources", "b")
+        
+        self.assertIsNone(self.cache.get_query("resources?limit=2"))
+    
+    def test_pending_writes_keep_their_order(self):
+        self.cache.queue_write("resources", "a", "set", {"title": "Map"})
+        self.cache.queue_write("resources", "a", "update", {"title": "Town map"})
+        self.cache.queue_write("resources", "b", "delete")
+        
+        writes = self.cache.pending_writes()
+        self.assertEqual([(doc_id, op, data) for _, _, doc_id, op, data in writes], [
+            ("a", "set", {"title": "Map"}),
+            ("a", "update", {"title": "Town map"}),
+            ("b", "delete", None),
+        ])
+        
+        self.cache.remove_pending_write(writes[0][0])
+        self.assertEqual(self.cache.pending_count(), 2)
+
+if __name__ == "__main__":
+    unittest.main()
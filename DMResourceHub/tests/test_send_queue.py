@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# Add the project directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.send_queue import SendQueue
+
+class SendQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.queue = SendQueue(os.path.join(self.directory, "outbox.sqlite3"))
+    
+    def tearDown(self):
+        self.queue._conn.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def due_keys(self):
+        return [message[1] for message in self.queue.due()]
+    
+    def test_same_key_is_queued_once(self):
+        self.assertEqual(self.queue.add("channel", 1, "Map", key="share"), ("share", True))
+        self.assertEqual(self.queue.add("channel", 1, "Map again", key="share"), ("share", False))
+        
+        self.assertEqual(self.queue.pending_count(), 1)
+        self.assertEqual(self.queue.due()[0][4], "Map")
+    
+    def test_due_returns_oldest_message_per_recipient(self):
+        self.queue.add("channel", 1, "first", key="c1")
+        self.queue.add("user", 1, "dm", key="u1")
+        self.queue.add("channel", 1, "second", key="c2")
+        self.queue.add("channel", 2, "other", key="d1")
+        
+        self.assertEqual(self.due_keys(), ["c1", "u1", "d1"])
+        
+        self.queue.mark_sent(self.queue.due()[0][0])
+        self.assertEqual(self.due_keys(), ["u1", "c2", "d1"])
+    
+    def test_failed_message_holds_back_later_ones(self):
+        self.queue.add("channel", 1, "first", key="c1")
+        self.queue.add("channel", 1, "second", key="c2")
+        self.queue.add("channel", 2, "other", key="d1")
+        
+        before = time.time()
+        self.queue.mark_failed(self.queue.due()[0][0], "HTTP 503", delay=60)
+        
+        self.assertEqual(self.due_keys(), ["d1"])
+        self.queue.mark_sent(self.queue.due()[0][0])
+        self.assertGreaterEqual(self.queue.next_attempt_at(), before + 60)
+        
+        # Once the delay has passed the failed message goes first, with its attempt counted
+        self.queue._conn.execute("UPDATE outbox SET next_attempt = ?", (time.time() - 1,))
+        due = self.queue.due()
+        self.assertEqual([message[1] for message in due], ["c1"])
+        self.assertEqual(due[0][6], 1)
+    
+    def test_dead_letters_can_be_retried_or_removed(self):
+        self.queue.add("channel", 1, "first", key="c1")
+        self.queue.add("channel", 1, "second", key="c2")
+        self.queue.mark_dead(self.queue.due()[0][0], "Missing Access")
+        
+        # A dead message no longer holds back the recipient
+        self.assertEqual(self.due_keys(), ["c2"])
+        self.assertEqual(self.queue.dead_letters(), [("c1", "channel", "1", "first", 1, "Missing Access")])
+        
+        self.assertTrue(self.queue.retry("c1"))
+        self.assertFalse(self.queue.retry("c1"))
+        self.assertEqual(self.queue.dead_letters(), [])
+        self.assertEqual(self.due_keys(), ["c1"])
+        self.assertEqual(self.queue.due()[0][6], 0)
+        
+        self.queue.remove("c1")
+        self.assertEqual(self.due_keys(), ["c2"])
+    
+    def test_purge_forgets_old_sent_messages_only(self):
+        self.queue.add("channel", 1, "sent", key="old")
+        self.queue.mark_sent(self.queue.due()[0][0])
+        self.queue.add("channel", 2, "waiting", key="pending")
+        self.queue._conn.execute("UPDATE outbox SET updated_at = ?", (time.time() - 100,))
+        
+        self.queue.purge(max_age=10)
+        
+        self.assertEqual(self.queue.add("channel", 1, "sent", key="old"), ("old", True))
+        self.assertEqual(self.queue.add("channel", 2, "waiting", key="pending"), ("pending", False))
+
+if __name__ == "__main__":
+    unittest.main()
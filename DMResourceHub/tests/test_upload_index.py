@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+# Add the project directory to the path so Python can find your modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.upload_index import UploadIndex, hash_file
+
+class UploadIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = UploadIndex(os.path.join(self.directory, "index.sqlite3"))
+    
+    def tearDown(self):
+        self.index._conn.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+    
+    def test_hash_file_matches_hashlib_including_empty_files(self):
+        for content in (b"", b"map data" * 1000):
+            path = self.write_file("file.bin", content)
+            self.assertEqual(hash_file(path), hashlib.sha256(content).hexdigest())
+            self.assertEqual(hash_file(path, chunk_size=7), hashlib.sha256(content).hexdigest())
+    
+    def test_hash_is_reused_until_the_file_changes(self):
+        path = self.write_file("map.png", b"v1")
+        first = self.index.hash_file(path)
+        
+        # A stored hash is trusted while size and mtime match
+        self.index._conn.execute("UPDATE file_hashes SET sha256 = 'stored'")
+        self.assertEqual(self.index.hash_file(path), "stored")
+        
+        self.write_file("map.png", b"v2!")
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        self.assertEqual(self.index.hash_file(path), hashlib.sha256(b"v2!").hexdigest())
+        self.assertNotEqual(first, hashlib.sha256(b"v2!").hexdigest())
+    
+    def test_find_filters_by_resource_type(self):
+        self.index.add("abc", {"public_id": "maps/town", "resource_type": "image", "secure_url": "https://x"})
+        
+        self.assertEqual(self.index.find("abc")["public_id"], "maps/town")
+        self.assertEqual(self.index.find("abc", "image")["secure_url"], "https://x")
+        self.assertIsNone(self.index.find("abc", "raw"))
+        self.assertIsNone(self.index.find("other"))
+    
+    def test_find_returns_latest_upload_of_any_type(self):
+        self.index.add("abc", {"public_id": "old", "resource_type": "raw"})
+        self.index._conn.execute("UPDATE uploads SET uploaded_at = uploaded_at - 10")
+        self.index.add("abc", {"public_id": "new", "resource_type": "image"})
+        
+        self.assertEqual(self.index.find("abc")["public_id"], "new")
+        self.assertEqual(self.index.find("abc", "raw")["public_id"], "old")
+    
+    def test_remove_public_id_forgets_deleted_assets(self):
+        self.index.add("abc", {"public_id": "maps/town", "resource_type": "image"})
+        self.index.remove_public_id("maps/town")
+        
+        self.assertIsNone(self.index.find("abc"))
+
+if __name__ == "__main__":
+    unittest.main()
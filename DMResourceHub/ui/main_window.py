@@ -2,10 +2,21 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 
+from config.settings import Settings
+from services.discord_service import DiscordService
+
 class MainWindow:
-    def __init__(self, root):
-        """Initialize the main application window"""
+    def __init__(self, root, settings=None, discord_service=None):
+        """Initialize the main application window
+        
+        Args:
+            root (tk.Tk): Root window
+            settings (Settings, optional): Application settings. Defaults to a new Settings instance.
+            discord_service (DiscordService, optional): Discord connection shared with the app. Defaults to a new service.
+        """
         self.root = root
+        self.settings = settings or Settings()
+        self.discord_service = discord_service or DiscordService(self.settings)
         self.root.title("DM Resource Hub")
         self.root.geometry("1200x800")
         self.root.minsize(800, 600)
@@ -28,6 +39,9 @@ class MainWindow:
         self.create_center_panel()
         self.create_right_sidebar()
         self.create_status_bar()
+        
+        # Show the Discord connection in the status bar whenever it changes
+        self.discord_service.add_status_callback(DiscordService.tk_callback(self.root, self.show_discord_status))
     
     def create_menu(self):
         """Create the main menu bar"""
@@ -231,7 +245,30 @@ class MainWindow:
         messagebox.showinfo("Info", "Create Group feature not implemented yet")
     
     def connect_discord(self):
-        messagebox.showinfo("Info", "Connect to Discord feature not implemented yet")
+        """Start connecting to Discord without blocking the UI"""
+        if self.discord_service.connected:
+            messagebox.showinfo("Discord", "Already connected to Discord")
+            return
+        
+        if not self.discord_service.connect(wait=False):
+            messagebox.showerror("Discord", "Could not connect to Discord. Check DISCORD_BOT_TOKEN in the .env file.")
+            return
+        
+        self.show_discord_status("connecting")
+    
+    def show_discord_status(self, status):
+        """Show the Discord connection in the status bar
+        
+        Args:
+            status (str): "connecting", or a status from DiscordService.add_status_callback
+        """
+        texts = {
+            "connecting": "Connecting to Discord...",
+            "connected": "Connected to Discord",
+            "reconnecting": "Discord connection lost, reconnecting...",
+            "disconnected": "Disconnected from Discord",
+        }
+        self.status_label.config(text=texts.get(status, status))
     
     def bot_settings(self):
         messagebox.showinfo("Info", "Bot Settings feature not implemented yet")
@@ -1,4 +1,6 @@
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
@@ -9,29 +11,38 @@ from models.resource import Resource
 class ResourceUploadDialog:
     """Dialog for uploading a new resource"""
     
-    def __init__(self, parent, firebase_service, campaigns=None):
+    # Shared by every dialog that isn't given a service, so its connection pool and databases are opened once
+    shared_cloudinary_service = None
+    
+    def __init__(self, parent, firebase_service, campaigns=None, cloudinary_service=None):
         """Initialize the upload dialog
         
         Args:
             parent: Parent window
             firebase_service: FirebaseService instance
             campaigns (list, optional): List of Campaign objects. Defaults to None.
+            cloudinary_service (CloudinaryService, optional): Service to upload with. Defaults to one shared by all dialogs.
         """
         self.parent = parent
         self.firebase_service = firebase_service
         self.campaigns = campaigns or []
+        self.cloudinary_service = cloudinary_service
         
         # Resource data
         self.resource = Resource()
         self.file_path = None
         self.thumbnail = None
         
+        # Set while a file is uploading in the background
+        self.cancel_event = None
+        
         # Create the dialog window
         self.window = tk.Toplevel(parent)
         self.window.title("Upload New Resource")
         self.window.geometry("600x700")
         self.window.minsize(500, 600)
         self.window.grab_set()  # Make the dialog modal
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         
         # Center the window
         self.center_window()
@@ -152,8 +163,10 @@ class ResourceUploadDialog:
         button_frame = ttk.Frame(self.window)
         button_frame.pack(fill="x", padx=10, pady=10)
         
-        ttk.Button(button_frame, text="Cancel", command=self.window.destroy).pack(side="left", padx=(0, 10))
-        ttk.Button(button_frame, text="Upload", command=self.upload_resource).pack(side="right")
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.close)
+        self.cancel_button.pack(side="left", padx=(0, 10))
+        self.upload_button = ttk.Button(button_frame, text="Upload", command=self.upload_resource)
+        self.upload_button.pack(side="right")
         
         # Initialize UI based on default resource type
         self.update_resource_type("image")
@@ -211,6 +224,159 @@ class ResourceUploadDialog:
             print(f"Error updating preview: {e}")
             self.preview_area.config(image=None, text="Error loading preview")
 
+    def find_uploaded_file(self, sha256):
+        """Get the Cloudinary data of a stored resource with the same file contents"""
+        existing = self.firebase_service.find_resource_by_hash(sha256)
+        if not existing:
+            return None
+        return dict(existing.cloudinary_data, mime_type=existing.file_data.get("mime_type", ""))
+
+    def get_cloudinary_service(self):
+        """Get the service to upload with, creating the shared one on first use"""
+        if self.cloudinary_service is None:
+            if ResourceUploadDialog.shared_cloudinary_service is None:
+                from services.cloudinary_service import CloudinaryService
+                ResourceUploadDialog.shared_cloudinary_service = CloudinaryService(self.firebase_service.settings)
+            self.cloudinary_service = ResourceUploadDialog.shared_cloudinary_service
+        return self.cloudinary_service
+    
+    def close(self):
+        """Close the dialog, unless a file is still uploading"""
+        if self.cancel_event is None:
+            self.window.destroy()
+    
+    def start_upload(self, campaigns):
+        """Upload the selected file to Cloudinary in a background thread
+        
+        The dialog's buttons are disabled and the progress window takes the grab
+        until the upload ends; closing the progress window cancels the upload.
+        finish_upload runs on the Tk thread with the result.
+        
+        Args:
+            campaigns (list): Campaign IDs for the new resource
+        """
+        cloudinary_service = self.get_cloudinary_service()
+        
+        # Determine folder in Cloudinary
+        cloudinary_folder = "general"
+        if campaigns and campaigns[0]:
+            cloudinary_folder = f"campaign_{campaigns[0]}"
+        
+        # Determine resource type for Cloudinary
+        cloudinary_resource_type = "image" if self.resource.resource_type == "image" else "raw"
+        
+        # Show uploading progress
+        self.cancel_event = threading.Event()
+        self.upload_button.config(state="disabled")
+        self.cancel_button.config(state="disabled")
+        self.window.config(cursor="wait")
+        
+        self.progress_window = tk.Toplevel(self.window)
+        self.progress_window.title("Uploading")
+        self.progress_window.geometry("300x100")
+        self.progress_window.transient(self.window)
+        self.progress_window.protocol("WM_DELETE_WINDOW", self.cancel_upload)
+        self.progress_label = ttk.Label(self.progress_window, text="Uploading resource...")
+        self.progress_label.pack(pady=(15, 5))
+        self.progress_bar = ttk.Progressbar(self.progress_window, length=250, mode="determinate")
+        self.progress_bar.pack()
+        self.progress_window.grab_set()
+        
+        # Written by the upload thread, read by poll_upload
+        self.progress = (0, os.path.getsize(self.file_path))
+        results = queue.Queue()
+        
+        def record_progress(bytes_sent, total_bytes):
+            self.progress = (bytes_sent, total_bytes)
+        
+        def run_upload():
+            result = None
+            try:
+                result = cloudinary_service.upload_file(
+                    self.file_path,
+                    resource_type=cloudinary_resource_type,
+                    folder=cloudinary_folder,
+                    progress_callback=record_progress,
+                    cancel_event=self.cancel_event,
+                    find_existing=self.find_uploaded_file
+                )
+            finally:
+                results.put(result)
+        
+        threading.Thread(target=run_upload, daemon=True).start()
+        self.poll_upload(results)
+    
+    def poll_upload(self, results):
+        """Update the progress bar until the upload thread puts its result"""
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            sent, total = self.progress
+            self.progress_bar["value"] = 100 * sent / total if total else 100
+            self.window.after(100, self.poll_upload, results)
+            return
+        
+        self.finish_upload(result)
+    
+    def cancel_upload(self):
+        """Stop the upload before its next chunk"""
+        self.cancel_event.set()
+        self.progress_label.config(text="Cancelling...")
+    
+    def finish_upload(self, result):
+        """Save the uploaded resource, or let the user try again
+        
+        Args:
+            result (dict): Cloudinary upload result, or None if the upload failed or was cancelled
+        """
+        cancelled = self.cancel_event.is_set()
+        self.cancel_event = None
+        self.progress_window.grab_release()
+        self.progress_window.destroy()
+        self.window.grab_set()
+        self.window.config(cursor="")
+        self.upload_button.config(state="normal")
+        self.cancel_button.config(state="normal")
+        
+        if not result:
+            if not cancelled:
+                messagebox.showerror("Error", "Failed to upload file to Cloudinary")
+            return
+        
+        # Store Cloudinary data in resource
+        self.resource.cloudinary_data = {
+            "public_id": result["public_id"],
+            "url": result["url"],
+            "secure_url": result["secure_url"],
+            "resource_type": result["resource_type"],
+            "format": result.get("format", ""),
+            "version": result.get("version", "")
+        }
+        
+        # Store file info
+        self.resource.file_data = {
+            "filename": os.path.basename(self.file_path),
+            "size": os.path.getsize(self.file_path),
+            "mime_type": result.get("mime_type", ""),
+            "sha256": result.get("sha256", "")
+        }
+        
+        try:
+            self.save_resource()
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            print(f"Error uploading resource: {e}")
+    
+    def save_resource(self):
+        """Add the resource to Firebase and close the dialog if it was saved"""
+        resource_id = self.firebase_service.add_resource(self.resource)
+        
+        if resource_id:
+            messagebox.showinfo("Success", "Resource uploaded successfully")
+            self.window.destroy()
+        else:
+            messagebox.showerror("Error", "Failed to save resource metadata to Firebase")
+    
     def upload_resource(self):
         """Upload the resource to Cloudinary and save metadata to Firebase"""
         # Validate input
@@ -248,57 +414,9 @@ class ResourceUploadDialog:
                     messagebox.showerror("Error", "Please select a file")
                     return
                 
-                # Upload to Cloudinary
-                # Create cloudinary service instance
-                from services.cloudinary_service import CloudinaryService
-                cloudinary_service = CloudinaryService()
-                
-                # Determine folder in Cloudinary
-                cloudinary_folder = "general"
-                if campaigns and campaigns[0]:
-                    cloudinary_folder = f"campaign_{campaigns[0]}"
-                
-                # Determine resource type for Cloudinary
-                cloudinary_resource_type = "image" if self.resource.resource_type == "image" else "raw"
-                
-                # Show uploading progress
-                self.window.config(cursor="wait")
-                progress_window = tk.Toplevel(self.window)
-                progress_window.title("Uploading")
-                progress_window.geometry("300x100")
-                ttk.Label(progress_window, text="Uploading resource...").pack(pady=20)
-                progress_window.update()
-                
-                # Upload to Cloudinary
-                result = cloudinary_service.upload_file(
-                    self.file_path,
-                    resource_type=cloudinary_resource_type,
-                    folder=cloudinary_folder
-                )
-                
-                progress_window.destroy()
-                self.window.config(cursor="")
-                
-                if not result:
-                    messagebox.showerror("Error", "Failed to upload file to Cloudinary")
-                    return
-                
-                # Store Cloudinary data in resource
-                self.resource.cloudinary_data = {
-                    "public_id": result["public_id"],
-                    "url": result["url"],
-                    "secure_url": result["secure_url"],
-                    "resource_type": result["resource_type"],
-                    "format": result.get("format", ""),
-                    "version": result.get("version", "")
-                }
-                
-                # Store file info
-                self.resource.file_data = {
-                    "filename": os.path.basename(self.file_path),
-                    "size": os.path.getsize(self.file_path),
-                    "mime_type": result.get("mime_type", "")
-                }
+                # Saved by finish_upload once the upload is done
+                self.start_upload(campaigns)
+                return
                 
             elif self.resource.resource_type == "link":
                 url = self.url_entry.get().strip()
@@ -323,13 +441,7 @@ class ResourceUploadDialog:
                 }
             
             # Add resource to Firebase
-            resource_id = self.firebase_service.add_resource(self.resource)
-            
-            if resource_id:
-                messagebox.showinfo("Success", "Resource uploaded successfully")
-                self.window.destroy()
-            else:
-                messagebox.showerror("Error", "Failed to save resource metadata to Firebase")
+            self.save_resource()
                 
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
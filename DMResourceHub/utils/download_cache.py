@@ -0,0 +1,228 @@
+import os
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+class DownloadCache:
+    """Content-addressed on-disk cache for downloaded files with LRU eviction
+    
+    Files are keyed by their storage path plus a version (generation or ETag),
+    so a new upload to the same path never returns stale content.
+    """
+    
+    def __init__(self, root, max_bytes):
+        """Open (or create) the download cache
+        
+        Args:
+            root (str): Directory holding the cached files and their index
+            max_bytes (int): Total size the cache is trimmed to after each download
+        """
+        self.root = Path(root)
+        self.objects_path = self.root / "objects"
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " storage_path TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " checked_at REAL NOT NULL,"
+                " etag TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_path ON entries (storage_path)")
+            
+            # Indexes created before ETags were stored
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+            if "etag" not in columns:
+                self._conn.execute("ALTER TABLE entries ADD COLUMN etag TEXT")
+    
+    @staticmethod
+    def make_key(storage_path, version):
+        """Build the cache key for a version of a stored file"""
+        return hashlib.sha256(f"{storage_path}#{version}".encode("utf-8")).hexdigest()
+    
+    def _object_path(self, key):
+        """Get the file path for a cache key"""
+        return self.objects_path / key[:2] / key
+    
+    def get(self, storage_path, version):
+        """Get the cached copy of a version of a file
+        
+        Args:
+            storage_path (str): Path in remote storage
+            version (str): Generation or ETag of the file
+        
+        Returns:
+            Path: Path of the cached file, or None if not cached
+        """
+        key = self.make_key(storage_path, version)
+        path = self._object_path(key)
+        
+        with self._lock, self._conn:
+            found = self._conn.execute(
+                "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+            ).rowcount
+        
+        if found and path.exists():
+            return path
+        if found:
+            # The file was removed behind our back
+            self._forget(key)
+        return None
+    
+    def get_latest(self, storage_path, max_age=None):
+        """Get the most recently verified cached version of a file
+        
+        Args:
+            storage_path (str): Path in remote storage
+            max_age (float, optional): Ignore versions not verified within this many seconds. Defaults to None.
+        
+        Returns:
+            tuple: (Path, version) of the cached file, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, checked_at FROM entries WHERE storage_path = ? ORDER BY checked_at DESC LIMIT 1",
+                (storage_path,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        version, checked_at = row
+        if max_age is not None and time.time() - checked_at > max_age:
+            return None
+        
+        path = self.get(storage_path, version)
+        return (path, version) if path else None
+    
+    def get_entry(self, storage_path, version):
+        """Get a cached file along with when it was last verified
+        
+        Args:
+            storage_path (str): Path in remote storage
+            version (str): Generation or ETag of the file
+        
+        Returns:
+            tuple: (Path, checked_at, etag) of the cached file, or None if not cached
+        """
+        key = self.make_key(storage_path, version)
+        with self._lock:
+            row = self._conn.execute("SELECT checked_at, etag FROM entries WHERE key = ?", (key,)).fetchone()
+        
+        path = self.get(storage_path, version) if row else None
+        return (path, row[0], row[1]) if path else None
+    
+    def mark_checked(self, storage_path, version):
+        """Record that a cached version was just confirmed to be current"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE entries SET checked_at = ? WHERE key = ?",
+                (time.time(), self.make_key(storage_path, version))
+            )
+    
+    def fetch(self, storage_path, version, download):
+        """Get a file from the cache, downloading it on a miss
+        
+        Concurrent fetches of the same file wait for a single download. The
+        download is written to a temporary file and renamed into place, so
+        readers never see a partial file.
+        
+        Args:
+            storage_path (str): Path in remote storage
+            version (str): Generation or ETag of the file
+            download (callable): Called with a local path to download the file to. May return
+                the file's ETag, which is stored for revalidation.
+        
+        Returns:
+            Path: Path of the cached file
+        """
+        key = self.make_key(storage_path, version)
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            path = self.get(storage_path, version)
+            if path:
+                return path
+            
+            path = self._object_path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{key[:8]}-", suffix=".part")
+            os.close(fd)
+            
+            try:
+                etag = download(temp_path)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            
+            now = time.time()
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, storage_path, version, size, last_used, checked_at, etag) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, storage_path, str(version), path.stat().st_size, now, now, etag)
+                )
+        
+        with self._lock:
+            self._key_locks.pop(key, None)
+        
+        self.evict(keep=key)
+        return path
+    
+    def evict(self, keep=None):
+        """Delete least recently used files until the cache fits in max_bytes
+        
+        Args:
+            keep (str, optional): Key that must not be evicted. Defaults to None.
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            
+            try:
+                self._object_path(key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Still open elsewhere (Windows); try again next time
+                print(f"Could not evict cached file {key}: {e}")
+                continue
+            
+            self._forget(key)
+            total -= size
+    
+    def remove(self, storage_path, version):
+        """Delete a cached file, e.g. after the remote copy changed"""
+        key = self.make_key(storage_path, version)
+        try:
+            self._object_path(key).unlink()
+        except FileNotFoundError:
+            pass
+        self._forget(key)
+    
+    def _forget(self, key):
+        """Remove a key from the index"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
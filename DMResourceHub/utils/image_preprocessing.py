@@ -0,0 +1,120 @@
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from PIL import Image, ImageOps
+
+# Extensions Pillow can re-encode; anything else is uploaded unchanged
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+FORMAT_EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+def preprocess_image(file_path, output_dir, max_edge=2560, image_format="WEBP", quality=82):
+    """Downscale an image, strip its metadata and re-encode it for upload
+    
+    The output is named after the source file and the options, so preprocessing
+    the same file again returns the existing output. Runs in worker processes,
+    so it only takes and returns plain values.
+    
+    Args:
+        file_path (str): Local image path
+        output_dir (str): Directory for the processed images
+        max_edge (int, optional): Longest edge of the output in pixels. Defaults to 2560.
+        image_format (str, optional): "WEBP" or "JPEG". Defaults to "WEBP".
+        quality (int, optional): Encoder quality from 1 to 100. Defaults to 82.
+    
+    Returns:
+        dict: "path" of the file to upload (the original if processing didn't make it
+            smaller or it isn't a still image), "original_bytes" and "bytes"
+    """
+    original_bytes = os.path.getsize(file_path)
+    unchanged = {"path": file_path, "original_bytes": original_bytes, "bytes": original_bytes}
+    if Path(file_path).suffix.lower() not in IMAGE_EXTENSIONS:
+        return unchanged
+    
+    stat = os.stat(file_path)
+    key = hashlib.sha256(
+        f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime}|{max_edge}|{image_format}|{quality}".encode("utf-8")
+    ).hexdigest()[:16]
+    # Keep the original file name, since Cloudinary derives the public ID from it
+    output_path = Path(output_dir) / key / (Path(file_path).stem + FORMAT_EXTENSIONS[image_format])
+    if not output_path.exists() and not _encode(file_path, output_path, max_edge, image_format, quality):
+        return unchanged
+    
+    processed_bytes = output_path.stat().st_size
+    if processed_bytes >= original_bytes:
+        return unchanged
+    return {"path": str(output_path), "original_bytes": original_bytes, "bytes": processed_bytes}
+
+def _encode(file_path, output_path, max_edge, image_format, quality):
+    """Write the downscaled, metadata-free copy of an image
+    
+    Returns:
+        bool: True if the image was written, False if it is animated or couldn't be read
+    """
+    try:
+        with Image.open(file_path) as img:
+            if getattr(img, "is_animated", False):
+                return False
+            
+            # Let the JPEG decoder skip detail the output won't keep
+            img.draft("RGB", (max_edge, max_edge))
+            
+            # Apply the EXIF rotation before the metadata is dropped
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if has_alpha and image_format == "WEBP":
+                img = img.convert("RGBA")
+            elif has_alpha:
+                # JPEG has no alpha channel, so flatten onto white
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                rgba = img.convert("RGBA")
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                img = background
+            else:
+                img = img.convert("RGB")
+            
+            # A fresh image carries no EXIF, XMP or ICC data from the source
+            clean = Image.new(img.mode, img.size)
+            clean.paste(img)
+            
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = output_path.with_name(output_path.name + ".part")
+            if image_format == "JPEG":
+                clean.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                clean.save(temp_path, "WEBP", quality=quality, method=4)
+            os.replace(temp_path, output_path)
+    except (OSError, ValueError) as e:
+        print(f"Error preprocessing image {file_path}: {e}")
+        return False
+    
+    return True
+
+def preprocess_images(file_paths, output_dir, max_edge=2560, image_format="WEBP", quality=82, max_workers=None):
+    """Preprocess many images in a process pool, one worker per core by default
+    
+    Args:
+        file_paths (list): Local image paths
+        output_dir (str): Directory for the processed images
+        max_edge (int, optional): Longest edge of the output in pixels. Defaults to 2560.
+        image_format (str, optional): "WEBP" or "JPEG". Defaults to "WEBP".
+        quality (int, optional): Encoder quality from 1 to 100. Defaults to 82.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of cores.
+    
+    Yields:
+        tuple: (file_path, result of preprocess_image) in the order images finish
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(preprocess_image, file_path, output_dir, max_edge, image_format, quality): file_path
+            for file_path in file_paths
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,413 @@
+import json
+import sqlite3
+import threading
+import time
+import datetime
+from pathlib import Path
+
+
+class LocalCache:
+    """SQLite-backed local copy of Firestore documents and queued offline writes"""
+    
+    def __init__(self, db_path):
+        """Open (or create) the local cache database
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # The connection is shared between the Tk thread and background workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Create the cache tables if they don't exist yet"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " collection TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " cached_at REAL NOT NULL,"
+                " PRIMARY KEY (collection, id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                " key TEXT PRIMARY KEY,"
+                " collection TEXT NOT NULL,"
+                " ids TEXT NOT NULL,"
+                " cached_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_writes ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " collection TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " op TEXT NOT NULL,"
+                " data TEXT)"
+            )
+    
+    # Serialization
+    
+    @staticmethod
+    def _encode_value(value):
+        """JSON hook for values the json module can't serialize natively"""
+        if isinstance(value, datetime.datetime):
+            # Fixed-width timestamps so stored values also sort correctly as text
+            return {"__datetime__": value.isoformat(timespec="microseconds")}
+        raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+    
+    @staticmethod
+    def _decode_value(obj):
+        """JSON hook that restores values written by _encode_value"""
+        if "__datetime__" in obj and len(obj) == 1:
+            return datetime.datetime.fromisoformat(obj["__datetime__"])
+        return obj
+    
+    def encode(self, data):
+        """Serialize a document dictionary for storage"""
+        return json.dumps(data, default=self._encode_value, separators=(",", ":"))
+    
+    def decode(self, text):
+        """Deserialize a document dictionary from storage"""
+        return json.loads(text, object_hook=self._decode_value)
+    
+    # Documents
+    
+    def get_document(self, collection, doc_id, max_age=None):
+        """Get a cached document
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            max_age (float, optional): Ignore entries older than this many seconds. Defaults to None (any age).
+        
+        Returns:
+            dict: Document data, or None if not cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, cached_at FROM documents WHERE collection = ? AND id = ?",
+                (collection, doc_id)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        if max_age is not None and time.time() - row[1] > max_age:
+            return None
+        return self.decode(row[0])
+    
+    def get_documents(self, collection, doc_ids, max_age=None):
+        """Get several cached documents in one query
+        
+        Args:
+            collection (str): Collection name
+            doc_ids (list): Document IDs
+            max_age (float, optional): Ignore entries older than this many seconds. Defaults to None (any age).
+        
+        Returns:
+            dict: Document data by ID, for the IDs that are cached
+        """
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return {}
+        
+        oldest = 0 if max_age is None else time.time() - max_age
+        placeholders = ",".join("?" * len(doc_ids))
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, data FROM documents WHERE collection = ? AND cached_at >= ? AND id IN ({placeholders})",
+                [collection, oldest] + doc_ids
+            ).fetchall()
+        
+        return {doc_id: self.decode(data) for doc_id, data in rows}
+    
+    def list_documents(self, collection, limit=None, start_after=None):
+        """List cached documents of a collection in document ID order
+        
+        Args:
+            collection (str): Collection name
+            limit (int, optional): Maximum number of documents. Defaults to None.
+            start_after (str, optional): Only list documents with IDs after this one. Defaults to None.
+        
+        Returns:
+            list: List of (doc_id, data) tuples
+        """
+        sql = "SELECT id, data FROM documents WHERE collection = ?"
+        params = [collection]
+        if start_after is not None:
+            sql += " AND id > ?"
+            params.append(start_after)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        return [(doc_id, self.decode(data)) for doc_id, data in rows]
+    
+    def find_documents(self, collection, equal=None, contains=None, order_by=None,
+                       descending=False, limit=None, start_after=None):
+        """Filter cached documents the way the equivalent Firestore query would
+        
+        Args:
+            collection (str): Collection name
+            equal (dict, optional): Fields that must equal the given values. Defaults to None.
+            contains (dict, optional): Array fields that must contain the given values. Defaults to None.
+            order_by (str, optional): Field to sort by, with ties broken by document ID. Defaults to None (ID order).
+            descending (bool, optional): Sort in descending order. Defaults to False.
+            limit (int, optional): Maximum number of documents. Defaults to None.
+            start_after (tuple, optional): (order_by value, doc_id) of the last document of the previous page. Defaults to None.
+        
+        Returns:
+            list: List of (doc_id, data) tuples
+        """
+        sql = "SELECT id, data FROM documents WHERE collection = ?"
+        params = [collection]
+        
+        for field, value in (equal or {}).items():
+            sql += " AND json_extract(data, ?) = ?"
+            params += [f"$.{field}", value]
+        
+        for field, value in (contains or {}).items():
+            sql += " AND EXISTS (SELECT 1 FROM json_each(data, ?) WHERE value = ?)"
+            params += [f"$.{field}", value]
+        
+        direction = "DESC" if descending else "ASC"
+        comparison = "<" if descending else ">"
+        
+        if order_by:
+            # Timestamps are stored as {"__datetime__": iso}, so compare their text
+            sort_key = "COALESCE(json_extract(data, ?), json_extract(data, ?))"
+            sort_params = [f"$.{order_by}.__datetime__", f"$.{order_by}"]
+            
+            if start_after is not None:
+                value, cursor_id = start_after
+                if isinstance(value, datetime.datetime):
+                    value = self._encode_value(value)["__datetime__"]
+                sql += f" AND ({sort_key} {comparison} ? OR ({sort_key} = ? AND id {comparison} ?))"
+                params += sort_params + [value] + sort_params + [value, cursor_id]
+            
+            sql += f" ORDER BY {sort_key} {direction}, id {direction}"
+            params += sort_params
+        else:
+            if start_after is not None:
+                sql += f" AND id {comparison} ?"
+                params.append(start_after[1])
+            sql += f" ORDER BY id {direction}"
+        
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        return [(doc_id, self.decode(data)) for doc_id, data in rows]
+    
+    def put_document(self, collection, doc_id, data):
+        """Store or replace a document"""
+        self.put_documents(collection, [(doc_id, data)])
+    
+    def put_documents(self, collection, docs):
+        """Store or replace several documents in one transaction
+        
+        Args:
+            collection (str): Collection name
+            docs (iterable): (doc_id, data) tuples
+        """
+        now = time.time()
+        rows = [(collection, doc_id, self.encode(data), now) for doc_id, data in docs]
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (collection, id, data, cached_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+    
+    def replace_documents(self, collection, docs):
+        """Replace every cached document of a collection with a complete listing
+        
+        Documents missing from docs are removed, e.g. ones deleted while the app
+        was closed. Documents with queued writes keep their local state, since
+        the listing doesn't reflect those writes yet.
+        
+        Args:
+            collection (str): Collection name
+            docs (iterable): (doc_id, data) tuples for the whole collection
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            pending = {row[0] for row in self._conn.execute(
+                "SELECT id FROM pending_writes WHERE collection = ?", (collection,)
+            )}
+            rows = [(collection, doc_id, self.encode(data), now) for doc_id, data in docs if doc_id not in pending]
+            
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? "
+                "AND id NOT IN (SELECT id FROM pending_writes WHERE collection = ?)",
+                (collection, collection)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (collection, id, data, cached_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+    
+    def update_document(self, collection, doc_id, fields):
+        """Apply a Firestore-style partial update to a cached document
+        
+        Keys containing dots are treated as nested field paths, like
+        ``DocumentReference.update``. Documents that are not cached are left alone.
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            fields (dict): Field paths and their new values
+        """
+        data = self.get_document(collection, doc_id)
+        if data is None:
+            return
+        
+        for path, value in fields.items():
+            target = data
+            parts = path.split(".")
+            for part in parts[:-1]:
+                if not isinstance(target.get(part), dict):
+                    target[part] = {}
+                target = target[part]
+            target[parts[-1]] = value
+        
+        self.put_document(collection, doc_id, data)
+    
+    def delete_document(self, collection, doc_id):
+        """Remove a document from the cache"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND id = ?",
+                (collection, doc_id)
+            )
+    
+    # Query results
+    
+    def get_query(self, key, max_age=None):
+        """Get the cached result of a query
+        
+        Args:
+            key (str): Query cache key
+            max_age (float, optional): Ignore results older than this many seconds. Defaults to None.
+        
+        Returns:
+            list: List of (doc_id, data) tuples, or None if not cached or stale
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT collection, ids, cached_at FROM queries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is None:
+                return None
+            collection, ids, cached_at = row
+            if max_age is not None and time.time() - cached_at > max_age:
+                return None
+            
+            ids = json.loads(ids)
+            if not ids:
+                return []
+            
+            placeholders = ",".join("?" * len(ids))
+            docs = dict(self._conn.execute(
+                f"SELECT id, data FROM documents WHERE collection = ? AND id IN ({placeholders})",
+                [collection] + ids
+            ).fetchall())
+        
+        # A document evicted since the query ran means the result is incomplete
+        if len(docs) != len(ids):
+            return None
+        
+        return [(doc_id, self.decode(docs[doc_id])) for doc_id in ids]
+    
+    def put_query(self, collection, key, docs):
+        """Store the result of a query along with its documents
+        
+        Args:
+            collection (str): Collection name
+            key (str): Query cache key
+            docs (list): (doc_id, data) tuples in query order
+        """
+        docs = list(docs)
+        self.put_documents(collection, docs)
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (key, collection, ids, cached_at) VALUES (?, ?, ?, ?)",
+                (key, collection, json.dumps([doc_id for doc_id, _ in docs]), time.time())
+            )
+    
+    def invalidate_queries(self, collection):
+        """Forget all cached query results for a collection
+        
+        This includes results cached under a namespace of the collection,
+        such as "resources:summary" for "resources".
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM queries WHERE collection = ? OR collection LIKE ?",
+                (collection, f"{collection}:%")
+            )
+    
+    # Offline write queue
+    
+    def queue_write(self, collection, doc_id, op, data=None):
+        """Queue a write to be replayed when the connection is back
+        
+        Args:
+            collection (str): Collection name
+            doc_id (str): Document ID
+            op (str): "set", "update" or "delete"
+            data (dict, optional): Write payload. Defaults to None.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pending_writes (collection, id, op, data) VALUES (?, ?, ?, ?)",
+                (collection, doc_id, op, None if data is None else self.encode(data))
+            )
+    
+    def pending_writes(self):
+        """Get queued writes in the order they were made
+        
+        Returns:
+            list: List of (seq, collection, doc_id, op, data) tuples
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, collection, id, op, data FROM pending_writes ORDER BY seq"
+            ).fetchall()
+        
+        return [
+            (seq, collection, doc_id, op, None if data is None else self.decode(data))
+            for seq, collection, doc_id, op, data in rows
+        ]
+    
+    def pending_count(self):
+        """Get the number of queued writes"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone()[0]
+    
+    def remove_pending_write(self, seq):
+        """Remove a queued write once it has been replayed"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_writes WHERE seq = ?", (seq,))
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
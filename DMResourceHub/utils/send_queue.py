@@ -0,0 +1,197 @@
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+class SendQueue:
+    """SQLite-backed outbox of Discord messages, so shares survive failures and restarts
+    
+    Each message has an idempotency key; queueing a key that is already in the
+    outbox does nothing, so repeating a share doesn't send it twice. Messages
+    to the same channel or user are delivered in the order they were queued.
+    Messages that fail too often, or can never be delivered, are kept in a
+    "dead" state for the user to retry or discard.
+    """
+    
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+    
+    def __init__(self, db_path):
+        """Open (or create) the outbox database
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " key TEXT NOT NULL UNIQUE,"
+                " kind TEXT NOT NULL,"
+                " target_id TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " file_path TEXT,"
+                " state TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt REAL NOT NULL,"
+                " last_error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (state, kind, target_id, id)"
+            )
+    
+    def add(self, kind, target_id, content, file_path=None, key=None):
+        """Queue a message
+        
+        Args:
+            kind (str): "channel" or "user"
+            target_id (str): Discord channel or user ID
+            content (str): Message content
+            file_path (str, optional): Path to file to attach. Defaults to None.
+            key (str, optional): Idempotency key. Defaults to a new random key.
+        
+        Returns:
+            tuple: (key, True if the message was queued or False if the key was already in the outbox)
+        """
+        key = key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(key, kind, target_id, content, file_path, state, next_attempt, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, str(target_id), content, file_path, self.PENDING, now, now, now)
+            )
+        return key, cursor.rowcount == 1
+    
+    def due(self, limit=50):
+        """Get the messages that should be sent now
+        
+        Only the oldest pending message of each recipient is returned, so a
+        message waiting for a retry holds back the ones queued after it.
+        
+        Args:
+            limit (int, optional): Most messages to return. Defaults to 50.
+        
+        Returns:
+            list: (id, key, kind, target_id, content, file_path, attempts) tuples, oldest first
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, key, kind, target_id, content, file_path, attempts FROM outbox AS o "
+                "WHERE state = ? AND next_attempt <= ? AND id = ("
+                " SELECT MIN(id) FROM outbox WHERE state = ? AND kind = o.kind AND target_id = o.target_id"
+                ") ORDER BY id LIMIT ?",
+                (self.PENDING, time.time(), self.PENDING, limit)
+            ).fetchall()
+    
+    def next_attempt_at(self):
+        """Get the time the next pending message is due, or None if nothing is pending
+        
+        Like due, this only looks at the oldest pending message of each recipient,
+        since the ones behind it can't be sent before it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM outbox AS o "
+                "WHERE state = ? AND id = ("
+                " SELECT MIN(id) FROM outbox WHERE state = ? AND kind = o.kind AND target_id = o.target_id"
+                ")",
+                (self.PENDING, self.PENDING)
+            ).fetchone()
+        return row[0]
+    
+    def mark_sent(self, message_id):
+        """Record that a message was delivered"""
+        self._update(message_id, "state = ?, last_error = NULL", (self.SENT,))
+    
+    def mark_failed(self, message_id, error, delay):
+        """Record a failed attempt and schedule the next one
+        
+        Args:
+            message_id (int): Outbox row ID
+            error (str): Why the attempt failed
+            delay (float): Seconds to wait before the next attempt
+        """
+        self._update(
+            message_id,
+            "attempts = attempts + 1, next_attempt = ?, last_error = ?",
+            (time.time() + delay, str(error))
+        )
+    
+    def mark_dead(self, message_id, error):
+        """Stop retrying a message"""
+        self._update(
+            message_id,
+            "state = ?, attempts = attempts + 1, last_error = ?",
+            (self.DEAD, str(error))
+        )
+    
+    def _update(self, message_id, assignments, values):
+        """Update one outbox row"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE outbox SET {assignments}, updated_at = ? WHERE id = ?",
+                (*values, time.time(), message_id)
+            )
+    
+    def dead_letters(self):
+        """Get the messages that won't be retried
+        
+        Returns:
+            list: (key, kind, target_id, content, attempts, last_error) tuples, oldest first
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, kind, target_id, content, attempts, last_error FROM outbox "
+                "WHERE state = ? ORDER BY id",
+                (self.DEAD,)
+            ).fetchall()
+    
+    def retry(self, key):
+        """Queue a dead message again
+        
+        Returns:
+            bool: True if the message was dead and is pending again
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET state = ?, attempts = 0, next_attempt = ?, updated_at = ? "
+                "WHERE key = ? AND state = ?",
+                (self.PENDING, now, now, key, self.DEAD)
+            )
+        return cursor.rowcount == 1
+    
+    def remove(self, key):
+        """Discard a message, whatever its state"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE key = ?", (key,))
+    
+    def pending_count(self):
+        """Get the number of messages waiting to be sent"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE state = ?", (self.PENDING,)
+            ).fetchone()[0]
+    
+    def purge(self, max_age):
+        """Forget delivered messages older than max_age seconds
+        
+        Their keys stop guarding against duplicates, so max_age should be well
+        beyond the time a share might be repeated.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM outbox WHERE state = ? AND updated_at < ?",
+                (self.SENT, time.time() - max_age)
+            )
@@ -0,0 +1,133 @@
+import os
+import json
+import mmap
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """Get the SHA-256 hex digest of a file without reading it into memory
+    
+    Args:
+        file_path (str): Local file path
+        chunk_size (int, optional): Read size when the file can't be memory-mapped. Defaults to 1 MiB.
+    
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        try:
+            # Hashing the mapping lets the OS page the file in as needed
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        except (ValueError, OSError):
+            # Empty files and some file systems can't be mapped
+            f.seek(0)
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class UploadIndex:
+    """SQLite index of uploaded files by content hash, used to skip duplicate uploads"""
+    
+    def __init__(self, db_path):
+        """Open (or create) the upload index
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            # Hashes of local files, so unchanged files aren't read again
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime REAL NOT NULL,"
+                " sha256 TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " sha256 TEXT NOT NULL,"
+                " resource_type TEXT NOT NULL,"
+                " public_id TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " uploaded_at REAL NOT NULL,"
+                " PRIMARY KEY (sha256, resource_type))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS uploads_public_id ON uploads (public_id)")
+    
+    def hash_file(self, file_path):
+        """Get the SHA-256 of a file, reusing the stored hash if the file is unchanged
+        
+        Args:
+            file_path (str): Local file path
+        
+        Returns:
+            str: Hex digest of the file contents
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM file_hashes WHERE path = ? AND size = ? AND mtime = ?",
+                (path, stat.st_size, stat.st_mtime)
+            ).fetchone()
+        if row:
+            return row[0]
+        
+        sha256 = hash_file(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime, sha256) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, sha256)
+            )
+        return sha256
+    
+    def find(self, sha256, resource_type="auto"):
+        """Find an earlier upload of the same content
+        
+        Args:
+            sha256 (str): Hex digest of the file contents
+            resource_type (str, optional): Required Cloudinary resource type, or "auto" for any. Defaults to "auto".
+        
+        Returns:
+            dict: Upload result of the earlier upload, or None
+        """
+        sql = "SELECT result FROM uploads WHERE sha256 = ?"
+        params = [sha256]
+        if resource_type != "auto":
+            sql += " AND resource_type = ?"
+            params.append(resource_type)
+        
+        with self._lock:
+            row = self._conn.execute(sql + " ORDER BY uploaded_at DESC LIMIT 1", params).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def add(self, sha256, result):
+        """Record an upload result for a content hash
+        
+        Args:
+            sha256 (str): Hex digest of the file contents
+            result (dict): Cloudinary upload result, with at least public_id and resource_type
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (sha256, resource_type, public_id, result, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sha256, result.get("resource_type", "image"), result["public_id"],
+                 json.dumps(result, default=str), time.time())
+            )
+    
+    def remove_public_id(self, public_id):
+        """Forget uploads of an asset that was deleted"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads WHERE public_id = ?", (public_id,))
@@ -0,0 +1,96 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+class UploadSessions:
+    """SQLite-backed record of chunked uploads, so an interrupted upload can be resumed"""
+    
+    def __init__(self, db_path):
+        """Open (or create) the upload session database
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " backend TEXT NOT NULL,"
+                " file_path TEXT NOT NULL,"
+                " destination TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime REAL NOT NULL,"
+                " offset INTEGER NOT NULL,"
+                " state TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (backend, file_path, destination))"
+            )
+    
+    @staticmethod
+    def _file_key(file_path):
+        """Get the absolute path, size and modification time of a local file"""
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime
+    
+    def get(self, backend, file_path, destination, max_age=None):
+        """Get the saved session for uploading a file
+        
+        Sessions for a file that changed since the upload started are discarded.
+        
+        Args:
+            backend (str): Storage backend name, e.g. "firebase"
+            file_path (str): Local file path
+            destination (str): Where the file is being uploaded to
+            max_age (float, optional): Discard sessions not updated within this many seconds. Defaults to None.
+        
+        Returns:
+            tuple: (offset, state) of the session, or None if there is none to resume
+        """
+        path, size, mtime = self._file_key(file_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, offset, state, updated_at FROM sessions "
+                "WHERE backend = ? AND file_path = ? AND destination = ?",
+                (backend, path, destination)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        if row[0] != size or row[1] != mtime or (max_age is not None and time.time() - row[4] > max_age):
+            self.remove(backend, file_path, destination)
+            return None
+        return row[2], json.loads(row[3])
+    
+    def save(self, backend, file_path, destination, offset, state):
+        """Record how far an upload got
+        
+        Args:
+            backend (str): Storage backend name
+            file_path (str): Local file path
+            destination (str): Where the file is being uploaded to
+            offset (int): Number of bytes the backend has received
+            state (dict): Backend-specific session data, e.g. the session URL
+        """
+        path, size, mtime = self._file_key(file_path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(backend, file_path, destination, size, mtime, offset, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (backend, path, destination, size, mtime, offset, json.dumps(state), time.time())
+            )
+    
+    def remove(self, backend, file_path, destination):
+        """Forget the session for a finished or abandoned upload"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM sessions WHERE backend = ? AND file_path = ? AND destination = ?",
+                (backend, os.path.abspath(file_path), destination)
+            )
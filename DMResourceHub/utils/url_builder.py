@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+import cloudinary.utils
+
+class CloudinaryUrlBuilder:
+    """Memoized Cloudinary delivery URL builder
+    
+    URLs depend only on the cloud name and the arguments, so they are built
+    once with cloudinary.utils and then served from a bounded LRU. Nothing
+    here configures the SDK or reads the environment.
+    """
+    
+    def __init__(self, cloud_name, secure=True, max_entries=4096):
+        """Initialize the URL builder
+        
+        Args:
+            cloud_name (str): Cloudinary cloud name
+            secure (bool, optional): Build https URLs. Defaults to True.
+            max_entries (int, optional): Most URLs kept in memory. Defaults to 4096.
+        """
+        self.cloud_name = cloud_name
+        self.secure = secure
+        self.max_entries = max_entries
+        
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def _freeze(cls, value):
+        """Turn a transformation into a hashable cache key part"""
+        if isinstance(value, dict):
+            return tuple(sorted((key, cls._freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze(item) for item in value)
+        return value
+    
+    def build(self, public_id, version=None, transformation=None, resource_type="image", format=None):
+        """Get the delivery URL of a resource
+        
+        Args:
+            public_id (str): Public ID of the resource
+            version (str, optional): Resource version, so a replaced file gets a new URL. Defaults to None.
+            transformation (dict, optional): Transformation parameters, ignored for raw resources. Defaults to None.
+            resource_type (str, optional): Type of resource. Defaults to "image".
+            format (str, optional): File extension to deliver. Defaults to None.
+        
+        Returns:
+            str: URL of the resource
+        """
+        # Transformations only apply to images and videos
+        if resource_type == "raw":
+            transformation = None
+        
+        key = (public_id, str(version or ""), self._freeze(transformation), resource_type, format)
+        
+        with self._lock:
+            url = self._urls.get(key)
+            if url is not None:
+                self._urls.move_to_end(key)
+                return url
+        
+        options = {
+            "cloud_name": self.cloud_name,
+            "secure": self.secure,
+            "resource_type": resource_type,
+        }
+        if version:
+            options["version"] = version
+        if format:
+            options["format"] = format
+        if transformation:
+            # cloudinary_url consumes the options it is given, so pass a copy
+            options["transformation"] = dict(transformation) if isinstance(transformation, dict) else list(transformation)
+        url = cloudinary.utils.cloudinary_url(public_id, **options)[0]
+        
+        with self._lock:
+            self._urls[key] = url
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+        
+        return url
+    
+    def build_for_resources(self, resources, transformation=None):
+        """Build the URLs of many resources at once, e.g. for a page of the browser grid
+        
+        Args:
+            resources (list): Resource objects; those without Cloudinary data are skipped
+            transformation (dict, optional): Transformation applied to every image and video URL. Defaults to None.
+        
+        Returns:
+            dict: Resource ID to URL
+        """
+        urls = {}
+        for resource in resources:
+            data = resource.cloudinary_data or {}
+            if not data.get("public_id"):
+                continue
+            urls[resource.id] = self.build(
+                data["public_id"],
+                version=data.get("version"),
+                transformation=transformation,
+                resource_type=data.get("resource_type") or "image"
+            )
+        return urls
+    
+    def clear(self):
+        """Forget all built URLs"""
+        with self._lock:
+            self._urls.clear()